@@ -0,0 +1,54 @@
+"""Add per-group ledger entries and running balances
+
+Revision ID: add_group_balance_ledger
+Revises: add_multi_person_splits
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import func
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_group_balance_ledger'
+down_revision = 'add_multi_person_splits'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create group_ledger_entries (history) and group_balances (running state)"""
+
+    # ── Create group_ledger_entries table ──────────────────────────────────
+    op.create_table(
+        'group_ledger_entries',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('group_id', sa.String(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_group_ledger_entries_group_id',
+        'group_ledger_entries',
+        ['group_id']
+    )
+
+    # ── Create group_balances table ────────────────────────────────────────
+    op.create_table(
+        'group_balances',
+        sa.Column('group_id', sa.String(), nullable=False),
+        sa.Column('user', sa.String(), nullable=False),
+        sa.Column('balance_cents', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True, server_default=func.now()),
+        sa.PrimaryKeyConstraint('group_id', 'user')
+    )
+
+
+def downgrade() -> None:
+    """Drop group ledger tables"""
+    op.drop_table('group_balances')
+    op.drop_index('ix_group_ledger_entries_group_id', table_name='group_ledger_entries')
+    op.drop_table('group_ledger_entries')
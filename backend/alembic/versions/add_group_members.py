@@ -0,0 +1,34 @@
+"""Add group memberships for access to the group ledger
+
+Revision ID: add_group_members
+Revises: add_pipeline_job_results
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_group_members'
+down_revision = 'add_pipeline_job_results'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create group_members (group -> user)"""
+
+    # ── Create group_members table ─────────────────────────────────────────
+    op.create_table(
+        'group_members',
+        sa.Column('group_id', sa.String(), sa.ForeignKey('groups.id'), nullable=False),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('group_id', 'user_id')
+    )
+
+
+def downgrade() -> None:
+    """Drop group_members"""
+    op.drop_table('group_members')
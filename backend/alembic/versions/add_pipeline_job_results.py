@@ -0,0 +1,43 @@
+"""Store pipeline job results in chunks and add the job result mode
+
+Revision ID: add_pipeline_job_results
+Revises: add_pipeline_jobs
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_pipeline_job_results'
+down_revision = 'add_pipeline_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add pipeline_jobs.result_mode and the pipeline_job_results chunk table"""
+    op.add_column(
+        'pipeline_jobs',
+        sa.Column('result_mode', sa.String(), nullable=False, server_default='full'),
+    )
+
+    # ── Create pipeline_job_results table ──────────────────────────────────
+    op.create_table(
+        'pipeline_job_results',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('job_id', sa.String(), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('results', sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_pipeline_job_results_job_seq', 'pipeline_job_results', ['job_id', 'seq'])
+
+
+def downgrade() -> None:
+    """Drop pipeline_job_results and pipeline_jobs.result_mode"""
+    op.drop_index('ix_pipeline_job_results_job_seq', table_name='pipeline_job_results')
+    op.drop_table('pipeline_job_results')
+    op.drop_column('pipeline_jobs', 'result_mode')
@@ -0,0 +1,51 @@
+"""Add pipeline_jobs table for the background expense pipeline queue
+
+Revision ID: add_pipeline_jobs
+Revises: add_group_balance_ledger
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_pipeline_jobs'
+down_revision = 'add_group_balance_ledger'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create pipeline_jobs (persistent job queue shared by all workers)"""
+
+    # ── Create pipeline_jobs table ─────────────────────────────────────────
+    op.create_table(
+        'pipeline_jobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('worker_id', sa.String(), nullable=True),
+        sa.Column('queued_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_pipeline_jobs_status', 'pipeline_jobs', ['status'])
+    op.create_index('ix_pipeline_jobs_queued_at', 'pipeline_jobs', ['queued_at'])
+    op.create_index('ix_pipeline_jobs_expires_at', 'pipeline_jobs', ['expires_at'])
+
+
+def downgrade() -> None:
+    """Drop pipeline_jobs table"""
+    op.drop_index('ix_pipeline_jobs_expires_at', table_name='pipeline_jobs')
+    op.drop_index('ix_pipeline_jobs_queued_at', table_name='pipeline_jobs')
+    op.drop_index('ix_pipeline_jobs_status', table_name='pipeline_jobs')
+    op.drop_table('pipeline_jobs')
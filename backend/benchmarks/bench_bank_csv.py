@@ -0,0 +1,104 @@
+"""
+Bank CSV import: the row-by-row BankCSVParser path used by upload_csv before
+(decode the whole upload, DictReader, categorize every description) vs the
+chunked importer (BankCSVParser.import_csv), on synthetic Chase and generic
+exports. Each run is a fresh interpreter so peak RSS is comparable.
+
+Run from the backend directory:
+    python benchmarks/bench_bank_csv.py --rows 1000000 --chunk-rows 50000
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+MERCHANTS = [
+    "WHOLE FOODS MKT #10234", "UBER   *TRIP", "AMAZON MKTPLACE PMTS", "SQ *BLUE BOTTLE CAFE", "SHELL OIL 57444",
+    "DELTA AIR 0062345", "TST* PIZZA PALACE", "TARGET T-1234", "NETFLIX.COM", "PG&E ELECTRIC BILL", "SPOTIFY USA",
+]
+
+
+def write_csv(path: str, rows: int, layout: str, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        if layout == "chase":
+            f.write("Transaction Date,Post Date,Description,Category,Type,Amount,Memo\n")
+        else:
+            f.write("Posting Date,Merchant,Transaction Amount\n")
+        for i in range(rows):
+            day = f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/20{rng.randint(19, 24)}"
+            merchant = rng.choice(MERCHANTS)
+            cents = rng.randint(100, 2_000_000)
+            amount = f"{-cents / 100:.2f}" if rng.random() < 0.9 else f"{cents / 100:,.2f}"
+            if layout == "chase":
+                f.write(f'{day},{day},{merchant},Shopping,Sale,"{amount}",\n')
+            else:
+                f.write(f'{day},{merchant},"${amount}"\n')
+
+
+def run_one(method: str, path: str, chunk_rows: int) -> None:
+    """Child process: import the file once, print seconds, rows and peak RSS."""
+    from transaction_categorizer import TransactionCategorizer
+    from utils.csv_parser import BankCSVParser
+
+    categorizer = TransactionCategorizer()
+    t0 = time.perf_counter()
+    if method == "rows":
+        with open(path, "rb") as f:
+            content = f.read().decode("utf-8")
+        parsed = BankCSVParser.auto_detect_format(content)
+        transactions = parsed["transactions"]
+        BankCSVParser.suggest_card_details(transactions)
+        categories, _ = categorizer.categorize_many([t["description"] for t in transactions])
+        spending = {}
+        for t, category in zip(transactions, categories.tolist()):
+            spending[category] = spending.get(category, 0) + t["amount"]
+        count = len(transactions)
+    else:
+        with open(path, "rb") as f:
+            count = BankCSVParser.import_csv(f, categorizer, chunk_rows=chunk_rows)["transaction_count"]
+    elapsed = time.perf_counter() - t0
+    print(elapsed, count, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+
+
+def measure(method: str, path: str, chunk_rows: int):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", method, "--file", path, "--chunk-rows", str(chunk_rows)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(out[0]), int(out[1]), float(out[2])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--child", choices=["rows", "chunked"])
+    parser.add_argument("--file")
+    args = parser.parse_args()
+
+    if args.child:
+        run_one(args.child, args.file, args.chunk_rows)
+        return
+
+    tmp = tempfile.mkdtemp()
+    print(f"\n--- Bank CSV import, {args.rows:,} rows (chunks of {args.chunk_rows:,}) ---")
+    print(f"{'layout':<9}{'MB':>6}{'method':>10}{'seconds':>10}{'rows/s':>12}{'peak RSS MB':>13}")
+    for layout in ("chase", "generic"):
+        path = os.path.join(tmp, f"{layout}.csv")
+        write_csv(path, args.rows, layout)
+        size_mb = os.path.getsize(path) / 1e6
+        for method in ("rows", "chunked"):
+            seconds, count, rss = measure(method, path, args.chunk_rows)
+            print(f"{layout:<9}{size_mb:>6.0f}{method:>10}{seconds:>10.2f}{count / seconds:>12,.0f}{rss:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
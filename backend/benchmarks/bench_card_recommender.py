@@ -0,0 +1,113 @@
+"""
+N-card (masked) card recommender over wallets of 1..16 cards: per-transaction
+latency of a single recommend() call and of recommend_batch(), and vectorized
+vs per-card feature construction.
+
+Uses ml/artifacts/card_recommender_masked.npz when it exists, otherwise random
+weights (timings do not depend on the weights).
+
+Run from the backend directory:
+    python benchmarks/bench_card_recommender.py --batch 1000 --max-cards 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.model_provider import ML_MODELS_PATH
+
+sys.path.append(ML_MODELS_PATH)
+
+from card_recommender import (
+    DEFAULT_MASKED_NPZ_PATH,
+    MASKED_LINEAR_LAYERS,
+    WALLET_FEATURES,
+    CardRecommender,
+    wallet_arrays,
+    wallet_features,
+)
+
+
+def random_weights(seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    dims = [len(WALLET_FEATURES), 32, 16, 1]
+    weights = {}
+    for name, n_in, n_out in zip(MASKED_LINEAR_LAYERS, dims, dims[1:]):
+        weights[f"{name}.weight"] = rng.normal(0, 1 / np.sqrt(n_in), (n_out, n_in))
+        weights[f"{name}.bias"] = np.zeros(n_out)
+    return weights
+
+
+def wallet(rng, n: int) -> list:
+    return [
+        {"id": i, "name": f"card {i}", "limit": float(rng.uniform(500, 2000)),
+         "balance": float(rng.uniform(0, 1500)), "rewards_rate": 0.02}
+        for i in range(n)
+    ]
+
+
+def per_card_features(amount: float, cards: list) -> list:
+    """The hand-written, one-card-at-a-time equivalent of wallet_features."""
+    available = [max(c["limit"] - c["balance"], 0.0) for c in cards]
+    total = sum(available)
+    rows, seen_cover = [], False
+    for i, (c, avail) in enumerate(zip(cards, available)):
+        covers = avail >= amount
+        rows.append([
+            np.log1p(amount), np.log1p(avail), min(avail / amount, 10.0), c["balance"] / c["limit"],
+            c["rewards_rate"] * 100, float(covers), float(covers and not seen_cover),
+            np.log((avail / total if total > 0 else 0.0) + 1e-6), i / max(len(cards) - 1, 1),
+        ])
+        seen_cover = seen_cover or covers
+    return rows
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--max-cards", type=int, default=16)
+    parser.add_argument("--single-calls", type=int, default=200)
+    args = parser.parse_args()
+
+    if DEFAULT_MASKED_NPZ_PATH.exists():
+        rec = CardRecommender(arch="masked")
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "card_recommender_masked.npz")
+        np.savez(path, **random_weights())
+        rec = CardRecommender(arch="masked", masked_npz_path=path)
+
+    rng = np.random.default_rng(42)
+    print(f"\n--- Masked card recommender, batch of {args.batch} ---")
+    print(f"{'cards':>5}{'single us/txn':>15}{'batch us/txn':>14}{'features vec us':>17}{'features loop us':>18}")
+    for n in range(1, args.max_cards + 1):
+        wallets = [wallet(rng, n) for _ in range(args.batch)]
+        amounts = rng.uniform(10, 500, args.batch)
+        txns = [{"transaction_amount": float(a), "cards": w} for a, w in zip(amounts, wallets)]
+
+        single = best_of(lambda: [rec.recommend(t["transaction_amount"], t["cards"]) for t in txns[: args.single_calls]])
+        batch = best_of(lambda: rec.recommend_batch(txns))
+        vec = best_of(lambda: wallet_features(amounts, *wallet_arrays(wallets)))
+        loop = best_of(lambda: [per_card_features(a, w) for a, w in zip(amounts, wallets)])
+
+        print(
+            f"{n:>5}{single / args.single_calls * 1e6:>15.1f}{batch / args.batch * 1e6:>14.1f}"
+            f"{vec / args.batch * 1e6:>17.2f}{loop / args.batch * 1e6:>18.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
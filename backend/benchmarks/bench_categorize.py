@@ -0,0 +1,83 @@
+"""
+Keyword-scan categorization (original) vs the shared KeywordMatcher on
+synthetic bank statement lines.
+
+Run from the backend directory:
+    python benchmarks/bench_categorize.py --rows 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.settlement_service import CATEGORY_KEYWORDS, detect_categories, detect_category
+from services.merchant_cache import MerchantCategoryCache
+from transaction_categorizer import TransactionCategorizer
+
+MERCHANTS = [
+    "POS PURCHASE WHOLE FOODS MKT #10234", "UBER   *TRIP HELP.UBER.COM", "AMAZON MKTPLACE PMTS AMZN.COM/BILL",
+    "SQ *BLUE BOTTLE CAFE OAKLAND CA", "SHELL OIL 57444 SAN JOSE", "DELTA AIR 0062345 ATLANTA", "TST* PIZZA PALACE",
+    "CHECKCARD 0412 TARGET T-1234", "NETFLIX.COM LOS GATOS", "ZELLE PAYMENT TO JOHN SMITH", "PG&E ELECTRIC BILL",
+    "COMCAST INTERNET", "SPOTIFY USA", "ATM WITHDRAWAL 0042", "VENMO CASHOUT", "TRADER JOE S #552",
+]
+
+
+def synthetic_lines(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [f"{rng.choice(MERCHANTS)} {rng.randint(1, 31):02d}/{rng.randint(1, 12):02d}" for _ in range(n)]
+
+
+def scan_detect_category(merchant: str) -> str:
+    merchant = merchant.lower()
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(x in merchant for x in keywords):
+            return category
+    return "general"
+
+
+def scan_categorize(categorizer, description: str):
+    desc_lower = description.lower()
+    for keyword, cat_idx in categorizer.keyword_map.items():
+        if keyword in desc_lower:
+            return categorizer.CATEGORIES[cat_idx], 0.95
+    return categorizer.CATEGORIES[-1], 0.30
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    lines = synthetic_lines(args.rows)
+    categorizer = TransactionCategorizer(cache=MerchantCategoryCache(max_size=50000))
+
+    ref, ref_s = timed(lambda: [scan_detect_category(x) for x in lines])
+    one, one_s = timed(lambda: [detect_category(x) for x in lines])
+    many, many_s = timed(lambda: detect_categories(lines))
+    cref, cref_s = timed(lambda: [scan_categorize(categorizer, x) for x in lines])
+    cnew, cnew_s = timed(lambda: [categorizer._categorize(x) for x in lines])
+    cached, cached_s = timed(lambda: [categorizer.categorize(x) for x in lines])
+
+    print("\n--- Merchant categorization ---")
+    print("Rows                       :", args.rows)
+    print("detect_category (scan)     :", f"{ref_s:.3f}s  {ref_s / len(lines) * 1e6:.2f}us/row")
+    print("detect_category (matcher)  :", f"{one_s:.3f}s  {one_s / len(lines) * 1e6:.2f}us/row")
+    print("detect_categories (batch)  :", f"{many_s:.3f}s  {many_s / len(lines) * 1e6:.2f}us/row")
+    print("categorize (scan)          :", f"{cref_s:.3f}s  {cref_s / len(lines) * 1e6:.2f}us/row")
+    print("categorize (matcher)       :", f"{cnew_s:.3f}s  {cnew_s / len(lines) * 1e6:.2f}us/row")
+    print("categorize (merchant cache):", f"{cached_s:.3f}s  {cached_s / len(lines) * 1e6:.2f}us/row")
+    print("Cache hit rate             :", categorizer.cache.stats()["hit_rate"])
+    print("Identical                  :", ref == one == many and cref == cnew == cached)
+
+
+if __name__ == "__main__":
+    main()
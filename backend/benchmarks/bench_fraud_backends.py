@@ -0,0 +1,67 @@
+"""
+Fraud model backends: native XGBoost booster vs compiled NumPy evaluator.
+
+Reports single-row latency percentiles, batch throughput and the max
+probability difference between the two backends.
+
+Run from the backend directory:
+    python benchmarks/bench_fraud_backends.py --single 5000 --rows 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.fraud_service import FraudModelXGB
+from benchmarks.bench_fraud_batch import synthetic_rows
+
+
+def single_row_latency_us(model: FraudModelXGB, rows: list) -> np.ndarray:
+    out = np.empty(len(rows))
+    for i, r in enumerate(rows):
+        t0 = time.perf_counter()
+        model.predict_proba(r)
+        out[i] = (time.perf_counter() - t0) * 1e6
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--single", type=int, default=5000, help="Single-row calls per backend")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per batch")
+    parser.add_argument("--repeat", type=int, default=5, help="Batch repetitions (best time is reported)")
+    args = parser.parse_args()
+
+    X = synthetic_rows(args.rows)
+    singles = synthetic_rows(args.single, seed=7).tolist()
+
+    probs = {}
+    print("\n--- Fraud model backends ---")
+    for backend in ("xgboost", "compiled"):
+        model = FraudModelXGB(backend=backend)
+        model.load()
+
+        lat = single_row_latency_us(model, singles)
+        p50, p99 = np.percentile(lat, [50, 99])
+
+        batch_s = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            probs[backend] = model.predict_proba_batch(X)
+            batch_s = min(batch_s, time.perf_counter() - t0)
+
+        print(f"[{backend}]")
+        print("  Single-row p50   :", f"{p50:.1f}us")
+        print("  Single-row p99   :", f"{p99:.1f}us")
+        print("  Batch throughput :", f"{args.rows / batch_s:,.0f} rows/s ({args.rows} rows)")
+
+    diff = float(np.abs(probs["xgboost"].astype(np.float64) - probs["compiled"]).max())
+    print("Max |diff|          :", f"{diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Fraud scoring throughput: per-row predict_proba vs predict_proba_batch.
+
+Run from the backend directory:
+    python benchmarks/bench_fraud_batch.py --rows 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.fraud_service import FraudModelXGB
+
+
+def synthetic_rows(n: int, seed: int = 42) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    hour = rng.uniform(0, 24, n)
+    dow = rng.integers(0, 7, n)
+    limit = rng.uniform(500, 10000, n)
+    balance = rng.uniform(0, 1, n) * limit
+    return np.column_stack([
+        rng.lognormal(3.5, 1.2, n),
+        np.sin(2 * np.pi * hour / 24), np.cos(2 * np.pi * hour / 24),
+        np.sin(2 * np.pi * dow / 7), np.cos(2 * np.pi * dow / 7),
+        limit, balance, balance / limit,
+        rng.exponential(20, n),
+        rng.integers(0, 12, n),
+        np.zeros(n),
+    ]).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per batch")
+    parser.add_argument("--repeat", type=int, default=5, help="Batch repetitions (best time is reported)")
+    args = parser.parse_args()
+
+    model = FraudModelXGB()
+    model.load()
+    X = synthetic_rows(args.rows)
+    rows = X.tolist()
+
+    t0 = time.perf_counter()
+    per_row = np.array([model.predict_proba(r) for r in rows], dtype=np.float32)
+    per_row_s = time.perf_counter() - t0
+
+    batch_s = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        batch = model.predict_proba_batch(X)
+        batch_s = min(batch_s, time.perf_counter() - t0)
+
+    print("\n--- Fraud scoring throughput ---")
+    print("Rows              :", args.rows)
+    print("Per-row path      :", f"{per_row_s:.3f}s ({args.rows / per_row_s:,.0f} rows/s)")
+    print("Batch path        :", f"{batch_s:.4f}s ({args.rows / batch_s:,.0f} rows/s)")
+    print("Speedup           :", f"{per_row_s / batch_s:.1f}x")
+    print("Max |diff|        :", f"{float(np.abs(per_row - batch).max()):.2e}")
+
+
+if __name__ == "__main__":
+    main()
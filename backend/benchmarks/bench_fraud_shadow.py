@@ -0,0 +1,77 @@
+"""
+Primary fraud scoring latency with and without shadow scoring enabled.
+
+The candidate defaults to a second XGBoost instance; pass --candidate tf
+(with TensorFlow installed and a trained ml/artifacts/fraud_tf model) to
+shadow the Keras model instead.
+
+Run from the backend directory:
+    python benchmarks/bench_fraud_shadow.py --requests 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.fraud_service import FraudModelXGB
+from ml.fraud_shadow import FraudShadowScorer, build_candidate
+from benchmarks.bench_fraud_batch import synthetic_rows
+
+
+def primary_latency_us(model: FraudModelXGB, rows: list, shadow=None, gap_ms: float = 0.0) -> np.ndarray:
+    out = np.empty(len(rows))
+    for i, r in enumerate(rows):
+        t0 = time.perf_counter()
+        pred = model.predict(r)
+        if shadow is not None:
+            shadow.observe(r, pred.probability, pred.threshold)
+        out[i] = (time.perf_counter() - t0) * 1e6
+        if gap_ms:
+            time.sleep(gap_ms / 1000.0)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--candidate", default="xgboost", choices=["tf", "xgboost", "compiled"])
+    parser.add_argument("--queue", type=int, default=1000, help="Shadow queue size")
+    parser.add_argument(
+        "--gap-ms", type=float, default=1.0,
+        help="Idle time between requests; 0 saturates the CPU, which no serving worker does",
+    )
+    args = parser.parse_args()
+
+    primary = FraudModelXGB()
+    primary.load()
+    candidate = build_candidate(args.candidate)
+    candidate.load()
+
+    rows = synthetic_rows(args.requests).tolist()
+    primary_latency_us(primary, rows[:200])  # warm-up
+
+    base = primary_latency_us(primary, rows, gap_ms=args.gap_ms)
+
+    shadow = FraudShadowScorer(candidate, max_queue=args.queue)
+    shadow.start()
+    with_shadow = primary_latency_us(primary, rows, shadow, gap_ms=args.gap_ms)
+    time.sleep(0.5)
+    shadow.stop()
+    stats = shadow.stats()
+
+    print("\n--- Shadow scoring overhead ---")
+    print("Gap between reqs  :", f"{args.gap_ms}ms")
+    for name, lat in (("Shadow off", base), ("Shadow on", with_shadow)):
+        p50, p99 = np.percentile(lat, [50, 99])
+        print(f"{name:<18}: p50={p50:.1f}us p99={p99:.1f}us mean={lat.mean():.1f}us")
+    print("Mean regression   :", f"{(with_shadow.mean() / base.mean() - 1) * 100:+.1f}%")
+    print("Compared / dropped:", stats["compared"], "/", stats["dropped"])
+    print("Verdict agreement :", stats["verdict_agreement"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Cold import cost of the backend app: runs `python -X importtime -c "import main"`
+in fresh interpreters and reports the median total plus the heaviest top-level
+packages, so before/after comparisons of lazy imports are one command.
+
+Run from the backend directory (compare with `git stash` / another checkout):
+    python benchmarks/bench_import_time.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile(module: str) -> dict:
+    """Self time per top-level package (us) and the cumulative time of `module`."""
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:////tmp/bench_import_time.db")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    per_package = defaultdict(int)
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        per_package[name.strip().split(".")[0]] += int(self_us)
+        if name.strip() == module:
+            total_us = int(cumulative_us)
+    return {"total_us": total_us, "per_package": per_package}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [profile(args.module) for _ in range(args.runs)]
+    totals = [r["total_us"] / 1000 for r in runs]
+
+    print(f"\n--- import {args.module} ({args.runs} fresh interpreters) ---")
+    print(f"median {statistics.median(totals):8.1f} ms   min {min(totals):8.1f} ms   max {max(totals):8.1f} ms")
+
+    packages = defaultdict(list)
+    for r in runs:
+        for name, us in r["per_package"].items():
+            packages[name].append(us / 1000)
+    heaviest = sorted(packages.items(), key=lambda kv: -statistics.median(kv[1]))[: args.top]
+    print(f"\n{'package':<24}{'median self ms':>16}")
+    for name, ms in heaviest:
+        print(f"{name:<24}{statistics.median(ms):>16.1f}")
+    loaded = set(packages)
+    print("\nheavy ML packages imported:", ", ".join(p for p in ("torch", "xgboost", "scipy", "sklearn", "tensorflow") if p in loaded) or "none")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Expense persistence in the bulk pipeline: one commit per expense
+(persist_expense) vs chunked multi-row INSERTs (persist_expenses), on a
+file-backed SQLite database so every commit pays its fsync.
+
+Run from the backend directory:
+    python benchmarks/bench_pipeline_persist.py --rows 50000 --chunk-size 1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base
+from services.pipeline_service import persist_expense, persist_expenses, transform_expense
+
+
+def expenses(n: int, prefix: str) -> list:
+    return [
+        transform_expense({"id": f"{prefix}{i}", "description": f"Expense {i}", "amount": 12.5, "payer_id": "alice"})
+        for i in range(n)
+    ]
+
+
+def timed(persist, rows: list, url: str) -> float:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        t0 = time.perf_counter()
+        persist(rows, db)
+        return time.perf_counter() - t0
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--per-row-rows", type=int, default=2000, help="per-row commits are slow; time a sample")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    per_row_n = min(args.per_row_rows, args.rows)
+    per_row = timed(
+        lambda rows, db: [persist_expense(e, db) for e in rows],
+        expenses(per_row_n, "a"), f"sqlite:///{os.path.join(tmp, 'per_row.db')}",
+    )
+    bulk = timed(
+        lambda rows, db: persist_expenses(rows, db, chunk_size=args.chunk_size),
+        expenses(args.rows, "b"), f"sqlite:///{os.path.join(tmp, 'bulk.db')}",
+    )
+
+    per_row_rate = per_row_n / per_row
+    bulk_rate = args.rows / bulk
+    print(f"\n--- Persisting expenses (SQLite file, chunk size {args.chunk_size}) ---")
+    print(f"{'commit per row':<18}{per_row_rate:>12,.0f} rows/s   ({per_row_n:,} rows in {per_row:.2f} s)")
+    print(f"{'chunked INSERT':<18}{bulk_rate:>12,.0f} rows/s   ({args.rows:,} rows in {bulk:.2f} s)")
+    print(f"speedup: {bulk_rate / per_row_rate:.1f}x   est. per-row time for {args.rows:,} rows: {args.rows / per_row_rate:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Reward optimizer latency: single-transaction optimize_split and per-transaction
+cost of optimize_batch, for portfolios of 1-20 cards.
+
+Run from the backend directory:
+    python benchmarks/bench_reward_optimizer.py --cards 1,2,5,10,20 --batch 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.reward_optimizer import optimize_batch, optimize_split
+
+MERCHANTS = ["doordash", "whole foods", "delta", "amazon", "shell gas", "pizza hut", "airbnb", "target"]
+CATEGORIES = ["dining", "groceries", "travel", "shopping", "general"]
+
+
+def synthetic_cards(n: int, seed: int = 42, with_fixed_fees: bool = False) -> list:
+    rng = random.Random(seed)
+    cards = []
+    for j in range(n):
+        card = {
+            "name": f"card_{j}",
+            "limit_cents": rng.choice([200000, 500000, 2000000]),
+            "rewards": {c: rng.choice([1.0, 1.5, 2.0, 3.0, 4.0, 5.0]) for c in CATEGORIES},
+        }
+        if rng.random() < 0.5:
+            card["bonus_cap_cents"] = rng.choice([50000, 150000, 600000])
+            card["base_rate_pct"] = 1.0
+        if rng.random() < 0.2:
+            card["fee_pct"] = 3.0
+        if with_fixed_fees and rng.random() < 0.3:
+            card["fee_cents"] = 30
+            card["min_charge_cents"] = 1000
+        cards.append(card)
+    return cards
+
+
+def synthetic_transactions(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [{"amount_cents": rng.randint(200, 30000), "merchant": rng.choice(MERCHANTS)} for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", default="1,2,5,10,15,20")
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--single-iters", type=int, default=300)
+    args = parser.parse_args()
+
+    txns = synthetic_transactions(args.batch)
+    print("\n--- Reward optimizer ---")
+    print("Batch size        :", args.batch)
+    print(f"{'cards':>5} {'single p50 us':>14} {'single+fees us':>15} {'batch s':>8} {'batch us/tx':>12} {'seq s':>7} {'seq us/tx':>10}")
+    for n in (int(s) for s in args.cards.split(",")):
+        cards = synthetic_cards(n)
+        fee_cards = synthetic_cards(n, with_fixed_fees=True)
+
+        def p50(card_set):
+            times = []
+            for t in txns[: args.single_iters]:
+                t0 = time.perf_counter()
+                optimize_split(t["amount_cents"], card_set, t["merchant"])
+                times.append(time.perf_counter() - t0)
+            return statistics.median(times) * 1e6
+
+        single_us, single_fee_us = p50(cards), p50(fee_cards)
+
+        t0 = time.perf_counter()
+        res = optimize_batch(txns, cards)
+        batch_s = time.perf_counter() - t0
+        assert res["method"] == "flow"
+
+        t0 = time.perf_counter()
+        seq = optimize_batch(txns, fee_cards)
+        seq_s = time.perf_counter() - t0
+
+        print(f"{n:>5} {single_us:>14.1f} {single_fee_us:>15.1f} {batch_s:>8.3f} {batch_s / len(txns) * 1e6:>12.1f} "
+              f"{seq_s:>7.2f} {seq_s / len(txns) * 1e6:>10.1f}  ({seq['method']})")
+
+
+if __name__ == "__main__":
+    main()
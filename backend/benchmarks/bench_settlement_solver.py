@@ -0,0 +1,56 @@
+"""
+Greedy minimize_transactions vs the minimum-transfer solver on synthetic groups.
+
+Balances come from synthetic group ledgers (bench_settlements.synthetic_ledger),
+so they have the repeated shares real groups produce. Reports transfer counts
+and solve time per group size.
+
+Run from the backend directory:
+    python benchmarks/bench_settlement_solver.py --sizes 5,10,20,50,500,5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.settlement_engine import calculate_balances_vectorized
+from services.settlement_optimizer import solve_min_transfers
+from services.settlement_service import minimize_transactions
+
+from bench_settlements import synthetic_ledger
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="5,10,15,20,50,100,500,1000,5000")
+    parser.add_argument("--expenses-per-person", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    print("\n--- Settlement solver: greedy vs min-transfer ---")
+    print("Time budget       :", f"{args.budget_ms:.0f}ms")
+    print(f"{'members':>8} {'nonzero':>8} {'greedy':>8} {'solver':>8} {'saved':>7} "
+          f"{'greedy ms':>10} {'solver ms':>10}  method")
+    for people in (int(s) for s in args.sizes.split(",")):
+        ledger = synthetic_ledger(people * args.expenses_per_person, people, seed=people)
+        balances = calculate_balances_vectorized(ledger)
+        nonzero = sum(1 for b in balances.values() if b)
+
+        t0 = time.perf_counter()
+        greedy = minimize_transactions(balances)
+        greedy_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        plan = solve_min_transfers(balances, args.budget_ms)
+        solver_ms = (time.perf_counter() - t0) * 1000
+
+        n_greedy, n_solver = len(greedy), len(plan["transactions"])
+        method = plan["solver"] + (" (timed out)" if plan["timed_out"] else "")
+        print(f"{people:>8} {nonzero:>8} {n_greedy:>8} {n_solver:>8} {n_greedy - n_solver:>7} "
+              f"{greedy_ms:>10.2f} {solver_ms:>10.2f}  {method}")
+
+
+if __name__ == "__main__":
+    main()
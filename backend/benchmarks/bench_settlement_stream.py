@@ -0,0 +1,52 @@
+"""
+minimize_transactions vs iter_transactions (heap-backed generator) on very large
+balance maps: wall time and peak traced memory while consuming every transfer.
+
+Run from the backend directory:
+    python benchmarks/bench_settlement_stream.py --sizes 10000,50000,200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.settlement_service import iter_transactions, minimize_transactions
+
+
+def synthetic_balances(n: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    values = [rng.randint(-100000, 100000) for _ in range(n - 1)]
+    values.append(-sum(values))
+    return {f"user_{i}": v for i, v in enumerate(values)}
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,50000,200000")
+    args = parser.parse_args()
+
+    print("\n--- Streaming settlement ---")
+    print(f"{'members':>8} {'transfers':>10} {'list s':>8} {'list MB':>8} {'stream s':>9} {'stream MB':>10}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        balances = synthetic_balances(n)
+        count, list_s, list_mb = measure(lambda: len(minimize_transactions(balances)))
+        _, stream_s, stream_mb = measure(lambda: sum(1 for _ in iter_transactions(balances)))
+        print(f"{n:>8} {count:>10} {list_s:>8.2f} {list_mb:>8.1f} {stream_s:>9.2f} {stream_mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+calculate_balances (reference) vs calculate_balances_vectorized on synthetic ledgers.
+
+Run from the backend directory:
+    python benchmarks/bench_settlements.py --expenses 100000 --people 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.settlement_service import calculate_balances
+from services.settlement_engine import calculate_balances_vectorized
+
+
+def synthetic_ledger(n: int, people: int, seed: int = 42) -> list:
+    """Group-style ledger: a handful of recurring member sets, mixed split types."""
+    rng = random.Random(seed)
+    names = [f"user_{i}" for i in range(people)]
+    member_sets = [rng.sample(names, rng.randint(2, min(8, people))) for _ in range(max(people // 2, 1))]
+    expenses = []
+    for _ in range(n):
+        members = rng.choice(member_sets)
+        amount = rng.randint(100, 50000)
+        split_type = rng.choice(["equal", "equal", "equal", "custom", "percentage"])
+        e = {"payer": rng.choice(members), "amount_cents": amount, "members": members, "split_type": split_type}
+        if split_type == "custom":
+            cuts = sorted(rng.randint(0, amount) for _ in range(len(members) - 1))
+            parts = [b - a for a, b in zip([0] + cuts, cuts + [amount])]
+            e["splits"] = [{"user": m, "amount_cents": p} for m, p in zip(members, parts)]
+        elif split_type == "percentage":
+            weights = [rng.random() for _ in members]
+            total = sum(weights)
+            e["splits"] = [{"user": m, "percentage": round(100 * w / total, 2)} for m, w in zip(members, weights)]
+        expenses.append(e)
+    return expenses
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--expenses", type=int, default=100000)
+    parser.add_argument("--people", type=int, default=50)
+    args = parser.parse_args()
+
+    ledger = synthetic_ledger(args.expenses, args.people)
+    ref, ref_s = timed(calculate_balances, ledger)
+    vec, vec_s = timed(calculate_balances_vectorized, ledger)
+
+    print("\n--- Settlement balances ---")
+    print("Expenses / people :", args.expenses, "/", args.people)
+    print("Reference         :", f"{ref_s:.3f}s")
+    print("Vectorized        :", f"{vec_s:.3f}s")
+    print("Speedup           :", f"{ref_s / vec_s:.1f}x")
+    print("Identical         :", ref == vec)
+
+
+if __name__ == "__main__":
+    main()
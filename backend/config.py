@@ -49,6 +49,58 @@ class Settings(BaseSettings):
     FRAUD_XGB_MODEL_PATH: str = "ml/artifacts/fraud_xgb/fraud_xgb_model.json"
     FRAUD_THRESHOLD: float = 0.93
     FRAUD_MODE: str = "strict"
+    FRAUD_MODEL_BACKEND: str = "xgboost"  # xgboost | compiled
+    # Micro-batching of concurrent single-row scoring requests
+    FRAUD_BATCH_ENABLED: bool = True
+    FRAUD_BATCH_MAX_SIZE: int = 64
+    FRAUD_BATCH_MAX_WAIT_MS: float = 2.0
+    # Score cache for retried authorizations (keyed on features + model version)
+    FRAUD_CACHE_ENABLED: bool = True
+    FRAUD_CACHE_MAX_SIZE: int = 10000
+    FRAUD_CACHE_TTL_SECONDS: float = 300.0
+    FRAUD_CACHE_QUANTIZE_DECIMALS: Optional[int] = None
+    # Hot reload: poll the model artifact every N seconds (0 = admin POST only)
+    FRAUD_MODEL_WATCH_INTERVAL_S: float = 10.0
+    FRAUD_MODEL_WARMUP_ROWS: int = 8
+    # Shadow scoring: a candidate model scores live traffic off the hot path
+    FRAUD_SHADOW_ENABLED: bool = False
+    FRAUD_SHADOW_BACKEND: str = "tf"  # tf | xgboost | compiled
+    FRAUD_SHADOW_MODEL_PATH: Optional[str] = None
+    FRAUD_SHADOW_QUEUE_SIZE: int = 1000
+    FRAUD_SHADOW_WORKERS: int = 1
+
+    # ── ML warm-up ────────────────────────────────────────────────────────────
+    # Load fraud / recommender models in a background thread after startup
+    # (GET /ready reports when they are done); False = load before serving
+    ML_WARMUP_IN_BACKGROUND: bool = True
+    # auto = serve from ml/artifacts/card_recommender.npz (NumPy, no torch) when exported
+    CARD_RECOMMENDER_BACKEND: str = "auto"  # auto | numpy | torch
+    # auto = N-card masked model when ml/artifacts/card_recommender_masked.npz exists
+    CARD_RECOMMENDER_ARCH: str = "auto"  # auto | masked | fixed
+
+    # ── Pipeline jobs ─────────────────────────────────────────────────────────
+    # Background workers per app process claiming queued bulk imports (0 = none;
+    # POST /api/pipeline/jobs/process-queue still runs them)
+    PIPELINE_WORKERS: int = 2
+    PIPELINE_POLL_INTERVAL_S: float = 1.0
+    PIPELINE_JOB_CHUNK_SIZE: int = 500  # rows per progress commit
+    PIPELINE_PERSIST_CHUNK_SIZE: int = 1000  # expenses per bulk INSERT / commit
+    PIPELINE_STREAM_BATCH_SIZE: int = 500  # rows held in memory by POST /api/pipeline/stream
+    # Categorization of streamed batches on a pool (0 = inline); one writer persists
+    PIPELINE_ENRICH_WORKERS: int = 0
+    PIPELINE_ENRICH_EXECUTOR: str = "process"  # process | thread
+    PIPELINE_JOB_MAX_ATTEMPTS: int = 3
+    PIPELINE_JOB_STALE_AFTER_S: float = 300.0  # no heartbeat for this long -> requeue
+    PIPELINE_JOB_TTL_SECONDS: float = 86400.0  # finished jobs (and results) kept this long
+    PIPELINE_RESULTS_PAGE_SIZE: int = 1000  # stored results returned per GET /jobs/{job_id}
+
+    # ── Settlements ───────────────────────────────────────────────────────────
+    SETTLEMENT_SOLVER: str = "greedy"  # greedy | optimal
+    SETTLEMENT_SOLVER_TIME_BUDGET_MS: float = 250.0
+
+    # ── Categorization ────────────────────────────────────────────────────────
+    # Shared merchant -> category LRU in front of TransactionCategorizer
+    CATEGORY_CACHE_MAX_SIZE: int = 50000
 
     # ── Stripe ────────────────────────────────────────────────────────────────
     STRIPE_SECRET_KEY: Optional[str] = None
@@ -5,6 +5,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import logging
+import threading
+import time
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -12,6 +14,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.responses import JSONResponse
 
 from config import settings
 from routes.health import router as health_router
@@ -21,11 +24,7 @@ from routes.payments import router as payments_router
 from routes.cards import router as cards_router
 from routes.multi_person_splits import router as multi_person_router  # ← NEW LINE
 from models.virtual_card import VirtualCard, SplitPreference
-
-try:
-    from ml.fraud_service import FraudModelXGB
-except Exception:
-    FraudModelXGB = None
+from services.model_provider import models
 
 from routes.analytics import router as analytics_router
 from routes.transactions import router as transactions_router
@@ -40,6 +39,28 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def ready():
+    """
+    Readiness: 503 while the ML warm-up is pending or loading, 200 once it has
+    finished. A failed warm-up is reported (models_ready false, warmup.error)
+    but does not keep the app out of rotation; ML routes degrade as when a
+    model is missing.
+    """
+    warmup = dict(getattr(app.state, "ml_warmup", {"status": "pending"}))
+    warming_up = warmup["status"] in ("pending", "loading")
+    return JSONResponse(
+        {
+            "live": True,
+            "models_ready": warmup["status"] == "ready",
+            "warmup": warmup,
+            "fraud_model": getattr(app.state, "fraud_model", None) is not None,
+            "models": models.status(),
+        },
+        status_code=503 if warming_up else 200,
+    )
+
+
 class CoopMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         response = await call_next(request)
@@ -91,6 +112,12 @@ except Exception as e:
     plaid_router = None
     logger.warning(f"Plaid routes disabled (reason: {e})")
 
+try:
+    from routes.pipeline import router as pipeline_router
+except Exception as e:
+    pipeline_router = None
+    logger.warning(f"Pipeline routes disabled (reason: {e})")
+
 try:
     from routes.webhook_split import router as webhook_split_router
 except Exception as e:
@@ -119,6 +146,8 @@ if plaid_router:
     app.include_router(plaid_router)
 if webhook_split_router:
     app.include_router(webhook_split_router)
+if pipeline_router:
+    app.include_router(pipeline_router)
 
 
 # ── Startup ───────────────────────────────────────────────────────────────────
@@ -128,12 +157,14 @@ def on_startup():
         from db import engine
         from models import Base
         from models.user import User
-        from models.group import Group
+        from models.group import Group, GroupMember
         from models.expense import Expense
         from models.payment import Payment
         from models.card import Card
         from models.virtual_card import VirtualCard, SplitPreference
         from models.split_transaction import SplitTransaction, SplitParticipant, SplitInvitation  # ← NEW LINE
+        from models.group_ledger import GroupLedgerEntry, GroupBalance
+        from models.pipeline_job import PipelineJob, PipelineJobResult
 
         Base.metadata.create_all(bind=engine)
         logger.info("DB tables ensured.")
@@ -153,7 +184,80 @@ def on_startup():
         logger.warning(f"DB not ready. Error: {e}")
 
     app.state.fraud_model = None
+    app.state.fraud_registry = None
+    app.state.fraud_shadow = None
     app.state.fraud_threshold = getattr(settings, "FRAUD_THRESHOLD", 0.93)
+    app.state.ml_warmup = {"status": "pending", "elapsed_ms": None}
+    app.state.pipeline_workers = start_pipeline_workers()
+
+    # xgboost / torch imports and model loads happen here, not at import time;
+    # in the background the app already answers /health while they run
+    if settings.ML_WARMUP_IN_BACKGROUND:
+        threading.Thread(target=warm_up_ml, name="ml-warmup", daemon=True).start()
+    else:
+        warm_up_ml()
+
+
+def start_pipeline_workers():
+    if settings.PIPELINE_WORKERS <= 0:
+        return None
+    try:
+        from db import SessionLocal
+        from services.job_queue import JobWorkerPool
+
+        pool = JobWorkerPool(
+            SessionLocal,
+            workers=settings.PIPELINE_WORKERS,
+            poll_interval_s=settings.PIPELINE_POLL_INTERVAL_S,
+            chunk_size=settings.PIPELINE_JOB_CHUNK_SIZE,
+            ttl_seconds=settings.PIPELINE_JOB_TTL_SECONDS,
+            max_attempts=settings.PIPELINE_JOB_MAX_ATTEMPTS,
+            stale_after_s=settings.PIPELINE_JOB_STALE_AFTER_S,
+        )
+        pool.start()
+        return pool
+    except Exception as e:
+        logger.warning(f"Pipeline workers not started. Error: {e}")
+        return None
+
+
+def warm_up_ml():
+    t0 = time.perf_counter()
+    app.state.ml_warmup = {"status": "loading", "elapsed_ms": None}
+    warmup = {"status": "failed", "error": "ML warm-up was interrupted"}
+    try:
+        load_fraud_models()
+
+        # Build the shared ML models once per worker (each load time is logged)
+        load_times = models.load_all()
+        logger.info(
+            "ML models: "
+            + ", ".join(f"{name}={'%.1f ms' % ms if ms is not None else 'unavailable'}" for name, ms in load_times.items())
+        )
+        warmup = {"status": "ready"}
+    except Exception as e:
+        warmup = {"status": "failed", "error": str(e)}
+        logger.exception("ML warm-up failed")
+    finally:
+        # Never leave "loading" behind: /ready and require_ml_warm would answer 503 forever
+        elapsed_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+        app.state.ml_warmup = {**warmup, "elapsed_ms": elapsed_ms}
+        logger.info(f"ML warm-up {warmup['status']} after {elapsed_ms} ms")
+
+
+def load_fraud_models():
+    try:
+        from ml.fraud_service import FraudModelXGB
+        from ml.fraud_batcher import FraudMicroBatcher
+        from ml.fraud_cache import FraudScoreCache
+        from ml.fraud_registry import FraudModelRegistry
+        from ml.fraud_shadow import FraudShadowScorer, build_candidate
+    except Exception:
+        FraudModelXGB = None
+        FraudMicroBatcher = None
+        FraudScoreCache = None
+        FraudModelRegistry = None
+        FraudShadowScorer = None
 
     try:
         repo_root = Path(__file__).resolve().parents[1]
@@ -163,12 +267,44 @@ def on_startup():
             logger.warning(f"Fraud model not found at {model_path}.")
         else:
             if FraudModelXGB is not None:
-                model = FraudModelXGB(
-                    model_path=str(model_path),
-                    default_threshold=float(getattr(settings, "FRAUD_THRESHOLD", 0.93)),
+                # One cache shared by every model version; load() clears it on swap
+                cache = FraudScoreCache(
+                    max_size=settings.FRAUD_CACHE_MAX_SIZE,
+                    ttl_seconds=settings.FRAUD_CACHE_TTL_SECONDS,
+                    quantize_decimals=settings.FRAUD_CACHE_QUANTIZE_DECIMALS,
+                ) if settings.FRAUD_CACHE_ENABLED else None
+                batcher = None
+
+                def build(path):
+                    return FraudModelXGB(
+                        model_path=str(path),
+                        default_threshold=float(getattr(settings, "FRAUD_THRESHOLD", 0.93)),
+                        backend=settings.FRAUD_MODEL_BACKEND,
+                        cache=cache,
+                    )
+
+                def publish(new_model):
+                    # Single attribute assignment: requests already holding the
+                    # old model finish on it, new requests see the new one.
+                    if batcher is not None:
+                        batcher.model = new_model
+                    else:
+                        app.state.fraud_model = new_model
+
+                registry = FraudModelRegistry(
+                    model_path, build, publish, warmup_rows=settings.FRAUD_MODEL_WARMUP_ROWS
                 )
-                model.load()
-                app.state.fraud_model = model
+                model = registry.load_initial()
+                if settings.FRAUD_BATCH_ENABLED and FraudMicroBatcher is not None:
+                    batcher = FraudMicroBatcher(
+                        model,
+                        max_batch_size=settings.FRAUD_BATCH_MAX_SIZE,
+                        max_wait_ms=settings.FRAUD_BATCH_MAX_WAIT_MS,
+                    )
+                    batcher.start()
+                    app.state.fraud_model = batcher
+                registry.start_watching(settings.FRAUD_MODEL_WATCH_INTERVAL_S)
+                app.state.fraud_registry = registry
             else:
                 import xgboost as xgb
                 booster = xgb.Booster()
@@ -179,11 +315,51 @@ def on_startup():
         logger.warning(f"Fraud model load failed. Error: {e}")
         app.state.fraud_model = None
 
+    if settings.FRAUD_SHADOW_ENABLED and FraudShadowScorer is not None:
+        try:
+            candidate = build_candidate(
+                settings.FRAUD_SHADOW_BACKEND,
+                model_path=settings.FRAUD_SHADOW_MODEL_PATH,
+                default_threshold=float(getattr(settings, "FRAUD_THRESHOLD", 0.93)),
+            )
+            candidate.load()
+            shadow = FraudShadowScorer(
+                candidate,
+                max_queue=settings.FRAUD_SHADOW_QUEUE_SIZE,
+                workers=settings.FRAUD_SHADOW_WORKERS,
+            )
+            shadow.start()
+            app.state.fraud_shadow = shadow
+            logger.info(f"Fraud shadow scoring enabled with candidate {candidate.version}.")
+        except Exception as e:
+            logger.warning(f"Fraud shadow model load failed. Error: {e}")
+
     loaded = app.state.fraud_model is not None
     ready = bool(getattr(app.state.fraud_model, "ready", loaded))
     print("FRAUD MODEL LOADED?", loaded, "READY?", ready)
 
 
+@app.on_event("shutdown")
+def on_shutdown():
+    registry = getattr(app.state, "fraud_registry", None)
+    if registry is not None:
+        registry.stop_watching()
+    shadow = getattr(app.state, "fraud_shadow", None)
+    if shadow is not None:
+        shadow.stop()
+    model = getattr(app.state, "fraud_model", None)
+    if hasattr(model, "stop"):
+        model.stop()
+    workers = getattr(app.state, "pipeline_workers", None)
+    if workers is not None:
+        workers.stop()
+    try:
+        from services.pipeline_service import shutdown_enrich_pools
+        shutdown_enrich_pools()
+    except Exception:
+        pass
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=3001, reload=True)
\ No newline at end of file
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .fraud_service import FraudPrediction
+
+
+_STOP = object()
+
+# Upper bounds of the batch-size histogram buckets (last bucket is open-ended)
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class BatcherStats:
+    """Thread-safe counters for tuning the batching window against latency."""
+
+    def __init__(self, window: int = 4096):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+        self.batch_size_hist = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._wait_ms: deque = deque(maxlen=window)
+        self._score_ms: deque = deque(maxlen=window)
+
+    def record_batch(self, size: int, waits_ms: List[float], score_ms: float, failed: bool = False) -> None:
+        with self._lock:
+            self.batches += 1
+            self.rows += size
+            if failed:
+                self.errors += 1
+            self.batch_size_hist[bisect.bisect_left(BATCH_SIZE_BUCKETS, size)] += 1
+            self._wait_ms.extend(waits_ms)
+            self._score_ms.append(score_ms)
+
+    @staticmethod
+    def _percentiles(values) -> Dict[str, float]:
+        if not values:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        arr = np.fromiter(values, dtype=np.float64)
+        p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+        return {
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+            "max": round(float(arr.max()), 3),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"<={b}" for b in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+            return {
+                "batches": self.batches,
+                "rows": self.rows,
+                "errors": self.errors,
+                "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+                "batch_size_histogram": dict(zip(labels, self.batch_size_hist)),
+                "wait_ms": self._percentiles(list(self._wait_ms)),
+                "score_ms": self._percentiles(list(self._score_ms)),
+            }
+
+
+class FraudMicroBatcher:
+    """
+    Micro-batching front for FraudModelXGB.
+
+    - Concurrent callers submit single rows; a background worker collects them
+      for up to max_wait_ms (or max_batch_size rows) and scores the whole batch
+      with one predict_proba_batch call.
+    - Exposes the same predict_proba / predict interface as the model, so it can
+      be stored on app.state.fraud_model as a drop-in replacement.
+    - Falls back to direct scoring when the worker is not running.
+    - self.model can be replaced at any time (hot reload); each batch is scored
+      by whichever model was current when the batch was taken.
+    """
+
+    def __init__(self, model, max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.model = model
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait_s = max(float(max_wait_ms), 0.0) / 1000.0
+        self.stats = BatcherStats()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="fraud-micro-batcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def __getattr__(self, name: str):
+        # Delegate ready / input_dim / default_threshold / predict_proba_batch etc.
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    # ---------------------------------------------------------
+    # Prediction
+    # ---------------------------------------------------------
+    def submit(self, features: List[float]) -> Future:
+        """Queue one row; the future resolves to (probability, model_version)."""
+        if len(features) != self.model.input_dim:
+            raise ValueError(f"Expected {self.model.input_dim} features, got {len(features)}")
+
+        fut: Future = Future()
+        self._queue.put((features, fut, time.perf_counter()))
+        return fut
+
+    def _cached(self, model, features: List[float]) -> Optional[Tuple[float, Optional[str]]]:
+        cache = getattr(model, "cache", None)
+        prob = cache.get(features, model.version) if cache is not None else None
+        return (prob, model.version) if prob is not None else None
+
+    def _remember(self, model, features: List[float], scored: Tuple[float, Optional[str]]) -> None:
+        cache = getattr(model, "cache", None)
+        if cache is not None and scored[1] == model.version:
+            cache.put(features, model.version, scored[0])
+
+    def score(self, features: List[float]) -> Tuple[float, Optional[str]]:
+        """Probability plus the version of the model that produced it."""
+        model = self.model
+        if not self.running:
+            return float(model.predict_proba(features)), getattr(model, "version", None)
+
+        cached = self._cached(model, features)
+        if cached is not None:
+            return cached
+        scored = self.submit(features).result()
+        self._remember(model, features, scored)
+        return scored
+
+    async def score_async(self, features: List[float]) -> Tuple[float, Optional[str]]:
+        model = self.model
+        if not self.running:
+            return float(model.predict_proba(features)), getattr(model, "version", None)
+
+        cached = self._cached(model, features)
+        if cached is not None:
+            return cached
+        scored = await asyncio.wrap_future(self.submit(features))
+        self._remember(model, features, scored)
+        return scored
+
+    def predict_proba(self, features: List[float]) -> float:
+        return self.score(features)[0]
+
+    async def predict_proba_async(self, features: List[float]) -> float:
+        return (await self.score_async(features))[0]
+
+    def predict(self, features: List[float], threshold: Optional[float] = None) -> FraudPrediction:
+        thr = self.model.default_threshold if threshold is None else float(threshold)
+        prob, version = self.score(features)
+        return FraudPrediction(probability=prob, threshold=thr, is_fraud=(prob >= thr), model_version=version)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            **self.stats.snapshot(),
+        }
+
+    # ---------------------------------------------------------
+    # Worker
+    # ---------------------------------------------------------
+    def _collect(self, first) -> Tuple[list, bool]:
+        batch = [first]
+        deadline = first[2] + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stopping = self._collect(first)
+            self._score(batch)
+
+        # Drain anything submitted while stopping so no caller hangs
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftovers.append(item)
+        if leftovers:
+            self._score(leftovers)
+
+    def _score(self, batch: list) -> None:
+        started = time.perf_counter()
+        waits_ms = [(started - t) * 1000.0 for _, _, t in batch]
+        model = self.model  # may be swapped by the registry mid-flight
+        try:
+            probs = model.predict_proba_batch([f for f, _, _ in batch])
+        except Exception as e:
+            for _, fut, _ in batch:
+                fut.set_exception(e)
+            self.stats.record_batch(len(batch), waits_ms, (time.perf_counter() - started) * 1000.0, failed=True)
+            return
+
+        version = getattr(model, "version", None)
+        for (_, fut, _), p in zip(batch, probs):
+            fut.set_result((float(p), version))
+        self.stats.record_batch(len(batch), waits_ms, (time.perf_counter() - started) * 1000.0)
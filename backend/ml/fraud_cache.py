@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class FraudScoreCache:
+    """
+    LRU + TTL cache of fraud probabilities.
+
+    - Key = hash(model version + float32 feature bytes), so a new model never
+      serves scores from an old one
+    - quantize_decimals rounds features before hashing (e.g. 2) so retries whose
+      time features drift slightly still hit
+    - Least-recently-used entries are evicted past max_size; entries older
+      than ttl_seconds are treated as misses
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300.0, quantize_decimals: Optional[int] = None):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.max_size = int(max_size)
+        self.ttl_seconds = float(ttl_seconds)
+        self.quantize_decimals = quantize_decimals
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[float, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def key(self, features: List[float], version: str) -> bytes:
+        X = np.asarray(features, dtype=np.float32)
+        if self.quantize_decimals is not None:
+            X = np.round(X, self.quantize_decimals)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(version.encode())
+        h.update(X.tobytes())
+        return h.digest()
+
+    def get(self, features: List[float], version: str) -> Optional[float]:
+        k = self.key(features, version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is None:
+                self.misses += 1
+                return None
+            prob, stored_at = entry
+            if now - stored_at > self.ttl_seconds:
+                del self._entries[k]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(k)
+            self.hits += 1
+            return prob
+
+    def put(self, features: List[float], version: str, prob: float) -> None:
+        k = self.key(features, version)
+        with self._lock:
+            self._entries[k] = (float(prob), time.monotonic())
+            self._entries.move_to_end(k)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "quantize_decimals": self.quantize_decimals,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+
+_SUPPORTED_OBJECTIVES = {"binary:logistic", "reg:logistic", "binary:logitraw"}
+
+
+def _parse_float(value) -> float:
+    # XGBoost >= 2 stores base_score as a string like "[5E-1]"
+    if isinstance(value, str):
+        value = value.strip("[]")
+    return float(value)
+
+
+class CompiledTreeEnsemble:
+    """
+    Flat, array-backed copy of an XGBoost gbtree model for NumPy inference.
+
+    All trees are concatenated into one node table (feature index, threshold,
+    left/right child, default direction, leaf value). Scoring walks every tree
+    for every row at once, one depth level per step, so a single row costs
+    ~max_depth vectorized gathers instead of a DMatrix + C-API round trip.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        base_margin: float,
+        objective: str,
+        num_feature: int,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.base_margin = base_margin
+        self.objective = objective
+        self.num_feature = num_feature
+
+    @property
+    def num_trees(self) -> int:
+        return int(self.roots.shape[0])
+
+    # ---------------------------------------------------------
+    # Loading
+    # ---------------------------------------------------------
+    @classmethod
+    def from_json(cls, path: Union[str, Path]) -> "CompiledTreeEnsemble":
+        path = Path(path)
+        if path.suffix.lower() != ".json":
+            raise ValueError(f"Compiled backend needs a JSON model file, got: {path.name}")
+
+        with open(path, "r") as f:
+            learner = json.load(f)["learner"]
+
+        objective = learner["objective"]["name"]
+        if objective not in _SUPPORTED_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for compiled backend: {objective}")
+
+        booster = learner["gradient_booster"]
+        if booster.get("name") != "gbtree":
+            raise ValueError(f"Unsupported booster for compiled backend: {booster.get('name')}")
+
+        params = learner["learner_model_param"]
+        base_score = _parse_float(params.get("base_score", 0.5))
+        if objective == "binary:logitraw":
+            base_margin = base_score
+        else:
+            base_margin = float(np.log(base_score / (1.0 - base_score)))
+
+        feats, thrs, lefts, rights, dlefts, values, roots = [], [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+        for tree in booster["model"]["trees"]:
+            if any(int(t) != 0 for t in tree.get("split_type", [])):
+                raise ValueError("Categorical splits are not supported by the compiled backend")
+
+            left = np.asarray(tree["left_children"], dtype=np.int64)
+            right = np.asarray(tree["right_children"], dtype=np.int64)
+            cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+            is_leaf = left == -1
+
+            # Leaves point at themselves so traversal can run a fixed number of steps
+            own = np.arange(left.shape[0], dtype=np.int64)
+            lefts.append(np.where(is_leaf, own, left) + offset)
+            rights.append(np.where(is_leaf, own, right) + offset)
+            feats.append(np.where(is_leaf, 0, np.asarray(tree["split_indices"], dtype=np.int64)))
+            thrs.append(np.where(is_leaf, np.float32(np.inf), cond))
+            dlefts.append(np.asarray(tree["default_left"], dtype=bool))
+            values.append(np.where(is_leaf, cond, np.float32(0.0)).astype(np.float64))
+            roots.append(offset)
+
+            max_depth = max(max_depth, _tree_depth(left, right))
+            offset += left.shape[0]
+
+        return cls(
+            feature=np.concatenate(feats).astype(np.intp),
+            threshold=np.concatenate(thrs).astype(np.float32),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            default_left=np.concatenate(dlefts),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            base_margin=base_margin,
+            objective=objective,
+            num_feature=int(params.get("num_feature", 0)),
+        )
+
+    # ---------------------------------------------------------
+    # Inference
+    # ---------------------------------------------------------
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        has_missing = bool(np.isnan(X).any())
+
+        if X.shape[0] == 1:
+            # Single-row fast path: 1-D gathers over the trees only
+            row = X[0]
+            node = self.roots
+            for _ in range(self.max_depth):
+                x = row[self.feature[node]]
+                go_left = x < self.threshold[node]
+                if has_missing:
+                    go_left = np.where(np.isnan(x), self.default_left[node], go_left)
+                node = np.where(go_left, self.left[node], self.right[node])
+            return np.array([self.value[node].sum() + self.base_margin])
+
+        rows = np.arange(X.shape[0], dtype=np.intp)[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0]))
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = x < self.threshold[node]
+            if has_missing:
+                go_left = np.where(np.isnan(x), self.default_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return self.value[node].sum(axis=1) + self.base_margin
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        margin = self.predict_margin(X)
+        if self.objective == "binary:logitraw":
+            return margin
+        return 1.0 / (1.0 + np.exp(-margin))
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = 0
+    frontier = [0]
+    while True:
+        children = [c for n in frontier for c in (left[n], right[n]) if c != -1]
+        if not children:
+            return depth
+        depth += 1
+        frontier = children
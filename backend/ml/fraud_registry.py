@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _synthetic_rows(n: int, dim: int) -> np.ndarray:
+    """A few plausible rows to warm up a freshly loaded booster."""
+    rng = np.random.default_rng(0)
+    X = rng.uniform(-1.0, 1.0, size=(n, dim)).astype(np.float32)
+    X[:, 0] = rng.uniform(1.0, 500.0, n)
+    return X
+
+
+class FraudModelRegistry:
+    """
+    Hot-reloadable holder for the serving fraud model.
+
+    - build(path) must return an unloaded model (e.g. FraudModelXGB)
+    - reload() loads + warms the new model in a background thread and only
+      then hands it to publish(), so in-flight requests keep using the old one
+    - start_watching() polls the artifact file and reloads when it changes
+    - keeps a short history of loaded versions for the admin endpoint
+    """
+
+    def __init__(
+        self,
+        model_path: Path,
+        build: Callable[[Path], Any],
+        publish: Callable[[Any], None],
+        warmup_rows: int = 8,
+        history_size: int = 20,
+    ):
+        self.model_path = Path(model_path)
+        self.build = build
+        self.publish = publish
+        self.warmup_rows = warmup_rows
+        self.history_size = history_size
+
+        self.current: Any = None
+        self.history: List[Dict[str, Any]] = []
+
+        self._lock = threading.Lock()
+        self._reloading: Optional[threading.Thread] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_seen: Optional[Tuple[float, int]] = None
+
+    # ---------------------------------------------------------
+    # Loading
+    # ---------------------------------------------------------
+    def _file_signature(self, path: Path) -> Optional[Tuple[float, int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def _load_and_warm(self, path: Path) -> Tuple[Any, float]:
+        model = self.build(path)
+        model.load()
+
+        t0 = time.perf_counter()
+        X = _synthetic_rows(self.warmup_rows, getattr(model, "input_dim", 11))
+        model.predict_proba_batch(X)
+        for row in X[:2]:
+            model.predict_proba(row.tolist())
+        return model, (time.perf_counter() - t0) * 1000.0
+
+    def _record(self, entry: Dict[str, Any]) -> None:
+        self.history.append(entry)
+        del self.history[:-self.history_size]
+
+    def load_initial(self) -> Any:
+        """Blocking load used at startup."""
+        self._last_seen = self._file_signature(self.model_path)
+        model, warm_ms = self._load_and_warm(self.model_path)
+        self._swap(model, self.model_path, warm_ms)
+        return model
+
+    def _swap(self, model: Any, path: Path, warm_ms: float) -> None:
+        with self._lock:
+            previous = getattr(self.current, "version", None)
+            self.current = model
+            self.publish(model)
+            for entry in self.history:
+                if entry["status"] == "active":
+                    entry["status"] = "retired"
+            self._record({
+                "version": getattr(model, "version", None),
+                "previous_version": previous,
+                "path": str(path),
+                "status": "active",
+                "warmup_ms": round(warm_ms, 2),
+                "loaded_at": datetime.utcnow().isoformat(),
+            })
+        logger.info(f"Fraud model {getattr(model, 'version', '?')} is now serving (from {path}).")
+
+    def _reload_worker(self, path: Path) -> None:
+        try:
+            model, warm_ms = self._load_and_warm(path)
+        except Exception as e:
+            logger.warning(f"Fraud model reload from {path} failed, keeping current model. Error: {e}")
+            with self._lock:
+                self._record({
+                    "version": None,
+                    "path": str(path),
+                    "status": "failed",
+                    "error": str(e),
+                    "loaded_at": datetime.utcnow().isoformat(),
+                })
+            return
+
+        if getattr(model, "version", None) == getattr(self.current, "version", None):
+            logger.info(f"Fraud model at {path} is unchanged, skipping swap.")
+            return
+        self._swap(model, path, warm_ms)
+
+    def reload(self, path: Optional[Path] = None, wait: bool = False) -> bool:
+        """
+        Load a model in the background and swap it in when warm.
+        Returns False if a reload is already running.
+        """
+        target = Path(path) if path is not None else self.model_path
+        with self._lock:
+            if self._reloading is not None and self._reloading.is_alive():
+                return False
+            self._reloading = threading.Thread(
+                target=self._reload_worker, args=(target,), name="fraud-model-reload", daemon=True
+            )
+            self._reloading.start()
+            thread = self._reloading
+
+        if wait:
+            thread.join()
+        return True
+
+    # ---------------------------------------------------------
+    # Watching
+    # ---------------------------------------------------------
+    def start_watching(self, interval_s: float) -> None:
+        if interval_s <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval_s,), name="fraud-model-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=2.0)
+            self._watcher = None
+
+    def _watch(self, interval_s: float) -> None:
+        pending: Optional[Tuple[float, int]] = None
+        while not self._stop.wait(interval_s):
+            sig = self._file_signature(self.model_path)
+            if sig is None or sig == self._last_seen:
+                pending = None
+                continue
+            # Wait for the signature to hold still for one interval so a
+            # half-written artifact from train.py is never loaded.
+            if sig != pending:
+                pending = sig
+                continue
+            # A reload already in flight turns this one away: keep the change
+            # pending and try again on the next tick instead of dropping it.
+            if self.reload():
+                self._last_seen = sig
+                pending = None
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": getattr(self.current, "version", None),
+                "model_path": str(self.model_path),
+                "reloading": self._reloading is not None and self._reloading.is_alive(),
+                "watching": self._watcher is not None and self._watcher.is_alive(),
+                "history": list(reversed(self.history)),
+            }
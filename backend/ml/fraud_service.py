@@ -2,11 +2,17 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Sequence, Union
+import hashlib
 import os
 
 import numpy as np
-import xgboost as xgb
+
+from .fraud_cache import FraudScoreCache
+from .fraud_compiled import CompiledTreeEnsemble
+
+if TYPE_CHECKING:
+    import xgboost as xgb
 
 
 # Resolve repo root reliably (works even when backend runs from /backend)
@@ -14,12 +20,20 @@ import xgboost as xgb
 REPO_ROOT = Path(__file__).resolve().parents[2]  # <repo>
 DEFAULT_MODEL_PATH = REPO_ROOT / "ml" / "artifacts" / "fraud_xgb" / "fraud_xgb_model.json"
 
+# "xgboost" = native Booster, "compiled" = NumPy evaluator built from the JSON model
+BACKENDS = ("xgboost", "compiled")
+
+# Above this many rows the booster's multi-threaded inplace_predict beats the
+# NumPy evaluator, so large batches always go to the booster.
+COMPILED_MAX_BATCH_ROWS = 64
+
 
 @dataclass
 class FraudPrediction:
     probability: float
     threshold: float
     is_fraud: bool
+    model_version: Optional[str] = None
 
 
 class FraudModelXGB:
@@ -27,14 +41,23 @@ class FraudModelXGB:
     Production-ready XGBoost fraud model service.
 
     - Loads model ONCE at startup via load()
-    - Uses env var FRAUD_XGB_MODEL_PATH if provided
+    - Uses env var FRAUD_XGB_MODEL_PATH when no model_path is passed
     - Validates feature dimension (11)
+    - backend="compiled" (env FRAUD_MODEL_BACKEND when no backend is passed)
+      scores with a NumPy tree evaluator instead of the native booster
+    - Optional FraudScoreCache in front of predict_proba, cleared on load()
+    - xgboost is imported in load(), not when this module is imported
     """
 
-    def __init__(self, model_path: Optional[str] = None, default_threshold: float = 0.93):
-        # Allow override via environment variable
-        env_path = os.getenv("FRAUD_XGB_MODEL_PATH")
-        final_path = env_path or model_path
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        default_threshold: float = 0.93,
+        backend: Optional[str] = None,
+        cache: Optional[FraudScoreCache] = None,
+    ):
+        # An explicit path wins; the environment variable is the fallback
+        final_path = model_path or os.getenv("FRAUD_XGB_MODEL_PATH")
 
         # If user passed a path (or env var), respect it.
         # If it's relative, resolve it from repo root so it works no matter where uvicorn is started.
@@ -46,9 +69,17 @@ class FraudModelXGB:
 
         self.default_threshold = float(default_threshold)
 
+        self.backend = (backend or os.getenv("FRAUD_MODEL_BACKEND") or "xgboost").lower()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown fraud model backend '{self.backend}' (use: {', '.join(BACKENDS)})")
+
         self.booster: Optional[xgb.Booster] = None
+        self.compiled: Optional[CompiledTreeEnsemble] = None
         self.input_dim = 11  # Your trained model expects 11 features
 
+        self.cache = cache
+        self.version: Optional[str] = None  # content hash of the loaded model file
+
     # ---------------------------------------------------------
     # Lifecycle
     # ---------------------------------------------------------
@@ -57,10 +88,20 @@ class FraudModelXGB:
         if not self.model_path.exists():
             raise FileNotFoundError(f"Fraud XGB model not found at: {self.model_path.resolve()}")
 
+        # Imported here so the backend does not pay for xgboost at import time
+        import xgboost as xgb
+
         booster = xgb.Booster()
         booster.load_model(str(self.model_path))
         self.booster = booster
 
+        if self.backend == "compiled":
+            self.compiled = CompiledTreeEnsemble.from_json(self.model_path)
+
+        self.version = hashlib.sha256(self.model_path.read_bytes()).hexdigest()[:12]
+        if self.cache is not None:
+            self.cache.clear()
+
     @property
     def ready(self) -> bool:
         return self.booster is not None
@@ -75,9 +116,22 @@ class FraudModelXGB:
         if len(features) != self.input_dim:
             raise ValueError(f"Expected {self.input_dim} features, got {len(features)}")
 
+        if self.cache is not None:
+            cached = self.cache.get(features, self.version)
+            if cached is not None:
+                return cached
+
         X = np.array(features, dtype=np.float32).reshape(1, -1)
-        dmat = xgb.DMatrix(X)
-        prob = float(self.booster.predict(dmat)[0])
+        if self.compiled is not None:
+            prob = float(self.compiled.predict_proba(X)[0])
+        else:
+            import xgboost as xgb
+
+            dmat = xgb.DMatrix(X)
+            prob = float(self.booster.predict(dmat)[0])
+
+        if self.cache is not None:
+            self.cache.put(features, self.version, prob)
         return prob
 
     def predict(self, features: List[float], threshold: Optional[float] = None) -> FraudPrediction:
@@ -87,8 +141,51 @@ class FraudModelXGB:
             probability=prob,
             threshold=thr,
             is_fraud=(prob >= thr),
+            model_version=self.version,
         )
 
+    # ---------------------------------------------------------
+    # Batch prediction
+    # ---------------------------------------------------------
+    def _as_matrix(self, rows: Union[np.ndarray, Sequence[Sequence[float]]]) -> np.ndarray:
+        X = np.asarray(rows, dtype=np.float32)
+        if X.ndim == 1 and X.size == 0:
+            X = X.reshape(0, self.input_dim)
+        if X.ndim != 2 or X.shape[1] != self.input_dim:
+            raise ValueError(f"Expected an (N, {self.input_dim}) feature matrix, got shape {X.shape}")
+        return X
+
+    def predict_proba_batch(self, rows: Union[np.ndarray, Sequence[Sequence[float]]]) -> np.ndarray:
+        """
+        Score N rows in a single booster call.
+
+        Uses inplace_predict so the whole batch goes through one C-API call
+        without building a DMatrix; results match predict_proba row by row.
+        """
+        if not self.ready:
+            raise RuntimeError("FraudModelXGB not loaded. Call load() at startup.")
+
+        X = self._as_matrix(rows)
+        if X.shape[0] == 0:
+            return np.empty(0, dtype=np.float32)
+
+        if self.compiled is not None and X.shape[0] <= COMPILED_MAX_BATCH_ROWS:
+            return self.compiled.predict_proba(X)
+
+        return np.asarray(self.booster.inplace_predict(X), dtype=np.float32).reshape(-1)
+
+    def predict_batch(
+        self,
+        rows: Union[np.ndarray, Sequence[Sequence[float]]],
+        threshold: Optional[float] = None,
+    ) -> List[FraudPrediction]:
+        thr = self.default_threshold if threshold is None else float(threshold)
+        probs = self.predict_proba_batch(rows)
+        return [
+            FraudPrediction(probability=float(p), threshold=thr, is_fraud=bool(p >= thr), model_version=self.version)
+            for p in probs
+        ]
+
 
 # -------------------------------------------------------------
 # Feature Builder
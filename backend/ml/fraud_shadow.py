@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _percentiles(values) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(np.fromiter(values, dtype=np.float64), [50, 95, 99])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3)}
+
+
+class FraudShadowScorer:
+    """
+    Scores live traffic with a candidate model off the hot path.
+
+    - observe() never blocks: it enqueues the row with the primary result and
+      drops it (counted) when the bounded queue is full
+    - Worker threads wait linger_ms after the first queued row, then score up
+      to batch_size rows with one candidate call, so the shadow costs a
+      fraction of a core instead of competing row-for-row with requests
+    - Workers run at a lower OS scheduling priority (nice) where supported
+    - Records verdict agreement, probability drift and latency of both models
+      (candidate latency is per row, amortized over its batch)
+    - A summary is logged every log_every comparisons
+    """
+
+    def __init__(
+        self,
+        candidate,
+        max_queue: int = 1000,
+        workers: int = 1,
+        log_every: int = 1000,
+        window: int = 4096,
+        batch_size: int = 64,
+        linger_ms: float = 5.0,
+        nice: int = 10,
+    ):
+        self.candidate = candidate
+        self.batch_size = max(int(batch_size), 1)
+        self.linger_s = max(float(linger_ms), 0.0) / 1000.0
+        self.nice = int(nice)
+        self.log_every = max(int(log_every), 1)
+        self.workers = max(int(workers), 1)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(int(max_queue), 1))
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+        self.observed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.compared = 0
+        # Verdict matrix: (primary, candidate)
+        self.both_fraud = 0
+        self.both_clean = 0
+        self.primary_only = 0
+        self.candidate_only = 0
+        self._abs_diff_sum = 0.0
+        self._abs_diff_max = 0.0
+        self._primary_ms: deque = deque(maxlen=window)
+        self._candidate_ms: deque = deque(maxlen=window)
+
+    # ---------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------
+    def start(self) -> None:
+        if self.running:
+            return
+        self._threads = [
+            threading.Thread(target=self._run, name=f"fraud-shadow-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        for _ in self._threads:
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                break
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    # ---------------------------------------------------------
+    # Hot path
+    # ---------------------------------------------------------
+    def observe(
+        self,
+        features: List[float],
+        primary_prob: float,
+        primary_threshold: float,
+        primary_ms: Optional[float] = None,
+    ) -> bool:
+        """Hand a scored request to the shadow. Returns False if it was dropped."""
+        with self._lock:
+            self.observed += 1
+        try:
+            self._queue.put_nowait((list(features), float(primary_prob), float(primary_threshold), primary_ms))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    # ---------------------------------------------------------
+    # Worker
+    # ---------------------------------------------------------
+    def _take_batch(self) -> Optional[list]:
+        item = self._queue.get()
+        if item is _STOP:
+            return None
+        # Linger so rows arriving meanwhile are scored in the same call
+        if self.linger_s:
+            time.sleep(self.linger_s)
+        batch = [item]
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)  # let the loop exit after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _lower_priority(self) -> None:
+        # Linux applies nice values per thread: let the scheduler favour
+        # request threads whenever both are runnable.
+        if self.nice and hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+            except OSError:
+                pass
+
+    def _run(self) -> None:
+        self._lower_priority()
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            try:
+                t0 = time.perf_counter()
+                cand_probs = self.candidate.predict_proba_batch([f for f, _, _, _ in batch])
+                batch_ms = (time.perf_counter() - t0) * 1000.0
+            except Exception as e:
+                with self._lock:
+                    self.errors += len(batch)
+                logger.debug(f"Shadow fraud scoring failed: {e}")
+                continue
+            for (_, primary_prob, primary_thr, primary_ms), cand_prob in zip(batch, cand_probs):
+                self._record(primary_prob, primary_thr, primary_ms, float(cand_prob), batch_ms / len(batch))
+
+    def _record(self, primary_prob: float, primary_thr: float, primary_ms, cand_prob: float, cand_ms: float) -> None:
+        primary_fraud = primary_prob >= primary_thr
+        cand_fraud = cand_prob >= self.candidate.default_threshold
+        diff = abs(primary_prob - cand_prob)
+
+        with self._lock:
+            self.compared += 1
+            if primary_fraud and cand_fraud:
+                self.both_fraud += 1
+            elif primary_fraud:
+                self.primary_only += 1
+            elif cand_fraud:
+                self.candidate_only += 1
+            else:
+                self.both_clean += 1
+            self._abs_diff_sum += diff
+            self._abs_diff_max = max(self._abs_diff_max, diff)
+            if primary_ms is not None:
+                self._primary_ms.append(primary_ms)
+            self._candidate_ms.append(cand_ms)
+            should_log = self.compared % self.log_every == 0
+
+        if should_log:
+            s = self.stats()
+            logger.info(
+                f"[Shadow] compared={s['compared']} agreement={s['verdict_agreement']:.4f} "
+                f"primary_only={s['verdicts']['primary_only']} candidate_only={s['verdicts']['candidate_only']} "
+                f"mean_abs_diff={s['mean_abs_prob_diff']:.5f} dropped={s['dropped']} "
+                f"p99_ms primary={s['primary_ms']['p99']} candidate={s['candidate_ms']['p99']}"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            agree = self.both_fraud + self.both_clean
+            return {
+                "candidate_version": getattr(self.candidate, "version", None),
+                "candidate_threshold": getattr(self.candidate, "default_threshold", None),
+                "running": self.running,
+                "queue_depth": self._queue.qsize(),
+                "observed": self.observed,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "compared": self.compared,
+                "verdict_agreement": round(agree / self.compared, 6) if self.compared else 0.0,
+                "verdicts": {
+                    "both_fraud": self.both_fraud,
+                    "both_clean": self.both_clean,
+                    "primary_only": self.primary_only,
+                    "candidate_only": self.candidate_only,
+                },
+                "mean_abs_prob_diff": round(self._abs_diff_sum / self.compared, 6) if self.compared else 0.0,
+                "max_abs_prob_diff": round(self._abs_diff_max, 6),
+                "primary_ms": _percentiles(list(self._primary_ms)),
+                "candidate_ms": _percentiles(list(self._candidate_ms)),
+            }
+
+
+def build_candidate(backend: str, model_path: Optional[str] = None, default_threshold: float = 0.93):
+    """Unloaded candidate model for shadow scoring ("tf", "xgboost" or "compiled")."""
+    if backend == "tf":
+        from .fraud_tf_service import FraudModelTF
+        return FraudModelTF(model_path=model_path) if model_path else FraudModelTF()
+
+    from .fraud_service import FraudModelXGB
+    return FraudModelXGB(model_path=model_path, default_threshold=default_threshold, backend=backend)
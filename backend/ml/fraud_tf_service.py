@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from .fraud_service import REPO_ROOT, FraudPrediction
+
+
+DEFAULT_TF_MODEL_PATH = REPO_ROOT / "ml" / "artifacts" / "fraud_tf" / "fraud_tf_model_best.keras"
+
+
+class FraudModelTF:
+    """
+    Keras fraud model (ml/fraud_tf) behind the same interface as FraudModelXGB.
+
+    - TensorFlow is imported in load(), so the backend only pays for it when
+      the TF model is actually used (e.g. as a shadow candidate)
+    - Reads threshold.json next to the model if present (written by evaluate.py)
+    """
+
+    def __init__(self, model_path: Optional[str] = None, default_threshold: float = 0.5):
+        if model_path:
+            p = Path(model_path)
+            self.model_path = p if p.is_absolute() else (REPO_ROOT / p)
+        else:
+            self.model_path = DEFAULT_TF_MODEL_PATH
+
+        self.default_threshold = float(default_threshold)
+        self.model = None
+        self.input_dim = 11
+        self.version: Optional[str] = None
+
+    def load(self) -> None:
+        if not self.model_path.exists():
+            raise FileNotFoundError(f"Fraud TF model not found at: {self.model_path.resolve()}")
+
+        os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+        import tensorflow as tf
+
+        self.model = tf.keras.models.load_model(self.model_path)
+
+        thresh_path = self.model_path.parent / "threshold.json"
+        if thresh_path.exists():
+            try:
+                self.default_threshold = float(json.loads(thresh_path.read_text()).get("threshold", self.default_threshold))
+            except Exception:
+                pass
+
+        self.version = "tf-" + hashlib.sha256(self.model_path.read_bytes()).hexdigest()[:12]
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def predict_proba_batch(self, rows: Union[np.ndarray, Sequence[Sequence[float]]]) -> np.ndarray:
+        if not self.ready:
+            raise RuntimeError("FraudModelTF not loaded. Call load() first.")
+
+        X = np.asarray(rows, dtype=np.float32).reshape(-1, self.input_dim)
+        # Direct call avoids model.predict()'s per-call data pipeline overhead
+        return np.asarray(self.model(X, training=False)).reshape(-1)
+
+    def predict_proba(self, features: List[float]) -> float:
+        if len(features) != self.input_dim:
+            raise ValueError(f"Expected {self.input_dim} features, got {len(features)}")
+        return float(self.predict_proba_batch([features])[0])
+
+    def predict(self, features: List[float], threshold: Optional[float] = None) -> FraudPrediction:
+        thr = self.default_threshold if threshold is None else float(threshold)
+        prob = self.predict_proba(features)
+        return FraudPrediction(probability=prob, threshold=thr, is_fraud=(prob >= thr), model_version=self.version)
@@ -3,8 +3,10 @@ from sqlalchemy.ext.declarative import declarative_base
 Base = declarative_base()
 
 from models.user import User
-from models.group import Group
+from models.group import Group, GroupMember
 from models.expense import Expense
 from models.card import Card
 from models.split_transaction import SplitTransaction
 from models.virtual_card import VirtualCard, SplitPreference
+from models.group_ledger import GroupLedgerEntry, GroupBalance
+from models.pipeline_job import PipelineJob, PipelineJobResult
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, ForeignKey
 from datetime import datetime
 import uuid
 
@@ -13,4 +13,16 @@ class Group(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self):
-        return f"<Group {self.name}>"
\ No newline at end of file
+        return f"<Group {self.name}>"
+
+
+class GroupMember(Base):
+    """A user's membership of a group; gates access to the group's ledger."""
+    __tablename__ = "group_members"
+
+    group_id = Column(String, ForeignKey("groups.id"), primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<GroupMember {self.group_id}:{self.user_id}>"
@@ -0,0 +1,35 @@
+import uuid
+from sqlalchemy import Column, String, BigInteger, DateTime, JSON
+from sqlalchemy.sql import func
+from models import Base
+
+
+class GroupLedgerEntry(Base):
+    """Append-only history of a group's expenses and payments (source of truth)."""
+    __tablename__ = "group_ledger_entries"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    group_id = Column(String, nullable=False, index=True)
+    kind = Column(String, nullable=False)  # expense | payment
+    # expense: calculate_balances-style dict; payment: {"from", "to", "amount_cents"}
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "group_id": self.group_id,
+            "kind": self.kind,
+            "payload": self.payload,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class GroupBalance(Base):
+    """Running net balance per (group, user), updated incrementally from the ledger."""
+    __tablename__ = "group_balances"
+
+    group_id = Column(String, primary_key=True)
+    user = Column(String, primary_key=True)
+    balance_cents = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
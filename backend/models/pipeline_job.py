@@ -0,0 +1,62 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Text, Index
+from models import Base
+
+
+class PipelineJob(Base):
+    """A queued bulk expense import, claimed and processed by the pipeline worker pool."""
+    __tablename__ = "pipeline_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = Column(String, nullable=False, default="pending", index=True)  # pending | processing | completed | failed
+    payload = Column(JSON, nullable=False)  # raw expenses
+    result = Column(JSON, nullable=True)  # run_bulk_pipeline summary (counts) once completed
+    result_mode = Column(String, nullable=False, default="full")  # full | errors_only | summary
+    error = Column(Text, nullable=True)
+
+    # Progress
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String, nullable=True)
+
+    queued_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True, index=True)  # finished jobs are evicted after this
+
+    def to_dict(self, include_result: bool = True):
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": {
+                "processed": self.processed,
+                "total": self.total,
+                "percent": round(100.0 * self.processed / self.total, 1) if self.total else 100.0,
+            },
+            "result_mode": self.result_mode,
+            "attempts": self.attempts,
+            "error": self.error,
+            "queued_at": self.queued_at.isoformat() if self.queued_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+        }
+        if include_result and self.result is not None:
+            data.update(self.result)
+        return data
+
+
+class PipelineJobResult(Base):
+    """One chunk of a job's per-row results (kept per result_mode, read back page by page)."""
+    __tablename__ = "pipeline_job_results"
+    __table_args__ = (Index("ix_pipeline_job_results_job_seq", "job_id", "seq"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, nullable=False)
+    seq = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False)
+    results = Column(JSON, nullable=False)
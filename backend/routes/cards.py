@@ -11,10 +11,8 @@ import os
 backend_utils_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'utils')
 sys.path.insert(0, backend_utils_path)
 
-ml_models_path = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'ml', 'models'))
-sys.path.insert(0, ml_models_path)
-
 from csv_parser import BankCSVParser
+from services.model_provider import get_transaction_categorizer
 from transaction_categorizer import TransactionCategorizer
 
 router = APIRouter(prefix="/api/cards", tags=["Cards"])
@@ -167,46 +165,29 @@ def seed_demo_cards(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/upload-csv")
-async def upload_csv(file: UploadFile = File(...)):
+def upload_csv(
+    file: UploadFile = File(...),
+    categorizer: TransactionCategorizer = Depends(get_transaction_categorizer),
+):
     """Upload bank CSV to auto-create card"""
     try:
-        content = await file.read()
-        file_content = content.decode('utf-8')
-        
-        parser = BankCSVParser()
-        parsed_data = parser.auto_detect_format(file_content)
-        suggestions = parser.suggest_card_details(parsed_data['transactions'])
-        
-        categorizer = TransactionCategorizer()
-        categorized_transactions = []
-        
-        for txn in parsed_data['transactions'][:50]:
-            category, confidence = categorizer.categorize(txn['description'])
-            categorized_transactions.append({
-                **txn,
-                'ml_category': category,
-                'confidence': confidence
-            })
-        
-        category_spending = {}
-        for txn in categorized_transactions:
-            cat = txn['ml_category']
-            if cat not in category_spending:
-                category_spending[cat] = 0
-            category_spending[cat] += txn['amount']
+        # Read from the spooled upload in chunks; no full copy of the file or
+        # of its transactions is held in memory
+        imported = BankCSVParser.import_csv(file.file, categorizer)
+        suggestions = imported['suggestions']
         
         return {
             'success': True,
             'card_suggestions': {
                 'name': suggestions['suggested_name'],
-                'card_type': parsed_data['card_type'],
+                'card_type': imported['card_type'],
                 'limit': suggestions['suggested_limit'],
                 'balance': suggestions['suggested_balance'],
                 'rewards_rate': 0.01
             },
             'transaction_count': suggestions['transaction_count'],
-            'category_breakdown': category_spending,
-            'sample_transactions': categorized_transactions[:10]
+            'category_breakdown': imported['category_breakdown'],
+            'sample_transactions': imported['sample_transactions']
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to parse CSV: {str(e)}")
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import time
+from pathlib import Path
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
 
 from config import settings
-from ml.fraud_service import build_features_from_fields
+from ml.fraud_service import REPO_ROOT, build_features_from_fields
+from routes.auth import get_current_user
 
 router = APIRouter(prefix="/api/ml", tags=["ML - Fraud"])
 
@@ -38,6 +41,32 @@ class FraudResponse(BaseModel):
     probability: float
     threshold: float
     is_fraud: bool
+    model_version: Optional[str] = None
+
+
+class FraudBatchRequest(BaseModel):
+    rows: List[List[float]] = Field(
+        ...,
+        description="N rows of exactly 11 features each, in model order"
+    )
+    threshold: Optional[float] = Field(default=None, description="Override threshold for this batch")
+
+
+class FraudBatchResponse(BaseModel):
+    count: int
+    threshold: float
+    probabilities: List[float]
+    is_fraud: List[bool]
+    flagged: int
+    model_version: Optional[str] = None
+
+
+class ReloadRequest(BaseModel):
+    path: Optional[str] = Field(
+        default=None,
+        description="Model file inside the fraud artifacts directory (defaults to the configured model)"
+    )
+    wait: bool = Field(default=False, description="Block until the new model is loaded and warmed")
 
 
 @router.post("/fraud", response_model=FraudResponse)
@@ -49,12 +78,50 @@ def predict_fraud(req: FraudRequest, request: Request):
 
         feats = req.features if req.features is not None else build_features_from_fields(req.model_dump())
 
+        t0 = time.perf_counter()
         pred = fraud_model.predict(features=feats, threshold=req.threshold)
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+        shadow = getattr(request.app.state, "fraud_shadow", None)
+        if shadow is not None:
+            shadow.observe(feats, pred.probability, pred.threshold, elapsed_ms)
 
         return FraudResponse(
             probability=float(pred.probability),
             threshold=float(pred.threshold),
             is_fraud=bool(pred.is_fraud),
+            model_version=getattr(pred, "model_version", None),
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fraud prediction failed: {e}")
+
+
+@router.post("/fraud/batch", response_model=FraudBatchResponse)
+def predict_fraud_batch(req: FraudBatchRequest, request: Request):
+    """Score many transactions with one booster call (backfills / replays)."""
+    try:
+        fraud_model = getattr(request.app.state, "fraud_model", None)
+        if fraud_model is None or not hasattr(fraud_model, "predict_proba_batch"):
+            raise HTTPException(status_code=503, detail="Fraud model not loaded on server startup")
+
+        # Pin the underlying model so the version reported is the one that scored
+        scorer = getattr(fraud_model, "model", fraud_model)
+        thr = scorer.default_threshold if req.threshold is None else float(req.threshold)
+        probs = scorer.predict_proba_batch(req.rows)
+        verdicts = probs >= thr
+
+        return FraudBatchResponse(
+            count=int(probs.shape[0]),
+            threshold=thr,
+            probabilities=probs.astype(float).tolist(),
+            is_fraud=verdicts.tolist(),
+            flagged=int(verdicts.sum()),
+            model_version=getattr(scorer, "version", None),
         )
 
     except ValueError as e:
@@ -62,4 +129,74 @@ def predict_fraud(req: FraudRequest, request: Request):
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Fraud prediction failed: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Fraud batch prediction failed: {e}")
+
+
+@router.get("/fraud/batcher/stats")
+def fraud_batcher_stats(request: Request):
+    """Queue depth, batch-size histogram and wait-time percentiles of the micro-batcher."""
+    fraud_model = getattr(request.app.state, "fraud_model", None)
+    if fraud_model is None or not hasattr(fraud_model, "metrics"):
+        raise HTTPException(status_code=404, detail="Fraud micro-batcher is not enabled")
+    return fraud_model.metrics()
+
+
+@router.get("/fraud/cache/stats")
+def fraud_cache_stats(request: Request):
+    """Hit/miss/eviction counters of the fraud score cache."""
+    fraud_model = getattr(request.app.state, "fraud_model", None)
+    cache = getattr(fraud_model, "cache", None)
+    if cache is None:
+        raise HTTPException(status_code=404, detail="Fraud score cache is not enabled")
+    return {"model_version": getattr(fraud_model, "version", None), **cache.stats()}
+
+
+@router.post("/fraud/cache/clear", dependencies=[Depends(get_current_user)])
+def fraud_cache_clear(request: Request):
+    fraud_model = getattr(request.app.state, "fraud_model", None)
+    cache = getattr(fraud_model, "cache", None)
+    if cache is None:
+        raise HTTPException(status_code=404, detail="Fraud score cache is not enabled")
+    cache.clear()
+    return {"cleared": True}
+
+
+@router.get("/fraud/model")
+def fraud_model_status(request: Request):
+    """Serving model version and reload history."""
+    registry = getattr(request.app.state, "fraud_registry", None)
+    if registry is None:
+        raise HTTPException(status_code=404, detail="Fraud model registry is not enabled")
+    return registry.status()
+
+
+@router.post("/fraud/model/reload", dependencies=[Depends(get_current_user)])
+def fraud_model_reload(req: ReloadRequest, request: Request):
+    """Load a model in the background and swap it in once warm."""
+    registry = getattr(request.app.state, "fraud_registry", None)
+    if registry is None:
+        raise HTTPException(status_code=404, detail="Fraud model registry is not enabled")
+
+    path = None
+    if req.path:
+        p = Path(req.path)
+        path = (p if p.is_absolute() else REPO_ROOT / p).resolve()
+        artifacts_dir = registry.model_path.resolve().parent
+        if artifacts_dir not in path.parents:
+            raise HTTPException(status_code=400, detail=f"Model must live under {artifacts_dir}")
+        if not path.exists():
+            raise HTTPException(status_code=404, detail=f"Model file not found: {req.path}")
+
+    accepted = registry.reload(path, wait=req.wait)
+    if not accepted:
+        raise HTTPException(status_code=409, detail="A reload is already in progress")
+    return {"accepted": True, **registry.status()}
+
+
+@router.get("/fraud/shadow/stats")
+def fraud_shadow_stats(request: Request):
+    """Verdict agreement, probability drift and latency of the shadow candidate vs the serving model."""
+    shadow = getattr(request.app.state, "fraud_shadow", None)
+    if shadow is None:
+        raise HTTPException(status_code=404, detail="Fraud shadow scoring is not enabled")
+    return shadow.stats()
@@ -1,28 +1,40 @@
 # backend/routes/ml.py
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Literal
-import os
-import sys
+from typing import List, Dict, Optional, Literal, Tuple
+import time
 from datetime import datetime
 import math
 
 import numpy as np
 
-# Add ml/models directory DIRECTLY to path to avoid conflict with backend/models
-ml_models_path = os.path.abspath(
-    os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "ml", "models")
-)
-sys.path.insert(0, ml_models_path)
-
-from card_recommender import CardRecommender
+from services.model_provider import get_card_recommender, get_transaction_categorizer
+from services.settlement_service import category_cache
 from transaction_categorizer import TransactionCategorizer
 
 router = APIRouter(prefix="/api/ml", tags=["ML"])
 
-# Initialize lightweight models
-card_recommender = CardRecommender()
-transaction_categorizer = TransactionCategorizer()
+
+def card_recommender_dep():
+    """Shared CardRecommender; 503 while it cannot be loaded (e.g. torch missing)."""
+    try:
+        return get_card_recommender()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Card recommender unavailable: {e}")
+
+
+def require_ml_warm(request: Request) -> None:
+    """
+    503 while the startup warm-up is loading models, so fraud checks are never
+    skipped. After a failed warm-up requests go through and see whatever loaded.
+    """
+    warmup = getattr(request.app.state, "ml_warmup", None)
+    if warmup is not None and warmup.get("status") in ("pending", "loading"):
+        raise HTTPException(
+            status_code=503,
+            detail="ML models are still warming up",
+            headers={"Retry-After": "2"},
+        )
 
 
 class Card(BaseModel):
@@ -45,6 +57,23 @@ class RecommendRequest(BaseModel):
     fraud_threshold: Optional[float] = None          # override default threshold if needed
 
 
+class BatchTransaction(BaseModel):
+    transaction_amount: float
+    merchant: Optional[str] = None
+    cards: Optional[List[Card]] = None  # defaults to the request's cards
+
+
+class BatchRecommendRequest(BaseModel):
+    transactions: List[BatchTransaction]
+    cards: List[Card] = []
+    # What-if: score every transaction against each of these portfolios instead
+    portfolios: List[List[Card]] = []
+    free_trial: bool = False
+
+    fraud_action: Literal["warn", "block"] = "warn"
+    fraud_threshold: Optional[float] = None
+
+
 class CategorizeRequest(BaseModel):
     description: str
 
@@ -158,9 +187,80 @@ def predict_fraud_prob(request: Request, features: List[float]) -> Optional[floa
         raise RuntimeError(f"Fraud prediction failed: {e}")
 
 
+def score_fraud(
+    request: Request, features: List[float], threshold: Optional[float] = None
+) -> Tuple[Optional[float], Optional[str]]:
+    """
+    Like predict_fraud_prob, but also returns the version of the model that scored.
+    threshold is the one the caller applies to the verdict (app default when None);
+    the shadow compares the candidate against that verdict.
+    """
+    model = getattr(request.app.state, "fraud_model", None)
+    if model is None:
+        return None, None
+
+    t0 = time.perf_counter()
+    # Micro-batcher reports the version of the model its batch actually used
+    if hasattr(model, "score") and callable(getattr(model, "score")):
+        prob, version = model.score(features)
+        prob = float(prob)
+    else:
+        version = getattr(model, "version", None)
+        prob = predict_fraud_prob(request, features)
+    elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+    shadow = getattr(request.app.state, "fraud_shadow", None)
+    if shadow is not None and prob is not None:
+        if threshold is None:
+            threshold = getattr(request.app.state, "fraud_threshold", 0.93)
+        shadow.observe(features, prob, threshold, elapsed_ms)
+
+    return prob, version
+
+
+def score_fraud_batch(
+    request: Request, rows: List[List[float]], threshold: Optional[float] = None
+) -> Tuple[List[Optional[float]], Optional[str]]:
+    """score_fraud for many rows, with one booster call when the model supports it."""
+    model = getattr(request.app.state, "fraud_model", None)
+    if model is None:
+        return [None] * len(rows), None
+    if not rows:
+        return [], getattr(model, "version", None)
+
+    # Pin the underlying model so the version reported is the one that scored
+    scorer = getattr(model, "model", model)
+    if hasattr(scorer, "predict_proba_batch"):
+        t0 = time.perf_counter()
+        probs = [float(p) for p in scorer.predict_proba_batch(rows)]
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+        shadow = getattr(request.app.state, "fraud_shadow", None)
+        if shadow is not None:
+            if threshold is None:
+                threshold = getattr(request.app.state, "fraud_threshold", 0.93)
+            # Primary latency per row, amortized over the batch like the shadow's own
+            for row, prob in zip(rows, probs):
+                shadow.observe(row, prob, threshold, elapsed_ms / len(rows))
+        return probs, getattr(scorer, "version", None)
+
+    scored = [score_fraud(request, row, threshold) for row in rows]
+    return [p for p, _ in scored], scored[-1][1]
+
+
+def _estimated_rewards(result: Dict, cards: List[Dict]) -> float:
+    """Rewards earned by an allocation at each card's rewards_rate (padding cards earn nothing)."""
+    rates = {c["id"]: float(c.get("rewards_rate", 0.0)) for c in cards}
+    return round(sum(a["amount"] * rates.get(a["card_id"], 0.0) for a in result["allocations"]), 2)
+
+
 # -------- Routes --------
-@router.post("/recommend")
-def recommend_allocation(request: RecommendRequest, fastapi_request: Request):
+@router.post("/recommend", dependencies=[Depends(require_ml_warm)])
+def recommend_allocation(
+    request: RecommendRequest,
+    fastapi_request: Request,
+    card_recommender=Depends(card_recommender_dep),
+):
     """
     1) Run fraud model first
     2) If risk high:
@@ -181,10 +281,10 @@ def recommend_allocation(request: RecommendRequest, fastapi_request: Request):
             merchant=request.merchant,
         )
 
-        prob = predict_fraud_prob(fastapi_request, features)
         threshold = request.fraud_threshold if request.fraud_threshold is not None else getattr(
             fastapi_request.app.state, "fraud_threshold", 0.93
         )
+        prob, model_version = score_fraud(fastapi_request, features, threshold)
 
         # If fraud model loaded, enforce policy
         if prob is not None and prob >= threshold:
@@ -194,6 +294,7 @@ def recommend_allocation(request: RecommendRequest, fastapi_request: Request):
                 "fraud_probability": round(prob, 6),
                 "threshold": float(threshold),
                 "merchant": request.merchant,
+                "model_version": model_version,
             }
 
             if request.fraud_action == "block":
@@ -219,6 +320,7 @@ def recommend_allocation(request: RecommendRequest, fastapi_request: Request):
         # also attach probability even when safe (useful for UI)
         if prob is not None:
             result["fraud_probability"] = round(prob, 6)
+            result["fraud_model_version"] = model_version
             result["fraud_threshold"] = float(threshold)
 
         return result
@@ -229,8 +331,114 @@ def recommend_allocation(request: RecommendRequest, fastapi_request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/recommend/batch", dependencies=[Depends(require_ml_warm)])
+def recommend_allocation_batch(
+    request: BatchRecommendRequest,
+    fastapi_request: Request,
+    card_recommender=Depends(card_recommender_dep),
+):
+    """
+    /recommend for many transactions: one fraud batch, one recommender forward pass.
+
+    - every transaction uses its own cards, or the request's shared cards
+    - with `portfolios`, every transaction is scored against each portfolio
+      (what-if analysis) and the best one by estimated rewards is reported
+    - fraud policy applies per transaction: with "block", flagged
+      transactions get no allocation instead of failing the whole batch
+    """
+    try:
+        shared_cards = [card.model_dump() for card in request.cards]
+        portfolios = [[card.model_dump() for card in p] for p in request.portfolios]
+
+        own = []
+        candidates = []
+        for i, txn in enumerate(request.transactions):
+            own_cards = [card.model_dump() for card in txn.cards] if txn.cards else shared_cards
+            scored = portfolios or [own_cards]
+            if not all(scored):
+                raise HTTPException(status_code=400, detail=f"transactions[{i}] has no cards")
+            own.append(own_cards)
+            candidates.append(scored)
+
+        # ---- Fraud first (on the cards the transaction was made with, not a what-if portfolio) ----
+        input_dim = getattr(getattr(fastapi_request.app.state, "fraud_model", None), "input_dim", 11)
+        feature_names = getattr(fastapi_request.app.state, "fraud_feature_names", [f"f{i}" for i in range(int(input_dim))])
+        rows = [
+            build_fraud_features(
+                amount=txn.transaction_amount,
+                cards=own_cards,
+                feature_names=feature_names,
+                merchant=txn.merchant,
+            )
+            for txn, own_cards in zip(request.transactions, own)
+        ]
+        threshold = request.fraud_threshold if request.fraud_threshold is not None else getattr(
+            fastapi_request.app.state, "fraud_threshold", 0.93
+        )
+        probs, model_version = score_fraud_batch(fastapi_request, rows, threshold)
+
+        results = []
+        batch = []
+        owners = []
+        for i, (txn, scored, prob) in enumerate(zip(request.transactions, candidates, probs)):
+            item = {"index": i}
+            if prob is not None and prob >= threshold:
+                item["fraud_warning"] = {
+                    "blocked": request.fraud_action == "block",
+                    "reason": "High fraud risk detected",
+                    "fraud_probability": round(prob, 6),
+                    "threshold": float(threshold),
+                    "merchant": txn.merchant,
+                    "model_version": model_version,
+                }
+            if prob is not None:
+                item["fraud_probability"] = round(prob, 6)
+                item["fraud_model_version"] = model_version
+                item["fraud_threshold"] = float(threshold)
+            results.append(item)
+
+            if item.get("fraud_warning", {}).get("blocked"):
+                item["blocked"] = True
+                continue
+            for j, cards in enumerate(scored):
+                batch.append({"transaction_amount": txn.transaction_amount, "cards": cards, "merchant": txn.merchant})
+                owners.append((item, j))
+
+        # ---- Allocation (single forward pass) ----
+        recommendations = card_recommender.recommend_batch(batch, free_trial=request.free_trial)
+        for (item, j), result in zip(owners, recommendations):
+            if portfolios:
+                result["portfolio_index"] = j
+                result["estimated_rewards"] = _estimated_rewards(result, portfolios[j])
+                item.setdefault("portfolios", []).append(result)
+            else:
+                item.update(result)
+
+        if portfolios:
+            for item in results:
+                if "portfolios" in item:
+                    best = max(item["portfolios"], key=lambda r: r["estimated_rewards"])
+                    item["best_portfolio_index"] = best["portfolio_index"]
+
+        return {
+            "results": results,
+            "count": len(results),
+            "blocked": sum(1 for item in results if item.get("blocked")),
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/categorize")
-def categorize_transaction(request: CategorizeRequest):
+def categorize_transaction(
+    request: CategorizeRequest,
+    transaction_categorizer: TransactionCategorizer = Depends(get_transaction_categorizer),
+):
     """AI-powered transaction categorization"""
     try:
         category, confidence = transaction_categorizer.categorize(request.description)
@@ -240,4 +448,16 @@ def categorize_transaction(request: CategorizeRequest):
             "confidence": confidence,
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/categorize/cache/stats")
+def categorize_cache_stats(
+    transaction_categorizer: TransactionCategorizer = Depends(get_transaction_categorizer),
+):
+    """Hit rates of the shared merchant -> category caches."""
+    cache = getattr(transaction_categorizer, "cache", None)
+    return {
+        "transaction_categorizer": cache.stats() if cache is not None else None,
+        "merchant_category": category_cache.stats(),
+    }
\ No newline at end of file
@@ -1,15 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
+import codecs
+import json
+from typing import Iterable, Iterator, List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Request, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from typing import List, Optional
 from db import get_db
 from services.pipeline_service import (
     run_pipeline,
     run_bulk_pipeline,
+    stream_bulk_pipeline,
+    iter_csv,
+    iter_ndjson,
     queue_bulk_job,
     get_job_status,
     process_queue,
 )
+from services.job_queue import get_job, iter_results, job_counts
 
 router = APIRouter(prefix="/api/pipeline", tags=["Pipeline"])
 
@@ -24,12 +32,17 @@ class RawExpense(BaseModel):
     split_type: str = "equal"
 
 
+ResultMode = Literal["full", "errors_only", "summary"]
+
+
 class BulkRequest(BaseModel):
     expenses: List[RawExpense]
+    result_mode: ResultMode = "full"
 
 
 class QueueRequest(BaseModel):
     expenses: List[RawExpense]
+    result_mode: ResultMode = "full"
 
 
 # ── Single expense pipeline ───────────────────────────────────────────────
@@ -55,26 +68,79 @@ def process_single(expense: RawExpense, db: Session = Depends(get_db)):
 def process_bulk(req: BulkRequest, db: Session = Depends(get_db)):
     """
     Process multiple expenses at once.
-    Returns summary with per-expense results and ML categories.
+    Returns summary with per-expense results and ML categories
+    (result_mode: full | errors_only | summary).
     """
     try:
         raw_list = [e.model_dump() for e in req.expenses]
-        result = run_bulk_pipeline(raw_list, db)
+        result = run_bulk_pipeline(raw_list, db, result_mode=req.result_mode)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ── Streaming upload pipeline ─────────────────────────────────────────────
+NDJSON_CHUNK_LINES = 100
+UPLOAD_FORMATS = ("ndjson", "csv")
+
+
+def _upload_format(file: UploadFile, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt.lower()
+    name = (file.filename or "").lower()
+    if name.endswith(".csv") or (file.content_type or "").startswith("text/csv"):
+        return "csv"
+    return "ndjson"
+
+
+def _ndjson(results: Iterable[dict]) -> Iterator[str]:
+    lines = []
+    for r in results:
+        lines.append(json.dumps(r, default=str))
+        if len(lines) >= NDJSON_CHUNK_LINES:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+@router.post("/stream")
+def process_stream(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    result_mode: ResultMode = "full",
+    db: Session = Depends(get_db),
+):
+    """
+    Stream an NDJSON or CSV upload (format from ?format= or the file name)
+    through validate → transform → ML categorize → save, a batch at a time.
+    Responds with NDJSON: one result per input row (failed rows only for
+    result_mode=errors_only, none for summary), then a {"summary": ...} line.
+    """
+    fmt = _upload_format(file, format)
+    if fmt not in UPLOAD_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(UPLOAD_FORMATS)}")
+
+    # The upload is spooled to disk by the multipart parser; read it line by line
+    lines = codecs.iterdecode(file.file, "utf-8-sig", errors="replace")
+    rows = iter_csv(lines) if fmt == "csv" else iter_ndjson(lines)
+    results = stream_bulk_pipeline(rows, db, result_mode=result_mode)
+    return StreamingResponse(_ndjson(results), media_type="application/x-ndjson")
+
+
 # ── Queue job (async) ─────────────────────────────────────────────────────
 @router.post("/queue")
-def queue_job(req: QueueRequest):
+def queue_job(req: QueueRequest, request: Request, db: Session = Depends(get_db)):
     """
     Queue a bulk job for background processing.
     Returns job_id to check status later.
     """
     try:
         raw_list = [e.model_dump() for e in req.expenses]
-        job_id = queue_bulk_job(raw_list)
+        job_id = queue_bulk_job(raw_list, db, result_mode=req.result_mode)
+        workers = getattr(request.app.state, "pipeline_workers", None)
+        if workers:
+            workers.wake()
         return {
             "job_id": job_id,
             "status": "queued",
@@ -84,22 +150,49 @@ def queue_job(req: QueueRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ── Queue / worker stats ──────────────────────────────────────────────────
+@router.get("/jobs/stats")
+def job_stats(request: Request, db: Session = Depends(get_db)):
+    """Jobs per status plus this process's worker throughput and queue latency."""
+    workers = getattr(request.app.state, "pipeline_workers", None)
+    return {
+        "queue": job_counts(db),
+        "workers": workers.stats() if workers else None,
+    }
+
+
 # ── Check job status ──────────────────────────────────────────────────────
 @router.get("/jobs/{job_id}")
-def check_job(job_id: str):
-    """Check the status of a queued/processed job."""
-    result = get_job_status(job_id)
+def check_job(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Check the status/progress of a queued/processed job.
+    Completed jobs include one page of results; follow next_offset for more.
+    """
+    result = get_job_status(job_id, db, offset=offset, limit=limit)
     if not result:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
     return result
 
 
+@router.get("/jobs/{job_id}/results")
+def job_results(job_id: str, db: Session = Depends(get_db)):
+    """All stored results of a job as NDJSON, read back one chunk at a time."""
+    if get_job(db, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return StreamingResponse(_ndjson(iter_results(db, job_id)), media_type="application/x-ndjson")
+
+
 # ── Trigger queue processing ──────────────────────────────────────────────
 @router.post("/jobs/process-queue")
 def trigger_queue(db: Session = Depends(get_db)):
     """
     Manually trigger processing of all pending queued jobs.
-    In production this runs on a scheduler (every 1 min).
+    Normally the background worker pool (PIPELINE_WORKERS) picks them up.
     """
     try:
         result = process_queue(db)
@@ -1,7 +1,20 @@
-from fastapi import APIRouter, HTTPException
+import json
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-from services.settlement_service import calculate_balances, minimize_transactions, ai_optimize_split, compare_splits
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Iterator, List, Optional
+from config import settings
+from db import get_db
+from models.group import Group, GroupMember
+from models.user import User
+from routes.auth import get_current_user
+from services import balance_ledger
+from services.settlement_service import minimize_transactions, iter_transactions, ai_optimize_split, compare_splits
+from services.settlement_engine import calculate_balances_vectorized
+from services.settlement_optimizer import solve_min_transfers
+from services.reward_optimizer import optimize_batch
 from utils.money import dollars_to_cents
 
 router = APIRouter(prefix="/api/settlements", tags=["Settlements"])
@@ -28,6 +41,12 @@ class SettlementRequest(BaseModel):
 class CardIn(BaseModel):
     name: str
     limit_cents: int = 100000
+    rewards: Optional[Dict[str, float]] = None  # category -> %, overrides the built-in table
+    bonus_cap_cents: Optional[int] = None
+    base_rate_pct: float = 1.0
+    fee_pct: float = 0.0
+    fee_cents: int = 0
+    min_charge_cents: int = 0
 
 
 class OptimizeRequest(BaseModel):
@@ -36,29 +55,81 @@ class OptimizeRequest(BaseModel):
     cards: List[CardIn]
 
 
+class BatchTransactionIn(BaseModel):
+    amount: float
+    merchant: str = "general"
+
+
+class BatchOptimizeRequest(BaseModel):
+    transactions: List[BatchTransactionIn]
+    cards: List[CardIn]
+
+
+class PaymentIn(BaseModel):
+    from_user: str
+    to_user: str
+    amount: float
+
+
+def _format_expense(e: ExpenseIn) -> dict:
+    expense = {
+        "payer": e.payer,
+        "amount_cents": dollars_to_cents(e.amount),
+        "members": e.members,
+        "split_type": e.split_type,
+    }
+    if e.splits:
+        expense["splits"] = [
+            {
+                "user": s.user,
+                "amount_cents": dollars_to_cents(s.amount) if s.amount is not None else 0,
+                "percentage": s.percentage,
+            }
+            for s in e.splits
+        ]
+    return expense
+
+
+NDJSON_CHUNK_LINES = 500
+
+
+def _ndjson(transfers: Iterable[dict]) -> Iterator[str]:
+    """One transfer per line, flushed in small chunks so memory stays flat."""
+    lines = []
+    for t in transfers:
+        lines.append(json.dumps(t))
+        if len(lines) >= NDJSON_CHUNK_LINES:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
 @router.post("/calculate")
-def calculate(req: SettlementRequest):
+def calculate(req: SettlementRequest, solver: Optional[str] = None, stream: bool = False):
+    """
+    stream=true returns application/x-ndjson with one transfer per line,
+    produced lazily by iter_transactions (balances are not echoed).
+    """
+    solver = solver or settings.SETTLEMENT_SOLVER
+    if solver not in ("greedy", "optimal"):
+        raise HTTPException(status_code=400, detail="solver must be 'greedy' or 'optimal'")
     try:
-        formatted_expenses = []
-        for e in req.expenses:
-            expense = {
-                "payer": e.payer,
-                "amount_cents": dollars_to_cents(e.amount),
-                "members": e.members,
-                "split_type": e.split_type,
+        formatted_expenses = [_format_expense(e) for e in req.expenses]
+
+        balances = calculate_balances_vectorized(formatted_expenses)
+        if solver == "optimal":
+            plan = solve_min_transfers(balances, settings.SETTLEMENT_SOLVER_TIME_BUDGET_MS)
+            if stream:
+                return StreamingResponse(_ndjson(plan["transactions"]), media_type="application/x-ndjson")
+            return {
+                "balances_cents": balances,
+                "transactions": plan["transactions"],
+                "solver": plan["solver"],
+                "timed_out": plan["timed_out"],
             }
-            if e.splits:
-                expense["splits"] = [
-                    {
-                        "user": s.user,
-                        "amount_cents": dollars_to_cents(s.amount) if s.amount is not None else 0,
-                        "percentage": s.percentage,
-                    }
-                    for s in e.splits
-                ]
-            formatted_expenses.append(expense)
-
-        balances = calculate_balances(formatted_expenses)
+        if stream:
+            return StreamingResponse(_ndjson(iter_transactions(balances)), media_type="application/x-ndjson")
         txs = minimize_transactions(balances)
         return {
             "balances_cents": balances,
@@ -72,9 +143,112 @@ def calculate(req: SettlementRequest):
 def optimize(req: OptimizeRequest):
     try:
         total_cents = dollars_to_cents(req.total)
-        cards = [{"name": c.name, "limit_cents": c.limit_cents} for c in req.cards]
+        cards = [c.model_dump() for c in req.cards]
         result = ai_optimize_split(total_cents, cards, req.merchant)
-        comparison = compare_splits(total_cents, cards, req.merchant)
+        comparison = compare_splits(total_cents, cards, req.merchant, ai_result=result)
         return {**result, "comparison": comparison}
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/optimize/batch")
+def optimize_many(req: BatchOptimizeRequest):
+    """Allocate many transactions at once against shared card limits and bonus caps."""
+    if not req.cards:
+        raise HTTPException(status_code=400, detail="No cards provided")
+    try:
+        transactions = [
+            {"amount_cents": dollars_to_cents(t.amount), "merchant": t.merchant}
+            for t in req.transactions
+        ]
+        return optimize_batch(transactions, [c.model_dump() for c in req.cards])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ── Persistent group ledger (incremental balances) ─────────────────────────
+def _require_member(db: Session, group_id: str, user: User) -> None:
+    """404 for an unknown group, 403 unless the caller belongs to it."""
+    if db.query(Group.id).filter(Group.id == group_id).first() is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    member = (
+        db.query(GroupMember.user_id)
+        .filter(GroupMember.group_id == group_id, GroupMember.user_id == user.id)
+        .first()
+    )
+    if member is None:
+        raise HTTPException(status_code=403, detail="Not a member of this group")
+
+
+def _group_state(db: Session, group_id: str) -> dict:
+    balances = balance_ledger.get_balances(db, group_id)
+    return {
+        "group_id": group_id,
+        "balances_cents": balances,
+        "transactions": minimize_transactions(balances),
+    }
+
+
+@router.get("/groups/{group_id}")
+def group_balances(group_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Current balances and settle-up plan, read from the running ledger."""
+    _require_member(db, group_id, current_user)
+    return _group_state(db, group_id)
+
+
+@router.post("/groups/{group_id}/expenses")
+def add_group_expense(
+    group_id: str,
+    expense: ExpenseIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _require_member(db, group_id, current_user)
+    try:
+        entry = balance_ledger.add_expense(db, group_id, _format_expense(expense))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"entry": entry.to_dict(), **_group_state(db, group_id)}
+
+
+@router.post("/groups/{group_id}/payments")
+def add_group_payment(
+    group_id: str,
+    payment: PaymentIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _require_member(db, group_id, current_user)
+    try:
+        entry = balance_ledger.add_payment(
+            db, group_id, payment.from_user, payment.to_user, dollars_to_cents(payment.amount)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"entry": entry.to_dict(), **_group_state(db, group_id)}
+
+
+@router.delete("/groups/{group_id}/entries/{entry_id}")
+def delete_group_entry(
+    group_id: str,
+    entry_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Delete an expense or payment and reverse its effect on balances."""
+    _require_member(db, group_id, current_user)
+    if not balance_ledger.delete_entry(db, group_id, entry_id):
+        raise HTTPException(status_code=404, detail="Ledger entry not found")
+    return _group_state(db, group_id)
+
+
+@router.post("/groups/{group_id}/verify")
+def verify_group(
+    group_id: str,
+    repair: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Recompute from full history and diff against the incremental balances."""
+    _require_member(db, group_id, current_user)
+    return balance_ledger.verify(db, group_id, repair=repair)
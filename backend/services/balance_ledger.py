@@ -0,0 +1,209 @@
+"""
+Incremental per-group balance ledger.
+
+Every expense/payment is appended to group_ledger_entries and its balance
+deltas are applied to group_balances in the same transaction, so reading a
+group's balances (and the minimize_transactions plan) is O(people) instead of
+O(history). rebuild/verify recompute from the entries and diff.
+
+CLI (run from the backend/ directory):
+    python -m services.balance_ledger verify --group <group_id>
+    python -m services.balance_ledger verify --all --repair
+"""
+import argparse
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from models.group_ledger import GroupLedgerEntry, GroupBalance
+from services.settlement_service import calculate_balances
+from services.settlement_engine import calculate_balances_vectorized
+
+
+# ── Deltas ─────────────────────────────────────────────────────────────────
+def payment_deltas(payload: dict) -> Dict[str, int]:
+    """A payment from a debtor to a creditor moves both balances toward zero."""
+    amount = int(payload["amount_cents"])
+    if amount <= 0:
+        raise ValueError("Payment amount must be positive")
+    if payload["from"] == payload["to"]:
+        raise ValueError("Payment must be between two different users")
+    return {payload["from"]: amount, payload["to"]: -amount}
+
+
+def entry_deltas(kind: str, payload: dict) -> Dict[str, int]:
+    if kind == "expense":
+        return calculate_balances([payload])
+    if kind == "payment":
+        return payment_deltas(payload)
+    raise ValueError(f"Unknown ledger entry kind: {kind}")
+
+
+def _increment(db, group_id: str, user: str, amount: int) -> int:
+    """Add to a balance in SQL so concurrent writers don't lose updates. Returns rows updated."""
+    return (
+        db.query(GroupBalance)
+        .filter(GroupBalance.group_id == group_id, GroupBalance.user == user)
+        .update({GroupBalance.balance_cents: GroupBalance.balance_cents + amount},
+                synchronize_session=False)
+    )
+
+
+def _apply(db, group_id: str, deltas: Dict[str, int], sign: int) -> None:
+    for user, delta in deltas.items():
+        if delta == 0 and sign < 0:
+            continue
+        if _increment(db, group_id, user, sign * delta):
+            continue
+        # First write for this user. Another writer may insert the same row
+        # between our update and insert: roll back to the savepoint and add
+        # to the row it created instead.
+        try:
+            with db.begin_nested():
+                db.add(GroupBalance(group_id=group_id, user=user, balance_cents=sign * delta))
+        except IntegrityError:
+            _increment(db, group_id, user, sign * delta)
+
+
+# ── Writes ─────────────────────────────────────────────────────────────────
+def _append(db, group_id: str, kind: str, payload: dict) -> GroupLedgerEntry:
+    deltas = entry_deltas(kind, payload)  # validates before anything is written
+    entry = GroupLedgerEntry(group_id=group_id, kind=kind, payload=payload)
+    try:
+        db.add(entry)
+        _apply(db, group_id, deltas, +1)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    db.refresh(entry)
+    return entry
+
+
+def add_expense(db, group_id: str, expense: dict) -> GroupLedgerEntry:
+    return _append(db, group_id, "expense", expense)
+
+
+def add_payment(db, group_id: str, from_user: str, to_user: str, amount_cents: int) -> GroupLedgerEntry:
+    return _append(db, group_id, "payment", {"from": from_user, "to": to_user, "amount_cents": int(amount_cents)})
+
+
+def delete_entry(db, group_id: str, entry_id: str) -> bool:
+    entry = (
+        db.query(GroupLedgerEntry)
+        .filter(GroupLedgerEntry.group_id == group_id, GroupLedgerEntry.id == entry_id)
+        .first()
+    )
+    if entry is None:
+        return False
+    try:
+        _apply(db, group_id, entry_deltas(entry.kind, entry.payload), -1)
+        db.delete(entry)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return True
+
+
+# ── Reads ──────────────────────────────────────────────────────────────────
+def get_balances(db, group_id: str) -> Dict[str, int]:
+    rows = (
+        db.query(GroupBalance.user, GroupBalance.balance_cents)
+        .filter(GroupBalance.group_id == group_id)
+        .order_by(GroupBalance.user)
+        .all()
+    )
+    return {user: int(bal) for user, bal in rows}
+
+
+def recompute_balances(db, group_id: str) -> Dict[str, int]:
+    """Full recomputation from the ledger history (the slow path)."""
+    entries = (
+        db.query(GroupLedgerEntry.kind, GroupLedgerEntry.payload)
+        .filter(GroupLedgerEntry.group_id == group_id)
+        .order_by(GroupLedgerEntry.created_at)
+        .all()
+    )
+    balances = calculate_balances_vectorized([p for k, p in entries if k == "expense"])
+    for kind, payload in entries:
+        if kind == "payment":
+            for user, delta in payment_deltas(payload).items():
+                balances[user] = balances.get(user, 0) + delta
+    return balances
+
+
+def verify(db, group_id: str, repair: bool = False) -> dict:
+    """Diff incremental state against a from-scratch rebuild; optionally overwrite it."""
+    stored = get_balances(db, group_id)
+    expected = recompute_balances(db, group_id)
+
+    diffs = [
+        {"user": u, "stored_cents": stored.get(u, 0), "expected_cents": expected.get(u, 0)}
+        for u in sorted(set(stored) | set(expected))
+        if stored.get(u, 0) != expected.get(u, 0)
+    ]
+
+    if diffs and repair:
+        rebuild(db, group_id, expected)
+
+    return {"group_id": group_id, "ok": not diffs, "diffs": diffs, "repaired": bool(diffs and repair)}
+
+
+def rebuild(db, group_id: str, balances: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    balances = recompute_balances(db, group_id) if balances is None else balances
+    try:
+        db.query(GroupBalance).filter(GroupBalance.group_id == group_id).delete(synchronize_session=False)
+        db.add_all(
+            GroupBalance(group_id=group_id, user=u, balance_cents=b) for u, b in balances.items()
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return balances
+
+
+def all_group_ids(db) -> List[str]:
+    return [g for (g,) in db.query(GroupLedgerEntry.group_id).distinct().all()]
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--group", help="Group id")
+    target.add_argument("--all", action="store_true", help="Every group with ledger entries")
+    parser.add_argument("--repair", action="store_true", help="verify: overwrite drifted balances")
+    args = parser.parse_args()
+
+    from db import SessionLocal, engine
+    GroupLedgerEntry.__table__.create(bind=engine, checkfirst=True)
+    GroupBalance.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        groups = all_group_ids(db) if args.all else [args.group]
+        bad = 0
+        for group_id in groups:
+            if args.command == "rebuild":
+                balances = rebuild(db, group_id)
+                print(f"✓ Rebuilt {group_id}: {len(balances)} members")
+                continue
+            result = verify(db, group_id, repair=args.repair)
+            if result["ok"]:
+                print(f"✓ {group_id}: balances match history")
+            else:
+                bad += 1
+                status = "repaired" if result["repaired"] else "drifted"
+                print(f"✗ {group_id}: {len(result['diffs'])} members {status}")
+                for d in result["diffs"]:
+                    print(f"    {d['user']}: stored={d['stored_cents']} expected={d['expected_cents']}")
+        if bad and not args.repair:
+            raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
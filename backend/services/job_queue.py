@@ -0,0 +1,474 @@
+"""
+Persistent job queue for the expense pipeline (pipeline_jobs table).
+
+- enqueue() stores the raw expenses with stable expense ids, so a retried job
+  cannot insert the same expense twice; retries count the ids an earlier
+  attempt committed as persisted
+- claim_next() takes the oldest pending job: SELECT ... FOR UPDATE SKIP LOCKED
+  where the database supports it (Postgres), then a conditional UPDATE
+  (status = 'pending') whose rowcount decides the race, so two workers never
+  run the same job (also on SQLite, which has no row locks)
+- run_job() processes the expenses in chunks and commits progress plus a
+  heartbeat after each; failures go back to pending until max_attempts
+- per-row results (as selected by the job's result_mode) are written as one
+  pipeline_job_results row per chunk and read back page by page, so neither
+  the worker nor a status request holds a whole job's results; the raw
+  payload is cleared once the job completes
+- requeue_stale() returns jobs whose worker stopped heartbeating (crash,
+  restart) to pending; evict_expired() deletes finished jobs past their TTL
+- JobWorkerPool runs claim -> run loops in background threads and tracks
+  throughput and queue latency
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from models.pipeline_job import PipelineJob, PipelineJobResult
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ("completed", "failed")
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+def _percentiles(values) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    p50, p95 = np.percentile(np.fromiter(values, dtype=np.float64), [50, 95])
+    return {"p50": round(float(p50), 1), "p95": round(float(p95), 1), "max": round(float(max(values)), 1)}
+
+
+# ── Queue operations ───────────────────────────────────────────────────────
+def enqueue(db, raw_expenses: List[dict], result_mode: str = "full") -> PipelineJob:
+    payload = [dict(raw, id=raw.get("id") or str(uuid.uuid4())) for raw in raw_expenses]
+    job = PipelineJob(
+        status="pending",
+        payload=payload,
+        result_mode=result_mode,
+        total=len(payload),
+        queued_at=_now(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def record_completed(
+    db,
+    job_id: str,
+    summary: dict,
+    ttl_seconds: float = 86400.0,
+    result_mode: str = "full",
+    chunk_size: int = 500,
+) -> PipelineJob:
+    """Keep the summary (and results) of a synchronous bulk run so it can be fetched like a queued job."""
+    now = _now()
+    summary = dict(summary)
+    results = summary.pop("results", [])
+    chunk_size = max(int(chunk_size), 1)
+    for seq, start in enumerate(range(0, len(results), chunk_size)):
+        add_results(db, job_id, seq, results[start: start + chunk_size])
+    job = PipelineJob(
+        id=job_id,
+        status="completed",
+        payload=[],
+        result=summary,
+        result_mode=result_mode,
+        total=summary["total"],
+        processed=summary["total"],
+        queued_at=now,
+        started_at=now,
+        finished_at=now,
+        expires_at=now + timedelta(seconds=ttl_seconds),
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def add_results(db, job_id: str, seq: int, results: List[dict]) -> None:
+    """Stage one chunk of results (committed with the caller's transaction)."""
+    if results:
+        db.add(PipelineJobResult(job_id=job_id, seq=seq, count=len(results), results=results))
+
+
+def get_results(db, job_id: str, offset: int = 0, limit: int = 1000):
+    """(results[offset:offset + limit], next_offset or None), loading only the chunks that overlap."""
+    offset, limit = max(int(offset), 0), max(int(limit), 0)
+    chunks = (
+        db.query(PipelineJobResult.id, PipelineJobResult.count)
+        .filter(PipelineJobResult.job_id == job_id)
+        .order_by(PipelineJobResult.seq)
+        .all()
+    )
+    page: List[dict] = []
+    start = 0
+    for chunk_id, count in chunks:
+        end = start + count
+        if end > offset and len(page) < limit:
+            results = db.query(PipelineJobResult.results).filter(PipelineJobResult.id == chunk_id).scalar()
+            page.extend(results[max(offset - start, 0):][: limit - len(page)])
+        start = end
+    next_offset = offset + len(page)
+    return page, (next_offset if next_offset < start else None)
+
+
+def iter_results(db, job_id: str) -> Iterator[dict]:
+    """Every stored result of a job, one chunk in memory at a time."""
+    chunk_ids = [
+        chunk_id
+        for (chunk_id,) in db.query(PipelineJobResult.id)
+        .filter(PipelineJobResult.job_id == job_id)
+        .order_by(PipelineJobResult.seq)
+    ]
+    for chunk_id in chunk_ids:
+        yield from db.query(PipelineJobResult.results).filter(PipelineJobResult.id == chunk_id).scalar()
+
+
+def _delete_results(db, job_ids) -> int:
+    return (
+        db.query(PipelineJobResult)
+        .filter(PipelineJobResult.job_id.in_(job_ids))
+        .delete(synchronize_session=False)
+    )
+
+
+def get_job(db, job_id: str) -> Optional[PipelineJob]:
+    # Workers update jobs from other sessions; always read the current row
+    return db.get(PipelineJob, job_id, populate_existing=True)
+
+
+def job_counts(db) -> Dict[str, int]:
+    from sqlalchemy import func
+
+    rows = db.query(PipelineJob.status, func.count(PipelineJob.id)).group_by(PipelineJob.status).all()
+    counts = {"pending": 0, "processing": 0, "completed": 0, "failed": 0}
+    counts.update({status: n for status, n in rows})
+    return counts
+
+
+def claim_next(db, worker_id: str, retries: int = 5) -> Optional[PipelineJob]:
+    """Atomically move the oldest pending job to processing for this worker."""
+    for _ in range(retries):
+        job_id = (
+            db.query(PipelineJob.id)
+            .filter(PipelineJob.status == "pending")
+            .order_by(PipelineJob.queued_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar()
+        )
+        if job_id is None:
+            db.rollback()
+            return None
+
+        now = _now()
+        claimed = (
+            db.query(PipelineJob)
+            .filter(PipelineJob.id == job_id, PipelineJob.status == "pending")
+            .update(
+                {
+                    PipelineJob.status: "processing",
+                    PipelineJob.worker_id: worker_id,
+                    PipelineJob.started_at: now,
+                    PipelineJob.heartbeat_at: now,
+                    PipelineJob.attempts: PipelineJob.attempts + 1,
+                }
+            )
+        )
+        db.commit()
+        if claimed:
+            return db.get(PipelineJob, job_id)
+        # Another worker won this one; try the next
+    return None
+
+
+def _update_owned(db, job: PipelineJob, worker_id: str, values: dict) -> bool:
+    """Write only while this worker still owns the job (it may have been requeued as stale)."""
+    updated = (
+        db.query(PipelineJob)
+        .filter(PipelineJob.id == job.id, PipelineJob.worker_id == worker_id, PipelineJob.status == "processing")
+        .update(values)
+    )
+    if not updated:
+        db.rollback()
+        logger.warning(f"Pipeline job {job.id} is no longer owned by {worker_id}; dropping its update")
+        return False
+    db.commit()
+    return True
+
+
+def run_job(
+    db,
+    job: PipelineJob,
+    worker_id: str,
+    chunk_size: int = 500,
+    ttl_seconds: float = 86400.0,
+    max_attempts: int = 3,
+) -> str:
+    """Process a claimed job; returns its new status (completed | pending | failed | lost)."""
+    from services.pipeline_service import run_bulk_pipeline
+
+    job_id = job.id
+    # A retry re-runs expenses an earlier attempt may already have committed
+    retry = job.attempts > 1
+    raw = list(job.payload or [])
+    result_mode = job.result_mode or "full"
+    chunk_size = max(int(chunk_size), 1)
+    processed = success = 0
+    try:
+        # Results of an earlier, failed attempt
+        _delete_results(db, [job_id])
+        db.commit()
+
+        for seq, offset in enumerate(range(0, len(raw), chunk_size)):
+            summary = run_bulk_pipeline(
+                raw[offset: offset + chunk_size],
+                db,
+                job_id=job_id,
+                store_result=False,
+                result_mode=result_mode,
+                skip_existing=retry,
+            )
+            results = summary.get("results", [])
+            for result in results:
+                result["index"] += offset
+            add_results(db, job_id, seq, results)
+            processed += summary["total"]
+            success += summary["success"]
+            progress = {PipelineJob.processed: processed, PipelineJob.heartbeat_at: _now()}
+            if not _update_owned(db, job, worker_id, progress):
+                return "lost"
+
+        finished_at = _now()
+        summary = {
+            "job_id": job_id,
+            "total": len(raw),
+            "success": success,
+            "errors": len(raw) - success,
+            "processed_at": finished_at.isoformat(),
+        }
+        done = {
+            PipelineJob.status: "completed",
+            PipelineJob.result: summary,
+            PipelineJob.payload: [],
+            PipelineJob.error: None,
+            PipelineJob.finished_at: finished_at,
+            PipelineJob.expires_at: finished_at + timedelta(seconds=ttl_seconds),
+        }
+        return "completed" if _update_owned(db, job, worker_id, done) else "lost"
+
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Pipeline job {job_id} failed: {e}")
+        job = db.get(PipelineJob, job_id)
+        if job is None:
+            return "lost"
+        if job.attempts >= max_attempts:
+            finished_at = _now()
+            values = {
+                PipelineJob.status: "failed",
+                PipelineJob.error: str(e),
+                PipelineJob.finished_at: finished_at,
+                PipelineJob.expires_at: finished_at + timedelta(seconds=ttl_seconds),
+            }
+            status = "failed"
+        else:
+            values = {
+                PipelineJob.status: "pending",
+                PipelineJob.error: str(e),
+                PipelineJob.worker_id: None,
+                PipelineJob.processed: 0,
+            }
+            status = "pending"
+        return status if _update_owned(db, job, worker_id, values) else "lost"
+
+
+def requeue_stale(db, stale_after_s: float, max_attempts: int = 3) -> int:
+    """Jobs whose worker stopped heartbeating go back to pending (or fail when out of attempts)."""
+    cutoff = _now() - timedelta(seconds=stale_after_s)
+    stale = (PipelineJob.status == "processing", PipelineJob.heartbeat_at < cutoff)
+    now = _now()
+    failed = (
+        db.query(PipelineJob)
+        .filter(*stale, PipelineJob.attempts >= max_attempts)
+        .update(
+            {
+                PipelineJob.status: "failed",
+                PipelineJob.error: "worker stopped responding",
+                PipelineJob.finished_at: now,
+                PipelineJob.expires_at: now,
+            },
+        )
+    )
+    requeued = (
+        db.query(PipelineJob)
+        .filter(*stale)
+        .update(
+            {PipelineJob.status: "pending", PipelineJob.worker_id: None, PipelineJob.processed: 0},
+        )
+    )
+    db.commit()
+    return failed + requeued
+
+
+def evict_expired(db) -> int:
+    expired = (PipelineJob.status.in_(FINISHED), PipelineJob.expires_at < _now())
+    job_ids = [job_id for (job_id,) in db.query(PipelineJob.id).filter(*expired)]
+    if not job_ids:
+        return 0
+    _delete_results(db, job_ids)
+    deleted = (
+        db.query(PipelineJob)
+        .filter(PipelineJob.id.in_(job_ids))
+        .delete(synchronize_session="fetch")
+    )
+    db.commit()
+    return deleted
+
+
+def process_pending(db, worker_id: str = "manual", **run_kwargs) -> int:
+    """Run every pending job in this thread (manual trigger / tests)."""
+    processed = 0
+    while True:
+        job = claim_next(db, worker_id)
+        if job is None:
+            return processed
+        run_job(db, job, worker_id, **run_kwargs)
+        processed += 1
+
+
+# ── Worker pool ────────────────────────────────────────────────────────────
+class JobWorkerPool:
+    """
+    Background threads that claim and run pipeline jobs.
+
+    - each worker polls every poll_interval_s; wake() (called on enqueue)
+      lets an idle worker pick a new job up immediately
+    - every maintenance_interval_s one worker requeues stale jobs and evicts
+      finished jobs past their TTL
+    - stats(): throughput (rows/sec of busy time) and queue latency
+      (queued -> claimed) percentiles over the last `window` jobs
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        workers: int = 2,
+        poll_interval_s: float = 1.0,
+        chunk_size: int = 500,
+        ttl_seconds: float = 86400.0,
+        max_attempts: int = 3,
+        stale_after_s: float = 300.0,
+        maintenance_interval_s: float = 60.0,
+        window: int = 1000,
+    ):
+        self.session_factory = session_factory
+        self.workers = max(int(workers), 1)
+        self.poll_interval_s = max(float(poll_interval_s), 0.01)
+        self.run_kwargs = {"chunk_size": chunk_size, "ttl_seconds": ttl_seconds, "max_attempts": max_attempts}
+        self.max_attempts = max_attempts
+        self.stale_after_s = stale_after_s
+        self.maintenance_interval_s = maintenance_interval_s
+        self.name = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Condition()
+        self._lock = threading.Lock()
+        self._next_maintenance = 0.0
+
+        self.jobs = {"completed": 0, "pending": 0, "failed": 0, "lost": 0}
+        self.rows_processed = 0
+        self.busy_s = 0.0
+        self.evicted = 0
+        self.requeued = 0
+        self._queue_latency_ms = deque(maxlen=window)
+        self._run_ms = deque(maxlen=window)
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, args=(f"{self.name}-{i}",), name=f"pipeline-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info(f"Pipeline worker pool started with {self.workers} worker(s).")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self.wake()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def wake(self) -> None:
+        with self._wake:
+            self._wake.notify_all()
+
+    def _maintain(self, db) -> None:
+        with self._lock:
+            if time.monotonic() < self._next_maintenance:
+                return
+            self._next_maintenance = time.monotonic() + self.maintenance_interval_s
+        requeued = requeue_stale(db, self.stale_after_s, self.max_attempts)
+        evicted = evict_expired(db)
+        with self._lock:
+            self.requeued += requeued
+            self.evicted += evicted
+        if requeued or evicted:
+            logger.info(f"Pipeline jobs: requeued {requeued} stale, evicted {evicted} expired.")
+
+    def _run(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                self._maintain(db)
+                job = claim_next(db, worker_id)
+                if job is not None:
+                    latency_ms = (job.started_at - job.queued_at).total_seconds() * 1000.0
+                    t0 = time.perf_counter()
+                    status = run_job(db, job, worker_id, **self.run_kwargs)
+                    elapsed = time.perf_counter() - t0
+                    with self._lock:
+                        self.jobs[status] += 1
+                        self.busy_s += elapsed
+                        if status == "completed":
+                            self.rows_processed += job.total
+                        self._queue_latency_ms.append(latency_ms)
+                        self._run_ms.append(elapsed * 1000.0)
+            except Exception as e:
+                job = None
+                logger.warning(f"Pipeline worker {worker_id} error: {e}")
+            finally:
+                db.close()
+
+            if job is None:
+                with self._wake:
+                    self._wake.wait(self.poll_interval_s)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": any(t.is_alive() for t in self._threads),
+                "jobs": dict(self.jobs),
+                "rows_processed": self.rows_processed,
+                "rows_per_sec": round(self.rows_processed / self.busy_s, 1) if self.busy_s else 0.0,
+                "queue_latency_ms": _percentiles(self._queue_latency_ms),
+                "run_ms": _percentiles(self._run_ms),
+                "requeued_stale": self.requeued,
+                "evicted": self.evicted,
+            }
@@ -0,0 +1,95 @@
+"""
+Bounded merchant -> category cache shared by categorizer call sites.
+
+Statement lines repeat the same merchants with different store numbers, order
+ids and card suffixes ("DOORDASH*ORDER 81723", "AMAZON.COM*2K4XY7 ...1234").
+Lookups go through two LRU levels:
+- raw: the exact description string (a plain dict hit for repeated lines)
+- normalized: lowercased, every digit run collapsed to "#", so variants that
+  only differ in numbers share one entry
+
+Collapsing digits cannot change a keyword match as long as no keyword
+contains a digit or "#" (see normalization_safe): no keyword occurrence is
+split, and no new one can be formed across the placeholder.
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable
+
+_DIGITS = re.compile(r"\d+")
+_MISSING = object()
+
+
+def normalize_merchant(text: str) -> str:
+    return _DIGITS.sub("#", text.lower())
+
+
+def normalization_safe(keywords: Iterable[str]) -> bool:
+    return not any("#" in kw or _DIGITS.search(kw) for kw in keywords)
+
+
+class MerchantCategoryCache:
+    def __init__(self, max_size: int = 50000, normalize: Callable[[str], str] = normalize_merchant):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.max_size = int(max_size)
+        self.normalize = normalize
+
+        self._lock = threading.Lock()
+        self._raw: "OrderedDict[str, Any]" = OrderedDict()
+        self._normalized: "OrderedDict[str, Any]" = OrderedDict()
+        self.raw_hits = 0
+        self.normalized_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _put(self, entries: "OrderedDict[str, Any]", key: str, value: Any) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, text: str, compute: Callable[[str], Any]) -> Any:
+        """Cached compute(text); compute must depend only on normalize(text)."""
+        with self._lock:
+            value = self._raw.get(text, _MISSING)
+            if value is not _MISSING:
+                self._raw.move_to_end(text)
+                self.raw_hits += 1
+                return value
+        key = self.normalize(text)
+        with self._lock:
+            value = self._normalized.get(key, _MISSING)
+            if value is not _MISSING:
+                self._normalized.move_to_end(key)
+                self.normalized_hits += 1
+                self._put(self._raw, text, value)
+                return value
+            self.misses += 1
+        value = compute(text)
+        with self._lock:
+            self._put(self._normalized, key, value)
+            self._put(self._raw, text, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._raw.clear()
+            self._normalized.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.raw_hits + self.normalized_hits
+            lookups = hits + self.misses
+            return {
+                "size": len(self._normalized),
+                "raw_size": len(self._raw),
+                "max_size": self.max_size,
+                "raw_hits": self.raw_hits,
+                "normalized_hits": self.normalized_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
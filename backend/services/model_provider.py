@@ -0,0 +1,133 @@
+"""
+Process-wide holder for the ML models served by the backend.
+
+Each model is registered once with a factory and built on first get(), under
+a per-model lock, so every route and service in a worker shares one instance
+and concurrent first requests never build it twice. Load times are logged
+and kept for status().
+
+Routes take models through FastAPI dependencies (get_transaction_categorizer,
+get_card_recommender), so tests can swap them with app.dependency_overrides
+or models.set().
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from config import settings
+from transaction_categorizer import TransactionCategorizer
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# <repo>/ml/models holds the card recommender (backend/ml is a different package)
+ML_MODELS_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "ml", "models")
+)
+
+
+class ModelProvider:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._instances: Dict[str, Any] = {}
+        self._load_ms: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._locks[name] = threading.Lock()
+            self._instances.pop(name, None)
+            self._load_ms.pop(name, None)
+            self._errors.pop(name, None)
+
+    def set(self, name: str, instance: Any) -> None:
+        """Use an already built instance (tests, custom wiring)."""
+        with self._lock:
+            self._locks.setdefault(name, threading.Lock())
+            self._instances[name] = instance
+            self._errors.pop(name, None)
+
+    @property
+    def names(self):
+        return list(self._locks)
+
+    def loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name, _MISSING)
+        if instance is not _MISSING:
+            return instance
+        try:
+            lock = self._locks[name]
+        except KeyError:
+            raise KeyError(f"Unknown model: {name}") from None
+
+        with lock:
+            instance = self._instances.get(name, _MISSING)
+            if instance is not _MISSING:
+                return instance
+            t0 = time.perf_counter()
+            try:
+                instance = self._factories[name]()
+            except Exception as e:
+                self._errors[name] = str(e)
+                logger.warning(f"Model {name} failed to load: {e}")
+                raise
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            self._load_ms[name] = elapsed_ms
+            self._errors.pop(name, None)
+            self._instances[name] = instance
+        logger.info(f"Loaded model {name} in {elapsed_ms:.1f} ms")
+        return instance
+
+    def load_all(self, names: Optional[Iterable[str]] = None) -> Dict[str, Optional[float]]:
+        """Build every (or the given) model now; failures are logged, not raised."""
+        out: Dict[str, Optional[float]] = {}
+        for name in list(names) if names is not None else self.names:
+            try:
+                self.get(name)
+            except Exception:
+                pass
+            out[name] = self._load_ms.get(name)
+        return out
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "loaded": self.loaded(name),
+                "load_ms": round(self._load_ms[name], 1) if name in self._load_ms else None,
+                "error": self._errors.get(name),
+            }
+            for name in self.names
+        }
+
+
+def _load_card_recommender():
+    # Imported here: the recommender (and torch, unless served from the .npz
+    # export) is only paid for when it is first used
+    if ML_MODELS_PATH not in sys.path:
+        sys.path.append(ML_MODELS_PATH)
+    from card_recommender import CardRecommender
+
+    return CardRecommender(backend=settings.CARD_RECOMMENDER_BACKEND, arch=settings.CARD_RECOMMENDER_ARCH)
+
+
+models = ModelProvider()
+models.register("transaction_categorizer", TransactionCategorizer)
+models.register("card_recommender", _load_card_recommender)
+
+
+def get_transaction_categorizer() -> TransactionCategorizer:
+    return models.get("transaction_categorizer")
+
+
+def get_card_recommender():
+    return models.get("card_recommender")
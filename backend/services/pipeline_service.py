@@ -2,29 +2,43 @@
 Data Pipeline Service
 Handles bulk expense ingestion, auto-categorization, and transformation.
 """
-import sys
-import os
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional, Union
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
+import csv
+import json
+import multiprocessing
+import threading
+import time
 import uuid
 
-# Add ml/models to path
-ml_models_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ml', 'models'))
-sys.path.insert(0, ml_models_path)
+from config import settings
+from services.model_provider import get_transaction_categorizer
 
-from transaction_categorizer import TransactionCategorizer
 
-# Initialize categorizer once
-categorizer = TransactionCategorizer()
+# full = every row, errors_only = failed rows (validation, parse or persist), summary = counts only
+RESULT_MODES = ("full", "errors_only", "summary")
 
 
-# ── In-memory job queue (use Celery + Redis in production) ─────────────────
-_job_queue: List[dict] = []
-_job_results: dict = {}
+def _new_job_id() -> str:
+    return str(uuid.uuid4())
 
 
-def _new_job_id() -> str:
-    return str(uuid.uuid4())[:8]
+def row_succeeded(result: dict) -> bool:
+    """A row counts as a success only if it was valid and, when persisted, actually stored."""
+    return result["success"] and result["expense"].get("persisted") is not False
+
+
+def select_results(results: List[dict], mode: str = "full") -> List[dict]:
+    if mode == "full":
+        return results
+    if mode == "errors_only":
+        return [r for r in results if not row_succeeded(r)]
+    if mode == "summary":
+        return []
+    raise ValueError(f"Unknown result mode: {mode} (expected {' | '.join(RESULT_MODES)})")
 
 
 # ── Step 1: Validate raw expense ───────────────────────────────────────────
@@ -38,6 +52,10 @@ def validate_expense(raw: dict) -> dict:
         errors.append("amount or amount_cents is required")
     if not raw.get("payer_id"):
         errors.append("payer_id is required")
+    try:
+        float(raw.get("amount_cents") or raw.get("amount") or 0)
+    except (TypeError, ValueError):
+        errors.append("amount must be a number")
 
     if errors:
         return {"valid": False, "errors": errors}
@@ -50,9 +68,9 @@ def transform_expense(raw: dict) -> dict:
     """Convert raw input into structured expense format."""
     # Handle both dollars and cents input
     if raw.get("amount_cents"):
-        amount_cents = int(raw["amount_cents"])
+        amount_cents = int(float(raw["amount_cents"]))
     elif raw.get("amount"):
-        amount_cents = int(float(raw["amount"]) * 100)
+        amount_cents = int(round(float(raw["amount"]) * 100))
     else:
         amount_cents = 0
 
@@ -65,20 +83,36 @@ def transform_expense(raw: dict) -> dict:
         "members": raw.get("members", []),
         "split_type": raw.get("split_type", "equal"),
         "created_at": raw.get("created_at") or datetime.utcnow().isoformat(),
-        "raw": raw,  # keep original
     }
 
 
 # ── Step 3: Enrich with ML categorization ─────────────────────────────────
 def enrich_expense(expense: dict) -> dict:
     """Auto-categorize expense using ML model."""
-    category, confidence = categorizer.categorize(expense["description"])
+    category, confidence = get_transaction_categorizer().categorize(expense["description"])
     expense["category"] = category
     expense["category_confidence"] = confidence
     expense["categorized_at"] = datetime.utcnow().isoformat()
     return expense
 
 
+def enrich_expenses(expenses: List[dict]) -> List[dict]:
+    """enrich_expense for a batch, with one categorize_many call."""
+    if not expenses:
+        return expenses
+    categories, confidences = get_transaction_categorizer().categorize_many([e["description"] for e in expenses])
+    return _set_categories(expenses, categories.tolist(), confidences.tolist())
+
+
+def _set_categories(expenses: List[dict], categories: List[str], confidences: List[float]) -> List[dict]:
+    categorized_at = datetime.utcnow().isoformat()
+    for expense, category, confidence in zip(expenses, categories, confidences):
+        expense["category"] = category
+        expense["category_confidence"] = confidence
+        expense["categorized_at"] = categorized_at
+    return expenses
+
+
 # ── Step 4: Persist to DB ─────────────────────────────────────────────────
 def persist_expense(expense: dict, db) -> dict:
     """Save structured expense to database."""
@@ -97,6 +131,54 @@ def persist_expense(expense: dict, db) -> dict:
     return expense
 
 
+def persist_expenses(
+    expenses: List[dict], db, chunk_size: Optional[int] = None, skip_existing: bool = False
+) -> List[dict]:
+    """
+    Bulk persist_expense: one multi-row INSERT and one commit per chunk.
+    A chunk that fails (duplicate id, constraint, ...) is rolled back and
+    retried row by row, so every expense still ends up with persisted=True
+    or persisted=False plus persist_error.
+    skip_existing (retried jobs): ids already in expenses were committed by an
+    earlier attempt, so they count as persisted instead of as duplicates.
+    """
+    from sqlalchemy import insert
+    from models.expense import Expense
+
+    chunk_size = max(int(chunk_size or settings.PIPELINE_PERSIST_CHUNK_SIZE), 1)
+    for start in range(0, len(expenses), chunk_size):
+        chunk = expenses[start: start + chunk_size]
+        if skip_existing:
+            ids = [e["id"] for e in chunk]
+            existing = {expense_id for (expense_id,) in db.query(Expense.id).filter(Expense.id.in_(ids))}
+            for expense in chunk:
+                if expense["id"] in existing:
+                    expense["persisted"] = True
+            chunk = [e for e in chunk if e["id"] not in existing]
+            if not chunk:
+                continue
+        rows = [
+            {
+                "id": e["id"],
+                "description": e["description"],
+                "amount_cents": e["amount_cents"],
+                "payer_id": e["payer_id"],
+            }
+            for e in chunk
+        ]
+        try:
+            db.execute(insert(Expense), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            for expense in chunk:
+                _persist_or_flag(expense, db)
+            continue
+        for expense in chunk:
+            expense["persisted"] = True
+    return expenses
+
+
 # ── Main pipeline: process single expense ─────────────────────────────────
 def run_pipeline(raw: dict, db=None) -> dict:
     """
@@ -120,11 +202,7 @@ def run_pipeline(raw: dict, db=None) -> dict:
 
     # Step 4: Persist (if db provided)
     if db:
-        try:
-            expense = persist_expense(expense, db)
-        except Exception as e:
-            expense["persisted"] = False
-            expense["persist_error"] = str(e)
+        expense = _persist_or_flag(expense, db)
 
     return {
         "success": True,
@@ -132,25 +210,75 @@ def run_pipeline(raw: dict, db=None) -> dict:
     }
 
 
+def _persist_or_flag(expense: dict, db) -> dict:
+    try:
+        return persist_expense(expense, db)
+    except Exception as e:
+        db.rollback()
+        expense["persisted"] = False
+        expense["persist_error"] = str(e)
+        return expense
+
+
 # ── Bulk pipeline: process multiple expenses ───────────────────────────────
-def run_bulk_pipeline(raw_expenses: List[dict], db=None) -> dict:
+def _prepare_batch(batch: List[Union[dict, Exception]], offset: int = 0):
     """
-    Process a batch of expenses through the full pipeline.
-    Returns summary with success/failure counts.
+    Steps 1-2 for a batch: (results, valid) where results holds the parse /
+    validation failures (None for valid rows) and valid is [(i, expense)].
     """
-    job_id = _new_job_id()
-    results = []
-    success_count = 0
-    error_count = 0
-
-    for i, raw in enumerate(raw_expenses):
-        result = run_pipeline(raw, db)
-        result["index"] = i
-        results.append(result)
-        if result["success"]:
-            success_count += 1
+    results: List[Optional[dict]] = [None] * len(batch)
+    valid = []
+    for i, raw in enumerate(batch):
+        if isinstance(raw, Exception):
+            results[i] = {"success": False, "stage": "parse", "errors": [str(raw)], "index": offset + i}
+            continue
+        validation = validate_expense(raw)
+        if not validation["valid"]:
+            results[i] = {
+                "success": False,
+                "stage": "validation",
+                "errors": validation["errors"],
+                "index": offset + i,
+            }
         else:
-            error_count += 1
+            valid.append((i, transform_expense(raw)))
+    return results, valid
+
+
+def run_bulk_pipeline(
+    raw_expenses: List[dict],
+    db=None,
+    job_id: Optional[str] = None,
+    store_result: bool = True,
+    persist_chunk_size: Optional[int] = None,
+    result_mode: str = "full",
+    skip_existing: bool = False,
+) -> dict:
+    """
+    Process a batch of expenses through the full pipeline.
+    Returns summary with success/failure counts, plus the per-row results
+    picked by result_mode (none for "summary").
+    With a db the summary is also kept as a completed job (GET /jobs/{job_id})
+    unless store_result is False (queued jobs store their own).
+    skip_existing is set by job retries (see persist_expenses).
+    """
+    select_results([], result_mode)  # reject unknown modes before doing any work
+    job_id = job_id or _new_job_id()
+
+    # Steps 1-2 per row
+    results, valid = _prepare_batch(raw_expenses)
+
+    # Steps 3-4 for the whole batch (chunked INSERTs instead of a commit per row)
+    expenses = enrich_expenses([expense for _, expense in valid])
+    if db:
+        persist_expenses(expenses, db, chunk_size=persist_chunk_size, skip_existing=skip_existing)
+
+    for i, expense in valid:
+        results[i] = {"success": True, "expense": expense, "index": i}
+
+    # Persist failures are errors too (the same rows errors_only returns)
+    success_count = sum(1 for _, expense in valid if expense.get("persisted") is not False)
+    error_count = len(raw_expenses) - success_count
 
     summary = {
         "job_id": job_id,
@@ -158,41 +286,256 @@ def run_bulk_pipeline(raw_expenses: List[dict], db=None) -> dict:
         "success": success_count,
         "errors": error_count,
         "processed_at": datetime.utcnow().isoformat(),
-        "results": results,
+        "result_mode": result_mode,
     }
-
-    # Store result for async retrieval
-    _job_results[job_id] = summary
+    if result_mode != "summary":
+        summary["results"] = select_results(results, result_mode)
+
+    if db and store_result:
+        from services.job_queue import record_completed
+
+        record_completed(
+            db, job_id, summary,
+            ttl_seconds=settings.PIPELINE_JOB_TTL_SECONDS,
+            result_mode=result_mode,
+            chunk_size=settings.PIPELINE_JOB_CHUNK_SIZE,
+        )
     return summary
 
 
-# ── Async job queue ────────────────────────────────────────────────────────
-def queue_bulk_job(raw_expenses: List[dict]) -> str:
-    """Queue a bulk job for background processing. Returns job_id."""
-    job_id = _new_job_id()
-    _job_queue.append({
-        "job_id": job_id,
-        "expenses": raw_expenses,
-        "queued_at": datetime.utcnow().isoformat(),
-        "status": "pending",
-    })
-    _job_results[job_id] = {"status": "pending", "job_id": job_id}
-    return job_id
-
-
-def get_job_status(job_id: str) -> Optional[dict]:
-    """Get status/result of a job by ID."""
-    return _job_results.get(job_id)
-
-
-def process_queue(db=None):
-    """Process all pending jobs in queue (call this on a scheduler)."""
-    processed = 0
-    for job in _job_queue:
-        if job["status"] == "pending":
-            job["status"] = "processing"
-            result = run_bulk_pipeline(job["expenses"], db)
-            _job_results[job["job_id"]] = {**result, "status": "completed"}
-            job["status"] = "completed"
-            processed += 1
-    return {"processed_jobs": processed}
\ No newline at end of file
+# ── Async job queue (pipeline_jobs table, see services/job_queue.py) ───────
+def queue_bulk_job(raw_expenses: List[dict], db, result_mode: str = "full") -> str:
+    """Queue a bulk job for the background worker pool. Returns job_id."""
+    from services.job_queue import enqueue
+
+    select_results([], result_mode)  # reject unknown modes before queueing
+    return enqueue(db, raw_expenses, result_mode=result_mode).id
+
+
+def get_job_status(job_id: str, db, offset: int = 0, limit: Optional[int] = None) -> Optional[dict]:
+    """Get status/progress of a job by ID, with one page of its stored results."""
+    from services.job_queue import get_job, get_results
+
+    job = get_job(db, job_id)
+    if job is None:
+        return None
+    status = job.to_dict()
+    if job.status == "completed" and job.result_mode != "summary":
+        limit = settings.PIPELINE_RESULTS_PAGE_SIZE if limit is None else limit
+        status["results"], status["next_offset"] = get_results(db, job_id, offset, limit)
+    return status
+
+
+def process_queue(db):
+    """Process all pending jobs in this request (the worker pool normally does this)."""
+    from services.job_queue import process_pending
+
+    processed = process_pending(
+        db,
+        chunk_size=settings.PIPELINE_JOB_CHUNK_SIZE,
+        ttl_seconds=settings.PIPELINE_JOB_TTL_SECONDS,
+        max_attempts=settings.PIPELINE_JOB_MAX_ATTEMPTS,
+    )
+    return {"processed_jobs": processed}
+
+
+# ── Streaming ingestion (NDJSON / CSV uploads) ─────────────────────────────
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Union[dict, ValueError]]:
+    """One raw expense per non-empty line; an unparseable line yields a ValueError instead."""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"invalid JSON: {e}")
+            continue
+        yield row if isinstance(row, dict) else ValueError("expected a JSON object per line")
+
+
+def iter_csv(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Rows of a CSV with a header (description, amount | amount_cents, payer_id,
+    members, split_type); members are separated by ';'.
+    """
+    for row in csv.DictReader(lines):
+        raw = {
+            k.strip(): v.strip()
+            for k, v in row.items()
+            if k and isinstance(v, str) and v.strip()
+        }
+        if "members" in raw:
+            raw["members"] = [m.strip() for m in raw["members"].split(";") if m.strip()]
+        yield raw
+
+
+class _StageStats:
+    """Rows and busy seconds per pipeline stage (rows/sec shows the bottleneck)."""
+
+    STAGES = ("prepare", "enrich", "persist")
+
+    def __init__(self):
+        self.rows = dict.fromkeys(self.STAGES, 0)
+        self.busy_s = dict.fromkeys(self.STAGES, 0.0)
+
+    def add(self, stage: str, rows: int, seconds: float) -> None:
+        self.rows[stage] += rows
+        self.busy_s[stage] += seconds
+
+    def summary(self) -> Dict[str, dict]:
+        return {
+            stage: {
+                "rows": self.rows[stage],
+                "busy_s": round(self.busy_s[stage], 3),
+                "rows_per_sec": round(self.rows[stage] / self.busy_s[stage], 1) if self.busy_s[stage] else None,
+            }
+            for stage in self.STAGES
+        }
+
+
+_enrich_pools: Dict[tuple, Executor] = {}
+_enrich_pools_lock = threading.Lock()
+
+
+def _enrich_pool(executor: str, workers: int) -> Executor:
+    """Shared per (executor, workers); process workers build their own categorizer once."""
+    key = (executor, workers)
+    with _enrich_pools_lock:
+        pool = _enrich_pools.get(key)
+        if pool is None:
+            if executor == "process":
+                # spawn, not fork: the app process runs other threads (workers, batchers)
+                pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            elif executor == "thread":
+                pool = ThreadPoolExecutor(workers, thread_name_prefix="pipeline-enrich")
+            else:
+                raise ValueError(f"Unknown enrichment executor: {executor} (expected process | thread)")
+            _enrich_pools[key] = pool
+    return pool
+
+
+def shutdown_enrich_pools() -> None:
+    with _enrich_pools_lock:
+        pools = list(_enrich_pools.values())
+        _enrich_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _categorize_chunk(descriptions: List[str]) -> tuple:
+    """Enrichment work unit (runs in a pool worker): categories, confidences, busy seconds."""
+    t0 = time.perf_counter()
+    if not descriptions:
+        return [], [], 0.0
+    categories, confidences = get_transaction_categorizer().categorize_many(descriptions)
+    return categories.tolist(), confidences.tolist(), time.perf_counter() - t0
+
+
+def _persist_chunk(expenses: List[dict], db, chunk_size: Optional[int] = None) -> float:
+    t0 = time.perf_counter()
+    persist_expenses(expenses, db, chunk_size=chunk_size)
+    return time.perf_counter() - t0
+
+
+def _completed(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def stream_bulk_pipeline(
+    rows: Iterable[Union[dict, Exception]],
+    db=None,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    executor: Optional[str] = None,
+    result_mode: str = "full",
+) -> Iterator[dict]:
+    """
+    Staged pipeline over an iterator of raw expenses, batch_size rows at a time:
+
+    - prepare: parse errors, validate, transform (this thread)
+    - enrich: categorize_many on a pool of `workers` processes or threads
+      (0 = inline in this thread)
+    - persist: one writer thread doing chunked INSERTs (the only DB user)
+
+    At most workers + 1 batches wait on each of enrich and persist, so a
+    slow stage throttles reading and memory stays bounded. Yields one result
+    per row picked by result_mode (index = position in the input, input
+    order), then a final {"summary": ...} with rows/sec per stage.
+    """
+    select_results([], result_mode)
+    batch_size = max(int(batch_size or settings.PIPELINE_STREAM_BATCH_SIZE), 1)
+    workers = settings.PIPELINE_ENRICH_WORKERS if workers is None else max(int(workers), 0)
+    pool = _enrich_pool(executor or settings.PIPELINE_ENRICH_EXECUTOR, workers) if workers else None
+    writer = ThreadPoolExecutor(1, thread_name_prefix="pipeline-writer") if db else None
+    max_pending = max(workers, 1) + 1
+
+    stats = _StageStats()
+    enriching: deque = deque()
+    writing: deque = deque()
+    rows = iter(rows)
+    total = success = 0
+    t_start = time.perf_counter()
+
+    def to_writer(offset, results, valid, future):
+        categories, confidences, busy_s = future.result()
+        stats.add("enrich", len(valid), busy_s)
+        expenses = _set_categories([e for _, e in valid], categories, confidences)
+        persisted = writer.submit(_persist_chunk, expenses, db) if writer else _completed(None)
+        writing.append((offset, results, valid, persisted))
+
+    def finish(offset, results, valid, persisted):
+        busy_s = persisted.result()
+        if busy_s is not None:
+            stats.add("persist", len(valid), busy_s)
+        for i, expense in valid:
+            results[i] = {"success": True, "expense": expense, "index": offset + i}
+        return results
+
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            t0 = time.perf_counter()
+            results, valid = _prepare_batch(batch, offset=total)
+            stats.add("prepare", len(batch), time.perf_counter() - t0)
+
+            descriptions = [e["description"] for _, e in valid]
+            future = pool.submit(_categorize_chunk, descriptions) if pool else _completed(_categorize_chunk(descriptions))
+            enriching.append((total, results, valid, future))
+            total += len(batch)
+
+            while len(enriching) > max_pending:
+                to_writer(*enriching.popleft())
+            while len(writing) > max_pending:
+                results = finish(*writing.popleft())
+                success += sum(map(row_succeeded, results))
+                yield from select_results(results, result_mode)
+
+        while enriching:
+            to_writer(*enriching.popleft())
+        while writing:
+            results = finish(*writing.popleft())
+            success += sum(map(row_succeeded, results))
+            yield from select_results(results, result_mode)
+    finally:
+        for *_, future in enriching:
+            future.cancel()
+        if writer:
+            writer.shutdown(wait=True)
+
+    elapsed_s = time.perf_counter() - t_start
+    yield {
+        "summary": {
+            "total": total,
+            "success": success,
+            "errors": total - success,
+            "processed_at": datetime.utcnow().isoformat(),
+            "elapsed_s": round(elapsed_s, 3),
+            "rows_per_sec": round(total / elapsed_s, 1) if elapsed_s else None,
+            "result_mode": result_mode,
+            "stages": stats.summary(),
+        }
+    }
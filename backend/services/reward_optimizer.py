@@ -0,0 +1,394 @@
+"""
+Reward allocation engine: splits payments across cards as a min-cost-flow problem.
+
+A card is a set of parallel arcs from the payment to the sink, one per reward
+tier: the category rate up to the card's remaining bonus cap, then its base
+rate up to its remaining limit. Each arc is worth (rate - fee_pct) per dollar.
+- One transaction: with the set of used cards fixed, filling arcs by value is
+  the exact min-cost flow. Cards with a fixed per-charge fee or a minimum
+  charge are on/off decisions, enumerated (few cards) or searched locally.
+- A batch: transactions only differ by category and amount, so they are
+  aggregated into a category -> (card, tier) transportation problem, solved
+  with successive shortest paths over shared limits/caps, then handed back
+  out to individual transactions.
+The flow always allocates as much as the cards can take before it maximises
+net reward; anything left over is reported as unallocated_cents.
+"""
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from .settlement_service import detect_category, get_reward_rate
+
+# Subsets of fee / minimum-charge cards enumerated exactly up to this many
+EXACT_BINARY_CARDS = 10
+_EPS = 1e-9
+
+
+@dataclass
+class CardTerms:
+    name: str
+    limit_cents: int
+    rates: Dict[str, float]           # category -> reward %, falls back to CATEGORY_REWARDS
+    base_rate_pct: float = 1.0        # earned above the bonus cap (capped cards only)
+    bonus_cap_cents: Optional[int] = None  # remaining spend at the category rate
+    fee_pct: float = 0.0              # e.g. surcharge / foreign transaction fee
+    fee_cents: int = 0                # fixed fee per charge
+    min_charge_cents: int = 0         # card cannot be charged less than this
+
+    @classmethod
+    def from_dict(cls, card: dict, default_limit: int) -> "CardTerms":
+        limit = card.get("limit_cents")
+        return cls(
+            name=card["name"],
+            limit_cents=int(default_limit if limit is None else limit),
+            rates=dict(card.get("rewards") or {}),
+            base_rate_pct=float(card.get("base_rate_pct", 1.0)),
+            bonus_cap_cents=card.get("bonus_cap_cents"),
+            fee_pct=float(card.get("fee_pct") or 0.0),
+            fee_cents=int(card.get("fee_cents") or 0),
+            min_charge_cents=int(card.get("min_charge_cents") or 0),
+        )
+
+    @property
+    def binary(self) -> bool:
+        return self.fee_cents > 0 or self.min_charge_cents > 0
+
+    def rate(self, category: str) -> float:
+        if category in self.rates:
+            return float(self.rates[category])
+        return get_reward_rate(self.name, category)
+
+    def tiers(self, category: str, limit: int, cap: Optional[int]) -> List[Tuple[str, float, int]]:
+        """(tier, reward %, capacity) in the order spend earns them."""
+        rate = self.rate(category)
+        if cap is None:
+            return [("bonus", rate, limit)]
+        if rate <= self.base_rate_pct:
+            return [("base", self.base_rate_pct, limit)]
+        bonus = min(max(cap, 0), limit)
+        return [("bonus", rate, bonus), ("base", self.base_rate_pct, limit - bonus)]
+
+
+def parse_cards(cards: List[dict], default_limit: int) -> List[CardTerms]:
+    return [CardTerms.from_dict(c, default_limit) for c in cards]
+
+
+# ── Single transaction ─────────────────────────────────────────────────────
+def _fill(total: int, terms: List[CardTerms], tiers: List[list], used: Tuple[int, ...], binary: set):
+    """Exact allocation for a fixed set of used binary cards. Returns (allocated, net value, alloc)."""
+    alloc: Dict[Tuple[int, int], int] = {}
+    remaining = total
+    free_cap: Dict[Tuple[int, int], int] = {}
+    for j, card_tiers in enumerate(tiers):
+        if j in binary and j not in used:
+            continue
+        for k, (_, _, cap) in enumerate(card_tiers):
+            free_cap[(j, k)] = cap
+
+    # Minimum charges come out of each card's best tiers first
+    for j in used:
+        need = terms[j].min_charge_cents
+        if need > remaining or need > sum(c for (_, _, c) in tiers[j]):
+            return None
+        for k in range(len(tiers[j])):
+            take = min(need, free_cap[(j, k)])
+            if take:
+                alloc[(j, k)] = take
+                free_cap[(j, k)] -= take
+                need -= take
+                remaining -= take
+
+    arcs = sorted(free_cap, key=lambda jk: -(tiers[jk[0]][jk[1]][1] - terms[jk[0]].fee_pct))
+    for jk in arcs:
+        if remaining <= 0:
+            break
+        take = min(remaining, free_cap[jk])
+        if take > 0:
+            alloc[jk] = alloc.get(jk, 0) + take
+            remaining -= take
+
+    value = 0.0
+    charged = set()
+    for (j, k), amt in alloc.items():
+        value += amt * (tiers[j][k][1] - terms[j].fee_pct) / 100.0
+        charged.add(j)
+    value -= sum(terms[j].fee_cents for j in charged)
+    return total - remaining, value, alloc
+
+
+def _best_allocation(total: int, terms: List[CardTerms], category: str, state: Optional[dict] = None):
+    tiers = []
+    for j, t in enumerate(terms):
+        limit = state["limit"][j] if state else t.limit_cents
+        cap = state["cap"][j] if state else t.bonus_cap_cents
+        tiers.append(t.tiers(category, limit, cap))
+    binary_idx = [j for j, t in enumerate(terms) if t.binary]
+    binary = set(binary_idx)
+
+    def score(res):
+        return (res[0], res[1]) if res else (-1, 0.0)
+
+    best = _fill(total, terms, tiers, (), binary)
+    if len(binary_idx) <= EXACT_BINARY_CARDS:
+        for r in range(1, len(binary_idx) + 1):
+            for used in combinations(binary_idx, r):
+                res = _fill(total, terms, tiers, used, binary)
+                if score(res) > score(best):
+                    best = res
+    else:
+        # Local search: toggle one binary card at a time while it helps
+        used: set = set()
+        improved = True
+        while improved:
+            improved = False
+            for j in binary_idx:
+                cand = tuple(sorted(used ^ {j}))
+                res = _fill(total, terms, tiers, cand, binary)
+                if score(res) > score(best) + (0, _EPS):
+                    best, used, improved = res, set(cand), True
+    return tiers, best
+
+
+def _card_splits(terms: List[CardTerms], per_card: Dict[int, List[Tuple[int, float]]]) -> List[dict]:
+    """per_card: card index -> [(cents, reward %)] pieces charged to it."""
+    splits = []
+    for j, parts in per_card.items():
+        card = terms[j]
+        amount = sum(a for a, _ in parts)
+        if amount <= 0:
+            continue
+        reward = sum(int(a * r / 100) for a, r in parts)
+        # Nominal tier rate (spend-weighted across tiers); cents are rounded down per piece
+        rate = sum(a * r for a, r in parts) / amount
+        fee = int(round(amount * card.fee_pct / 100)) + card.fee_cents
+        splits.append({
+            "card": card.name,
+            "amount_cents": amount,
+            "reward_rate_pct": round(rate, 4),
+            "reward_cents": reward,
+            "fee_cents": fee,
+            "net_reward_cents": reward - fee,
+        })
+    splits.sort(key=lambda s: (-s["net_reward_cents"], -s["amount_cents"]))
+    return splits
+
+
+def _splits(terms: List[CardTerms], tiers: List[list], alloc: Dict[Tuple[int, int], int]) -> List[dict]:
+    per_card: Dict[int, List[Tuple[int, float]]] = {}
+    for (j, k), amt in alloc.items():
+        per_card.setdefault(j, []).append((amt, tiers[j][k][1]))
+    return _card_splits(terms, per_card)
+
+
+def optimize_split(total_cents: int, cards: List[dict], merchant: str = "general") -> dict:
+    """Best split of one payment. Same result keys as ai_optimize_split plus fees."""
+    if not cards:
+        return {"error": "No cards provided"}
+    category = detect_category(merchant)
+    terms = parse_cards(cards, total_cents)
+    tiers, (allocated, _, alloc) = _best_allocation(total_cents, terms, category)
+    splits = _splits(terms, tiers, alloc)
+    return _summary(splits, total_cents - allocated, category, merchant)
+
+
+def _summary(splits: List[dict], unallocated: int, category: str, merchant: str) -> dict:
+    total_reward = sum(s["reward_cents"] for s in splits)
+    total_fee = sum(s["fee_cents"] for s in splits)
+    best = splits[0] if splits else None
+    recommendation = (
+        f"Put ${best['amount_cents']/100:.2f} on {best['card']} "
+        f"({best['reward_rate_pct']}% back = ${best['reward_cents']/100:.2f}) "
+        f"for maximum {category} rewards."
+        if best else "No recommendation available."
+    )
+    return {
+        "splits": splits,
+        "total_reward_cents": total_reward,
+        "total_fee_cents": total_fee,
+        "net_reward_cents": total_reward - total_fee,
+        "unallocated_cents": unallocated,
+        "category": category,
+        "merchant": merchant,
+        "recommendation": recommendation,
+    }
+
+
+# ── Min-cost max-flow (successive shortest paths, Bellman-Ford) ────────────
+class _FlowGraph:
+    def __init__(self, n: int):
+        self.n = n
+        self.adj: List[List[int]] = [[] for _ in range(n)]
+        self.to: List[int] = []
+        self.cap: List[int] = []
+        self.cost: List[float] = []
+
+    def add(self, u: int, v: int, cap: int, cost: float) -> int:
+        self.adj[u].append(len(self.to)); self.to.append(v); self.cap.append(cap); self.cost.append(cost)
+        self.adj[v].append(len(self.to)); self.to.append(u); self.cap.append(0); self.cost.append(-cost)
+        return len(self.to) - 2
+
+    def flow(self, edge: int) -> int:
+        return self.cap[edge ^ 1]
+
+    def run(self, s: int, t: int) -> None:
+        while True:
+            dist = [float("inf")] * self.n
+            prev = [-1] * self.n
+            dist[s] = 0.0
+            for _ in range(self.n - 1):
+                changed = False
+                for u in range(self.n):
+                    if dist[u] == float("inf"):
+                        continue
+                    for e in self.adj[u]:
+                        if self.cap[e] > 0 and dist[u] + self.cost[e] < dist[self.to[e]] - _EPS:
+                            dist[self.to[e]] = dist[u] + self.cost[e]
+                            prev[self.to[e]] = e
+                            changed = True
+                if not changed:
+                    break
+            if prev[t] == -1:
+                return
+            push, v = None, t
+            while v != s:
+                e = prev[v]
+                push = self.cap[e] if push is None else min(push, self.cap[e])
+                v = self.to[e ^ 1]
+            v = t
+            while v != s:
+                e = prev[v]
+                self.cap[e] -= push
+                self.cap[e ^ 1] += push
+                v = self.to[e ^ 1]
+
+
+# ── Batch over shared card state ───────────────────────────────────────────
+def _initial_state(terms: List[CardTerms]) -> dict:
+    return {
+        "limit": [t.limit_cents for t in terms],
+        "cap": [t.bonus_cap_cents for t in terms],
+    }
+
+
+def _consume(state: dict, terms: List[CardTerms], tiers: List[list], alloc: Dict[Tuple[int, int], int]) -> None:
+    for (j, k), amt in alloc.items():
+        state["limit"][j] -= amt
+        if tiers[j][k][0] == "bonus" and state["cap"][j] is not None:
+            state["cap"][j] -= amt
+
+
+def _batch_flow(items: List[Tuple[int, str]], terms: List[CardTerms], state: dict):
+    """
+    Global allocation for cards without per-charge fees or minimums.
+    Graph: source -> category -> [bonus node ->] card -> sink, where the card
+    arc carries the remaining limit and the bonus arc the remaining bonus cap.
+    Returns category -> [(card index, tier, reward %, cents)], best first.
+    """
+    categories = sorted({c for _, c in items})
+    demand = {c: 0 for c in categories}
+    for amount, c in items:
+        demand[c] += amount
+
+    g = _FlowGraph(2 + len(categories) + 2 * len(terms))
+    src, sink = 0, 1
+    cat_node = {c: 2 + i for i, c in enumerate(categories)}
+    card_node = [2 + len(categories) + 2 * j for j in range(len(terms))]
+    for c in categories:
+        g.add(src, cat_node[c], demand[c], 0.0)
+
+    edges = []  # (category, card index, tier, reward %, edge id)
+    for j, t in enumerate(terms):
+        limit, cap = state["limit"][j], state["cap"][j]
+        g.add(card_node[j], sink, max(limit, 0), 0.0)
+        if cap is not None:
+            g.add(card_node[j] + 1, card_node[j], min(max(cap, 0), max(limit, 0)), 0.0)
+        for c in categories:
+            rate = t.rate(c)
+            if cap is None:
+                edges.append((c, j, "bonus", rate, g.add(cat_node[c], card_node[j], demand[c], t.fee_pct - rate)))
+                continue
+            if rate > t.base_rate_pct:
+                edges.append((c, j, "bonus", rate, g.add(cat_node[c], card_node[j] + 1, demand[c], t.fee_pct - rate)))
+            base = t.base_rate_pct
+            edges.append((c, j, "base", base, g.add(cat_node[c], card_node[j], demand[c], t.fee_pct - base)))
+    g.run(src, sink)
+
+    flows: Dict[str, List[Tuple[int, str, float, int]]] = {c: [] for c in categories}
+    for c, j, tier, rate, e in edges:
+        f = g.flow(e)
+        if f:
+            flows[c].append((j, tier, rate, f))
+    for pieces in flows.values():
+        pieces.sort(key=lambda x: terms[x[0]].fee_pct - x[2])
+    return flows
+
+
+def optimize_batch(transactions: List[dict], cards: List[dict]) -> dict:
+    """
+    Allocate many payments ({"amount_cents", "merchant"}) against one shared set
+    of card limits and bonus caps. Returns per-transaction results (in input
+    order), totals and the remaining card state.
+    """
+    if not cards:
+        return {"error": "No cards provided"}
+    items = [(int(t["amount_cents"]), detect_category(t.get("merchant", "general"))) for t in transactions]
+    terms = parse_cards(cards, sum(a for a, _ in items))
+    state = _initial_state(terms)
+    results: List[Optional[dict]] = [None] * len(items)
+
+    if any(t.binary for t in terms):
+        # Per-charge fees and minimums are per-transaction decisions: solve each exactly in order
+        method = "sequential"
+        for i, (amount, category) in enumerate(items):
+            tiers, (allocated, _, alloc) = _best_allocation(amount, terms, category, state)
+            _consume(state, terms, tiers, alloc)
+            results[i] = {"splits": _splits(terms, tiers, alloc), "unallocated_cents": amount - allocated}
+    else:
+        method = "flow"
+        flows = _batch_flow(items, terms, state)
+        cursor = {c: 0 for c in flows}
+        for i, (amount, category) in enumerate(items):
+            pieces = flows[category]
+            need, per_card = amount, {}
+            while need > 0 and cursor[category] < len(pieces):
+                j, tier, rate, f = pieces[cursor[category]]
+                take = min(need, f)
+                per_card.setdefault(j, []).append((take, rate))
+                need -= take
+                if take == f:
+                    cursor[category] += 1
+                else:
+                    pieces[cursor[category]] = (j, tier, rate, f - take)
+                state["limit"][j] -= take
+                if tier == "bonus" and state["cap"][j] is not None:
+                    state["cap"][j] -= take
+            results[i] = {"splits": _card_splits(terms, per_card), "unallocated_cents": need}
+
+    total_reward = sum(s["reward_cents"] for r in results for s in r["splits"])
+    total_fee = sum(s["fee_cents"] for r in results for s in r["splits"])
+    return {
+        "results": results,
+        "count": len(results),
+        "method": method,
+        "total_reward_cents": total_reward,
+        "total_fee_cents": total_fee,
+        "net_reward_cents": total_reward - total_fee,
+        "unallocated_cents": sum(r["unallocated_cents"] for r in results),
+        "remaining": _remaining(terms, state),
+    }
+
+
+def _remaining(terms: List[CardTerms], state: dict) -> Dict[str, dict]:
+    """Remaining limit / bonus cap by card name; cards sharing a name are summed."""
+    out: Dict[str, dict] = {}
+    for j, t in enumerate(terms):
+        limit, cap = state["limit"][j], state["cap"][j]
+        if t.name not in out:
+            out[t.name] = {"limit_cents": limit, "bonus_cap_cents": cap}
+            continue
+        prev = out[t.name]
+        prev["limit_cents"] += limit
+        if cap is not None:
+            prev["bonus_cap_cents"] = cap + (prev["bonus_cap_cents"] or 0)
+    return out
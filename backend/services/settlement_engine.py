@@ -0,0 +1,125 @@
+"""
+Array-backed settlement engine.
+
+Same contract as settlement_service.calculate_balances (integer cents in,
+integer cents out, same rounding and remainder rules, same ValueErrors), but:
+- users are interned to integer ids once
+- every split type is turned into flat (user_id, cents) arrays and applied
+  with NumPy scatter-adds instead of per-person dict updates
+- sorted member lists are computed once per distinct member set
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+def calculate_balances_vectorized(expenses: List[dict]) -> Dict[str, int]:
+    ids: Dict[str, int] = {}
+    intern = ids.setdefault  # intern(name, len(ids)) -> stable integer id
+
+    sorted_members: Dict[Tuple[str, ...], List[int]] = {}
+
+    payer_ids: List[int] = []
+    paid: List[int] = []
+
+    # Equal splits: one entry per expense + flat member ids (sorted per expense)
+    eq_amounts: List[int] = []
+    eq_counts: List[int] = []
+    eq_members: List[int] = []
+
+    # Custom splits: already exact cents
+    custom_users: List[int] = []
+    custom_owed: List[int] = []
+
+    # Percentage splits: per-row pct + per-expense amount / remainder owner
+    pct_users: List[int] = []
+    pct_values: List[float] = []
+    pct_rows_per_expense: List[int] = []
+    pct_amounts: List[int] = []
+    pct_first_user: List[int] = []
+
+    for e in expenses:
+        payer = e["payer"]
+        amount = int(e["amount_cents"])
+        split_type = e.get("split_type", "equal")
+        members = e.get("members") or []
+        splits = e.get("splits") or []
+
+        payer_ids.append(intern(payer, len(ids)))
+        paid.append(amount)
+
+        if split_type == "equal":
+            if not members:
+                raise ValueError("Equal split requires 'members'")
+            key = tuple(members)
+            member_ids = sorted_members.get(key)
+            if member_ids is None:
+                member_ids = sorted_members[key] = [intern(m, len(ids)) for m in sorted(members)]
+            eq_amounts.append(amount)
+            eq_counts.append(len(member_ids))
+            eq_members.extend(member_ids)
+
+        elif split_type == "custom":
+            if not splits:
+                raise ValueError("Custom split requires 'splits'")
+            total = 0
+            for s in splits:
+                raw = s.get("amount_cents")
+                owe = int(raw) if raw is not None else 0
+                total += owe
+                custom_users.append(intern(s["user"], len(ids)))
+                custom_owed.append(owe)
+            if total != amount:
+                raise ValueError(
+                    f"Custom splits must sum to amount_cents. Got {total}, expected {amount}"
+                )
+
+        elif split_type == "percentage":
+            if not splits:
+                raise ValueError("Percentage split requires 'splits'")
+            for s in splits:
+                pct_users.append(intern(s["user"], len(ids)))
+                pct_values.append(float(s.get("percentage") or 0))
+            pct_rows_per_expense.append(len(splits))
+            pct_amounts.append(amount)
+            pct_first_user.append(ids[splits[0]["user"]])
+
+        else:
+            raise ValueError("Invalid split_type (use: equal, custom, percentage)")
+
+        if split_type != "equal":
+            # Members not covered by the split still get a (zero) balance
+            for m in members:
+                intern(m, len(ids))
+
+    balances = np.zeros(len(ids), dtype=np.int64)
+    np.add.at(balances, np.asarray(payer_ids, dtype=np.intp), np.asarray(paid, dtype=np.int64))
+
+    if eq_amounts:
+        amounts = np.asarray(eq_amounts, dtype=np.int64)
+        counts = np.asarray(eq_counts, dtype=np.int64)
+        share = np.repeat(amounts // counts, counts)
+        remainder = np.repeat(amounts % counts, counts)
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        position = np.arange(counts.sum(), dtype=np.int64) - starts
+        owe = share + (position < remainder)
+        np.subtract.at(balances, np.asarray(eq_members, dtype=np.intp), owe)
+
+    if custom_owed:
+        np.subtract.at(
+            balances, np.asarray(custom_users, dtype=np.intp), np.asarray(custom_owed, dtype=np.int64)
+        )
+
+    if pct_amounts:
+        rows = np.asarray(pct_rows_per_expense, dtype=np.int64)
+        amounts = np.asarray(pct_amounts, dtype=np.int64)
+        row_amounts = np.repeat(amounts, rows).astype(np.float64)
+        # Same float ops as int(amount * (pct / 100.0)): truncate toward zero
+        owe = np.trunc(row_amounts * (np.asarray(pct_values, dtype=np.float64) / 100.0)).astype(np.int64)
+        np.subtract.at(balances, np.asarray(pct_users, dtype=np.intp), owe)
+
+        allocated = np.zeros(len(pct_amounts), dtype=np.int64)
+        np.add.at(allocated, np.repeat(np.arange(len(pct_amounts)), rows), owe)
+        np.subtract.at(balances, np.asarray(pct_first_user, dtype=np.intp), amounts - allocated)
+
+    return dict(zip(ids, balances.tolist()))
@@ -0,0 +1,189 @@
+"""
+Minimum-transfer settlement solver.
+
+minimize_transactions (settlement_service) matches the largest debtor with the
+largest creditor, which is fast but not optimal: a group of n people with
+non-zero balances always needs n - k transfers, where k is the number of
+disjoint zero-sum subgroups the balances can be partitioned into. Greedy
+usually finds k = 1.
+
+This module maximises k instead:
+- exact opposites (+x / -x) are always paired first (never hurts optimality)
+- small residuals (<= EXACT_MAX_MEMBERS) are solved exactly with a bitmask DP
+- large residuals get a hashing heuristic that peels off zero-sum triples
+Every phase checks a time budget; whatever is left when it expires is settled
+with the greedy matcher, and the final plan is never longer than greedy's.
+"""
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.settlement_service import minimize_transactions
+
+EXACT_MAX_MEMBERS = 20
+DEFAULT_TIME_BUDGET_MS = 250.0
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class _Deadline:
+    def __init__(self, budget_ms: Optional[float]):
+        self.at = None if budget_ms is None else time.perf_counter() + budget_ms / 1000.0
+        self.expired = False
+
+    def check(self):
+        if self.at is not None and time.perf_counter() > self.at:
+            self.expired = True
+            raise _BudgetExceeded()
+
+
+# ── Phase 1: exact opposites ───────────────────────────────────────────────
+def _pair_opposites(people: List[Tuple[str, int]]) -> Tuple[List[List[int]], List[int]]:
+    """Pair every +x with a -x. Returns (groups, leftover indices)."""
+    waiting: Dict[int, List[int]] = defaultdict(list)
+    groups: List[List[int]] = []
+    for idx, (_, bal) in enumerate(people):
+        match = waiting.get(-bal)
+        if match:
+            groups.append([match.pop(), idx])
+        else:
+            waiting[bal].append(idx)
+    leftover = sorted(i for idxs in waiting.values() for i in idxs)
+    return groups, leftover
+
+
+# ── Phase 2a: exact bitmask DP ─────────────────────────────────────────────
+def _exact_groups(values: List[int], deadline: _Deadline) -> List[List[int]]:
+    """
+    Partition values (summing to zero) into the maximum number of zero-sum
+    subsets. dp[mask] = max over i in mask of dp[mask ^ i] + (sum(mask) == 0),
+    evaluated one popcount layer at a time with NumPy. Returns positions.
+    """
+    n = len(values)
+    if n == 0:
+        return []
+    sums = np.zeros(1, dtype=np.int64)
+    popcount = np.zeros(1, dtype=np.int8)
+    for v in values:
+        sums = np.concatenate([sums, sums + v])
+        popcount = np.concatenate([popcount, popcount + 1])
+    zero = (sums == 0).astype(np.int8)
+    zero[0] = 0
+
+    order = np.argsort(popcount, kind="stable")
+    bounds = np.searchsorted(popcount[order], np.arange(n + 2))
+    dp = np.zeros(1 << n, dtype=np.int8)
+    for layer in range(1, n + 1):
+        deadline.check()
+        masks = order[bounds[layer]:bounds[layer + 1]]
+        best = np.zeros(len(masks), dtype=np.int8)
+        for i in range(n):
+            bit = 1 << i
+            has = (masks & bit) != 0
+            best[has] = np.maximum(best[has], dp[masks[has] ^ bit])
+        dp[masks] = best + zero[masks]
+
+    # Walk back down the chain of prefixes; each zero-sum prefix closes a group
+    groups: List[List[int]] = []
+    mask = top = (1 << n) - 1
+    while mask:
+        target = dp[mask] - zero[mask]
+        for i in range(n):
+            bit = 1 << i
+            if mask & bit and dp[mask ^ bit] == target:
+                mask ^= bit
+                break
+        if mask and zero[mask]:
+            groups.append(top ^ mask)
+            top = mask
+    groups.append(top)
+    return [[i for i in range(n) if g >> i & 1] for g in groups]
+
+
+# ── Phase 2b: heuristic for large groups ───────────────────────────────────
+def _peel_triples(people: List[Tuple[str, int]], idxs: List[int], deadline: _Deadline) -> Tuple[List[List[int]], List[int]]:
+    """Peel off zero-sum triples (two on one side, one on the other) by hashing distinct amounts."""
+    buckets: Dict[int, List[int]] = defaultdict(list)
+    for i in idxs:
+        buckets[people[i][1]].append(i)
+    groups: List[List[int]] = []
+    try:
+        for sign in (1, -1):
+            side = sorted(v for v in buckets if v * sign > 0)
+            for a_pos, a in enumerate(side):
+                deadline.check()
+                for b in side[a_pos:]:
+                    while buckets[a] and buckets[b] and buckets.get(-(a + b)):
+                        if a == b and len(buckets[a]) < 2:
+                            break
+                        groups.append([buckets[a].pop(), buckets[b].pop(), buckets[-(a + b)].pop()])
+                    if not buckets[a]:
+                        break
+    except _BudgetExceeded:
+        pass
+    leftover = sorted(i for b in buckets.values() for i in b)
+    return groups, leftover
+
+
+# ── Settle ─────────────────────────────────────────────────────────────────
+def _settle(people: List[Tuple[str, int]], groups: List[List[int]]) -> List[dict]:
+    txs: List[dict] = []
+    for g in groups:
+        txs.extend(minimize_transactions({people[i][0]: people[i][1] for i in g}))
+    return txs
+
+
+def solve_min_transfers(
+    balances: Dict[str, int],
+    time_budget_ms: Optional[float] = DEFAULT_TIME_BUDGET_MS,
+    exact_max_members: int = EXACT_MAX_MEMBERS,
+) -> dict:
+    """
+    Returns {"transactions", "solver", "timed_out", "elapsed_ms"} where solver is
+    "exact", "heuristic" or "greedy" (greedy's plan was shorter than ours).
+    time_budget_ms=None disables the budget.
+    """
+    t0 = time.perf_counter()
+    deadline = _Deadline(time_budget_ms)
+    people = [(name, int(bal)) for name, bal in balances.items() if bal]
+    if sum(b for _, b in people) != 0:
+        raise ValueError("Balances must sum to zero")
+
+    groups, rest = _pair_opposites(people)
+    solver = "exact"
+    if len(rest) > exact_max_members:
+        solver = "heuristic"
+        triples, rest = _peel_triples(people, rest, deadline)
+        groups.extend(triples)
+    if rest:
+        residual = [rest]
+        if len(rest) <= exact_max_members:
+            try:
+                parts = _exact_groups([people[i][1] for i in rest], deadline)
+                residual = [[rest[p] for p in part] for part in parts]
+            except _BudgetExceeded:
+                pass
+        groups.extend(residual)
+
+    txs = _settle(people, groups)
+    greedy = minimize_transactions(balances)
+    if len(greedy) < len(txs):
+        txs, solver = greedy, "greedy"
+    return {
+        "transactions": txs,
+        "solver": solver,
+        "timed_out": deadline.expired,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 3),
+    }
+
+
+def optimize_transactions(
+    balances: Dict[str, int],
+    time_budget_ms: Optional[float] = DEFAULT_TIME_BUDGET_MS,
+) -> List[dict]:
+    """Drop-in replacement for minimize_transactions with fewer transfers."""
+    return solve_min_transfers(balances, time_budget_ms)["transactions"]
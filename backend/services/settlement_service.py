@@ -1,4 +1,8 @@
-from typing import Dict, List, Optional
+import heapq
+from typing import Dict, Iterator, List, Optional
+
+from .keyword_matcher import KeywordMatcher
+from .merchant_cache import MerchantCategoryCache
 
 # ── AI: Card reward rules by merchant category ─────────────────────────────
 CATEGORY_REWARDS = {
@@ -32,17 +36,25 @@ CATEGORY_REWARDS = {
 }
 
 # ── AI: Detect merchant category from name ─────────────────────────────────
+# Checked in this order; the first category with a keyword in the name wins
+CATEGORY_KEYWORDS = [
+    ("dining", ["doordash", "ubereats", "grubhub", "restaurant", "food", "pizza", "cafe"]),
+    ("groceries", ["whole foods", "walmart", "kroger", "grocery", "trader joe"]),
+    ("travel", ["united", "delta", "airbnb", "hotel", "flight", "uber", "lyft"]),
+    ("shopping", ["amazon", "target", "bestbuy", "ebay", "shop"]),
+]
+_category_matcher = KeywordMatcher.from_groups(CATEGORY_KEYWORDS, default="general")
+category_cache = MerchantCategoryCache(max_size=10000)
+
+
 def detect_category(merchant: str) -> str:
-    merchant = merchant.lower()
-    if any(x in merchant for x in ["doordash", "ubereats", "grubhub", "restaurant", "food", "pizza", "cafe"]):
-        return "dining"
-    if any(x in merchant for x in ["whole foods", "walmart", "kroger", "grocery", "trader joe"]):
-        return "groceries"
-    if any(x in merchant for x in ["united", "delta", "airbnb", "hotel", "flight", "uber", "lyft"]):
-        return "travel"
-    if any(x in merchant for x in ["amazon", "target", "bestbuy", "ebay", "shop"]):
-        return "shopping"
-    return "general"
+    return category_cache.lookup(merchant, _category_matcher.match)
+
+
+def detect_categories(merchants: List[str]) -> List[str]:
+    """detect_category over a batch of merchant names."""
+    return [category_cache.lookup(m, _category_matcher.match) for m in merchants]
+
 
 # ── AI: Score a card for a given category ──────────────────────────────────
 def get_reward_rate(card_name: str, category: str) -> float:
@@ -58,78 +70,39 @@ def ai_optimize_split(
 ) -> dict:
     """
     AI optimizer: finds the best way to split a payment across cards
-    to maximize total cashback rewards.
+    to maximize total cashback rewards net of fees.
 
     Args:
         total_cents: total amount in cents
-        cards: list of {"name": str, "limit_cents": int}
+        cards: list of {"name": str, "limit_cents": int} plus optional
+               "rewards", "bonus_cap_cents", "base_rate_pct", "fee_pct",
+               "fee_cents", "min_charge_cents" (see reward_optimizer.CardTerms)
         merchant: merchant name for category detection
 
     Returns:
         {
           "splits": [...],
           "total_reward_cents": int,
+          "total_fee_cents": int,
+          "net_reward_cents": int,
+          "unallocated_cents": int,
           "category": str,
           "recommendation": str
         }
     """
-    if not cards:
-        return {"error": "No cards provided"}
+    from .reward_optimizer import optimize_split
 
-    category = detect_category(merchant)
-
-    # Score each card by reward rate
-    scored_cards = []
-    for card in cards:
-        rate = get_reward_rate(card["name"], category)
-        scored_cards.append({
-            "name": card["name"],
-            "limit_cents": card.get("limit_cents", total_cents),
-            "rate": rate,
-        })
-
-    # Sort cards by reward rate (highest first)
-    scored_cards.sort(key=lambda x: x["rate"], reverse=True)
-
-    # Greedily allocate to highest-reward card first
-    splits = []
-    remaining = total_cents
-
-    for card in scored_cards:
-        if remaining <= 0:
-            break
-        allocate = min(remaining, card["limit_cents"])
-        if allocate > 0:
-            reward = int(allocate * card["rate"] / 100)
-            splits.append({
-                "card": card["name"],
-                "amount_cents": allocate,
-                "reward_rate_pct": card["rate"],
-                "reward_cents": reward,
-            })
-            remaining -= allocate
-
-    total_reward = sum(s["reward_cents"] for s in splits)
-
-    best = splits[0] if splits else None
-    recommendation = (
-        f"Put ${splits[0]['amount_cents']/100:.2f} on {splits[0]['card']} "
-        f"({splits[0]['reward_rate_pct']}% back = ${splits[0]['reward_cents']/100:.2f}) "
-        f"for maximum {category} rewards."
-        if best else "No recommendation available."
-    )
-
-    return {
-        "splits": splits,
-        "total_reward_cents": total_reward,
-        "category": category,
-        "merchant": merchant,
-        "recommendation": recommendation,
-    }
+    return optimize_split(total_cents, cards, merchant)
 
 # ── AI: Compare naive equal split vs AI split rewards ──────────────────────
-def compare_splits(total_cents: int, cards: List[dict], merchant: str = "general") -> dict:
-    """Shows how much more reward AI split gives vs equal split."""
+def compare_splits(
+    total_cents: int,
+    cards: List[dict],
+    merchant: str = "general",
+    ai_result: Optional[dict] = None,
+) -> dict:
+    """Shows how much more reward AI split gives vs equal split.
+    Pass the ai_optimize_split result you already have to avoid solving twice."""
     n = len(cards)
     if n == 0:
         return {}
@@ -141,7 +114,8 @@ def compare_splits(total_cents: int, cards: List[dict], merchant: str = "general
         for c in cards
     )
 
-    ai_result = ai_optimize_split(total_cents, cards, merchant)
+    if ai_result is None:
+        ai_result = ai_optimize_split(total_cents, cards, merchant)
     ai_reward = ai_result.get("total_reward_cents", 0)
     gain = ai_reward - equal_reward
 
@@ -246,4 +220,37 @@ def minimize_transactions(balances: Dict[str, int]) -> List[dict]:
         if c_amt == 0:
             j += 1
 
-    return txs
\ No newline at end of file
+    return txs
+
+
+# ── Streaming: heap-backed minimize_transactions ───────────────────────────
+def iter_transactions(balances: Dict[str, int]) -> Iterator[dict]:
+    """
+    Lazily yields the same transfers, in the same order, as
+    minimize_transactions. Debtors and creditors are heapified in O(n) instead
+    of sorted, popped only when the previous one is settled, and no transfer
+    list is built, so very large balance maps can be streamed.
+    """
+    # (-amount, insertion index) reproduces the stable descending sort
+    debtors = [(bal, i, name) for i, (name, bal) in enumerate(balances.items()) if bal < 0]
+    creditors = [(-bal, i, name) for i, (name, bal) in enumerate(balances.items()) if bal > 0]
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+
+    d_name = c_name = None
+    d_amt = c_amt = 0
+    while True:
+        if d_amt == 0:
+            if not debtors:
+                return
+            neg, _, d_name = heapq.heappop(debtors)
+            d_amt = -neg
+        if c_amt == 0:
+            if not creditors:
+                return
+            neg, _, c_name = heapq.heappop(creditors)
+            c_amt = -neg
+        pay = min(d_amt, c_amt)
+        yield {"from": d_name, "to": c_name, "amount_cents": pay}
+        d_amt -= pay
+        c_amt -= pay
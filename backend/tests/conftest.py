@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+# Backend modules import each other as top-level packages (models, services, ...)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy import create_engine
+
+    from models import Base
+
+    # A file database: job workers open their own connections, and the streaming
+    # pipeline's writer thread uses a session created on the test thread
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def session_factory(engine):
+    from sqlalchemy.orm import sessionmaker
+
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture()
+def db(session_factory):
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
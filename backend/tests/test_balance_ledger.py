@@ -0,0 +1,130 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from services import balance_ledger
+from services.settlement_service import calculate_balances
+
+
+def expense(payer, cents, members):
+    return {"payer": payer, "amount_cents": cents, "members": members, "split_type": "equal"}
+
+
+def test_incremental_balances_match_full_recompute(db):
+    history = [
+        expense("Alice", 12000, ["Alice", "Bob", "Charlie"]),
+        expense("Bob", 6000, ["Alice", "Bob", "Charlie"]),
+        expense("Charlie", 1000, ["Alice", "Bob", "Charlie"]),
+    ]
+    for e in history:
+        balance_ledger.add_expense(db, "g1", e)
+
+    assert balance_ledger.get_balances(db, "g1") == dict(sorted(calculate_balances(history).items()))
+    assert balance_ledger.verify(db, "g1")["ok"]
+    assert balance_ledger.get_balances(db, "other") == {}
+
+
+def test_payment_and_delete_reverse_cleanly(db):
+    first = balance_ledger.add_expense(db, "g1", expense("Alice", 10000, ["Alice", "Bob"]))
+    pay = balance_ledger.add_payment(db, "g1", "Bob", "Alice", 5000)
+    assert balance_ledger.get_balances(db, "g1") == {"Alice": 0, "Bob": 0}
+
+    assert balance_ledger.delete_entry(db, "g1", pay.id)
+    assert balance_ledger.get_balances(db, "g1") == {"Alice": 5000, "Bob": -5000}
+
+    assert balance_ledger.delete_entry(db, "g1", first.id)
+    assert balance_ledger.get_balances(db, "g1") == {"Alice": 0, "Bob": 0}
+    assert not balance_ledger.delete_entry(db, "g1", first.id)
+    assert balance_ledger.verify(db, "g1")["ok"]
+
+
+def test_invalid_entries_are_not_written(db):
+    with pytest.raises(ValueError):
+        balance_ledger.add_expense(db, "g1", expense("Alice", 100, []))
+    with pytest.raises(ValueError):
+        balance_ledger.add_payment(db, "g1", "Bob", "Bob", 100)
+    assert balance_ledger.get_balances(db, "g1") == {}
+    assert balance_ledger.all_group_ids(db) == []
+
+
+def test_verify_detects_and_repairs_drift(db):
+    from models.group_ledger import GroupBalance
+
+    balance_ledger.add_expense(db, "g1", expense("Alice", 10000, ["Alice", "Bob"]))
+    db.query(GroupBalance).filter(GroupBalance.user == "Bob").update({GroupBalance.balance_cents: -1})
+    db.commit()
+
+    result = balance_ledger.verify(db, "g1")
+    assert not result["ok"]
+    assert result["diffs"] == [{"user": "Bob", "stored_cents": -1, "expected_cents": -5000}]
+
+    assert balance_ledger.verify(db, "g1", repair=True)["repaired"]
+    assert balance_ledger.verify(db, "g1")["ok"]
+
+
+def test_first_write_survives_a_concurrent_insert(db, monkeypatch):
+    from sqlalchemy import insert
+
+    real_increment = balance_ledger._increment
+    raced = []
+
+    def increment(session, group_id, user, amount):
+        # Another writer creates Bob's row between our update and insert
+        # (SQLite serialises writers, so it goes through our connection)
+        if user == "Bob" and not raced:
+            raced.append(user)
+            session.execute(insert(balance_ledger.GroupBalance).values(group_id=group_id, user=user, balance_cents=-700))
+            return 0
+        return real_increment(session, group_id, user, amount)
+
+    monkeypatch.setattr(balance_ledger, "_increment", increment)
+    balance_ledger.add_expense(db, "g1", expense("Alice", 1000, ["Alice", "Bob"]))
+
+    assert raced == ["Bob"]
+    assert balance_ledger.get_balances(db, "g1") == {"Alice": 500, "Bob": -1200}
+
+
+def test_group_routes_require_a_member(session_factory, db):
+    pytest.importorskip("fastapi")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from db import get_db
+    from models.group import Group, GroupMember
+    from models.user import User
+    from routes import settlements
+    from routes.auth import get_current_user
+
+    alice = User(id="u-alice", name="Alice", email="alice@example.com", password_hash="x")
+    mallory = User(id="u-mallory", name="Mallory", email="mallory@example.com", password_hash="x")
+    db.add_all([alice, mallory, Group(id="g1", name="Trip"), GroupMember(group_id="g1", user_id="u-alice")])
+    db.commit()
+
+    def session():
+        s = session_factory()
+        try:
+            yield s
+        finally:
+            s.close()
+
+    app = FastAPI()
+    app.include_router(settlements.router)
+    app.dependency_overrides[get_db] = session
+    client = TestClient(app)
+    body = {"payer": "Alice", "amount": 10, "members": ["Alice", "Bob"]}
+
+    assert client.post("/api/settlements/groups/g1/expenses", json=body).status_code == 401
+
+    app.dependency_overrides[get_current_user] = lambda: mallory
+    assert client.post("/api/settlements/groups/g1/expenses", json=body).status_code == 403
+    assert client.post("/api/settlements/groups/g1/verify?repair=true").status_code == 403
+    assert client.delete("/api/settlements/groups/g1/entries/x").status_code == 403
+    assert client.post("/api/settlements/groups/nope/payments",
+                       json={"from_user": "Bob", "to_user": "Alice", "amount": 5}).status_code == 404
+    assert balance_ledger.get_balances(db, "g1") == {}
+
+    app.dependency_overrides[get_current_user] = lambda: alice
+    added = client.post("/api/settlements/groups/g1/expenses", json=body)
+    assert added.status_code == 200
+    assert added.json()["balances_cents"] == {"Alice": 500, "Bob": -500}
+    assert client.get("/api/settlements/groups/g1").json()["balances_cents"] == {"Alice": 500, "Bob": -500}
@@ -0,0 +1,230 @@
+import sys
+
+import numpy as np
+import pytest
+
+from services.model_provider import ML_MODELS_PATH
+
+if ML_MODELS_PATH not in sys.path:
+    sys.path.append(ML_MODELS_PATH)
+
+from card_recommender import (
+    LINEAR_LAYERS,
+    MASKED_LINEAR_LAYERS,
+    WALLET_FEATURES,
+    CardRecommender,
+    NumpyCardRecommenderNet,
+    NumpyMaskedCardRecommenderNet,
+    rule_allocation,
+    synthetic_wallets,
+    wallet_arrays,
+    wallet_features,
+)
+
+
+def random_weights(seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    shapes = [(64, 9), (32, 64), (3, 32)]
+    weights = {}
+    for name, (out_dim, in_dim) in zip(LINEAR_LAYERS, shapes):
+        weights[f"{name}.weight"] = rng.normal(0, 1 / np.sqrt(in_dim), (out_dim, in_dim)).astype(np.float32)
+        weights[f"{name}.bias"] = rng.normal(0, 0.1, out_dim).astype(np.float32)
+    return weights
+
+
+def feature_rows(n: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    limits = rng.uniform(500, 2000, (n, 3))
+    balances = rng.uniform(0, 0.7, (n, 3)) * limits
+    X = np.column_stack([
+        rng.uniform(10, 500, n),
+        limits[:, 0], balances[:, 0], np.full(n, 0.01),
+        limits[:, 1], balances[:, 1], np.full(n, 0.02),
+        limits[:, 2], balances[:, 2],
+    ])
+    return X.astype(np.float32)
+
+
+def test_numpy_net_matches_reference_forward_pass():
+    weights = random_weights()
+    X = feature_rows(256)
+    out = NumpyCardRecommenderNet(weights)(X)
+
+    h = X.astype(np.float64)
+    for i, name in enumerate(LINEAR_LAYERS):
+        h = h @ weights[f"{name}.weight"].T.astype(np.float64) + weights[f"{name}.bias"]
+        if i < len(LINEAR_LAYERS) - 1:
+            h = np.maximum(h, 0)
+    expected = np.exp(h - h.max(axis=1, keepdims=True))
+    expected /= expected.sum(axis=1, keepdims=True)
+
+    assert out.shape == (256, 3)
+    np.testing.assert_allclose(out, expected, atol=1e-12)
+    np.testing.assert_allclose(out.sum(axis=1), 1.0)
+
+
+def test_recommender_serves_from_npz_export(tmp_path):
+    path = tmp_path / "card_recommender.npz"
+    np.savez(path, **random_weights())
+    rec = CardRecommender(backend="numpy", npz_path=path, arch="fixed")
+    assert rec.model is None
+
+    cards = [
+        {"id": 1, "name": "Chase", "limit": 2000, "balance": 500, "rewards_rate": 0.02},
+        {"id": 2, "name": "AmEx", "limit": 1500, "balance": 200, "rewards_rate": 0.03},
+    ]
+    single = rec.recommend(50.0, cards, merchant="DoorDash")
+    batch = rec.recommend_batch([{"transaction_amount": 50.0, "merchant": "DoorDash"}] * 3, cards=cards)
+    assert batch == [single] * 3
+    assert abs(sum(a["amount"] for a in single["allocations"]) - 50.0) < 0.05
+
+    with pytest.raises(FileNotFoundError):
+        CardRecommender(backend="numpy", npz_path=tmp_path / "missing.npz", arch="fixed")
+
+
+def test_explicit_arch_and_backend_win_over_environment(tmp_path, monkeypatch):
+    path = tmp_path / "card_recommender.npz"
+    np.savez(path, **random_weights())
+    monkeypatch.setenv("CARD_RECOMMENDER_ARCH", "masked")
+    monkeypatch.setenv("CARD_RECOMMENDER_BACKEND", "torch")
+
+    rec = CardRecommender(backend="numpy", npz_path=path, arch="fixed")
+    assert (rec.arch, rec.backend) == ("fixed", "numpy")
+    assert rec.numpy_model is not None
+
+    # Without arguments the environment still decides
+    with pytest.raises(FileNotFoundError, match="Masked card recommender export not found"):
+        CardRecommender(npz_path=path, masked_npz_path=tmp_path / "missing_masked.npz")
+
+
+def test_numpy_backend_never_imports_torch(tmp_path, monkeypatch):
+    import subprocess
+
+    path = tmp_path / "card_recommender.npz"
+    np.savez(path, **random_weights())
+    code = (
+        "import sys; sys.path.append(sys.argv[1]); import card_recommender as m; "
+        "r = m.CardRecommender(backend='numpy', npz_path=sys.argv[2], arch='fixed'); "
+        "r.recommend(50.0, [{'id': 1, 'limit': 1000, 'balance': 0, 'rewards_rate': 0.02}]); "
+        "assert 'torch' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code, ML_MODELS_PATH, str(path)], check=True)
+
+    # Without torch the torch backend says why
+    monkeypatch.setitem(sys.modules, "torch", None)
+    with pytest.raises(ImportError, match="torch is required to load or train"):
+        CardRecommender(backend="torch", model_path=tmp_path / "missing.pt", arch="fixed")
+
+
+def test_export_matches_torch_forward_pass(tmp_path):
+    torch = pytest.importorskip("torch")
+    from card_recommender import CardRecommenderNet
+
+    torch.manual_seed(0)
+    model_path = tmp_path / "card_recommender.pt"
+    torch.save({"state_dict": CardRecommenderNet(9).state_dict(), "num_features": 9}, model_path)
+    rec = CardRecommender(
+        model_path=model_path, backend="torch", npz_path=tmp_path / "card_recommender.npz", arch="fixed"
+    )
+    rec.export_npz()
+
+    X = feature_rows(512)
+    net = NumpyCardRecommenderNet.load(rec.npz_path)
+    with torch.inference_mode():
+        float32 = rec.model(torch.from_numpy(X)).numpy()
+        float64 = rec.model.double()(torch.from_numpy(X).double()).numpy()
+    # Same forward pass; the float32 model only adds its own rounding noise (~1e-5
+    # on raw dollar features)
+    np.testing.assert_allclose(net(X), float64, atol=1e-12)
+    np.testing.assert_allclose(net(X), float32, atol=2e-5)
+
+
+def rule_weights() -> dict:
+    """Hand-set masked-model weights for logit = log_share + 30 * first_cover (the training rule)."""
+    f = len(WALLET_FEATURES)
+    share, first = WALLET_FEATURES.index("log_share"), WALLET_FEATURES.index("first_cover")
+    w1 = np.zeros((32, f))
+    w1[0, share], w1[1, share], w1[2, first] = 1.0, -1.0, 1.0
+    w2 = np.zeros((16, 32))
+    w2[0, 0], w2[1, 1], w2[2, 2] = 1.0, 1.0, 1.0
+    w3 = np.zeros((1, 16))
+    w3[0, :3] = [1.0, -1.0, 30.0]
+    layers = dict(zip(MASKED_LINEAR_LAYERS, [w1, w2, w3]))
+    weights = {f"{name}.weight": w for name, w in layers.items()}
+    weights.update({f"{name}.bias": np.zeros(w.shape[0]) for name, w in layers.items()})
+    return weights
+
+
+def reference_card_features(amount: float, cards: list) -> np.ndarray:
+    """One card at a time, the way a hand-written feature list would do it."""
+    available = [max(c["limit"] - c["balance"], 0.0) for c in cards]
+    total = sum(available)
+    rows, seen_cover = [], False
+    for i, (c, avail) in enumerate(zip(cards, available)):
+        covers = avail >= amount
+        rows.append([
+            np.log1p(amount), np.log1p(avail), min(avail / amount, 10.0), c["balance"] / c["limit"],
+            c["rewards_rate"] * 100, float(covers), float(covers and not seen_cover),
+            np.log((avail / total if total > 0 else 0.0) + 1e-6), i / max(len(cards) - 1, 1),
+        ])
+        seen_cover = seen_cover or covers
+    return np.array(rows)
+
+
+def random_wallet(rng, n: int) -> list:
+    return [
+        {"id": i, "name": f"card {i}", "limit": float(rng.uniform(500, 2000)),
+         "balance": float(rng.uniform(0, 1500)), "rewards_rate": float(rng.choice([0.01, 0.02, 0.03]))}
+        for i in range(n)
+    ]
+
+
+def test_wallet_features_match_per_card_reference():
+    rng = np.random.default_rng(4)
+    wallets = [random_wallet(rng, n) for n in (1, 2, 3, 7, 16)]
+    amounts = np.array([40.0, 900.0, 250.0, 120.0, 3000.0])
+    X = wallet_features(amounts, *wallet_arrays(wallets))
+    mask = wallet_arrays(wallets)[3]
+
+    for b, cards in enumerate(wallets):
+        np.testing.assert_allclose(X[b, : len(cards)], reference_card_features(amounts[b], cards), atol=1e-12)
+    assert not X[~mask].any()
+    with pytest.raises(ValueError):
+        wallet_arrays([[]])
+
+
+def test_masked_net_is_padding_invariant():
+    rng = np.random.default_rng(5)
+    weights = {f"{name}.{part}": rng.normal(0, 0.5, shape) for name, shapes in zip(
+        MASKED_LINEAR_LAYERS, [((32, 9), (32,)), ((16, 32), (16,)), ((1, 16), (1,))]
+    ) for part, shape in zip(("weight", "bias"), shapes)}
+    net = NumpyMaskedCardRecommenderNet(weights)
+
+    wallet = random_wallet(rng, 5)
+    alone = net(wallet_features(np.array([80.0]), *wallet_arrays([wallet])), wallet_arrays([wallet])[3])
+    arrays = wallet_arrays([wallet, random_wallet(rng, 16)], max_cards=20)
+    padded = net(wallet_features(np.array([80.0, 10.0]), *arrays), arrays[3])
+
+    np.testing.assert_allclose(padded[0, :5], alone[0], atol=1e-12)
+    assert not padded[0, 5:].any()
+    np.testing.assert_allclose(padded.sum(axis=1), 1.0)
+
+
+def test_masked_layout_can_express_the_training_rule(tmp_path):
+    amounts, limits, balances, rates, mask = synthetic_wallets(2000, max_cards=16, seed=6)
+    net = NumpyMaskedCardRecommenderNet(rule_weights())
+    probs = net(wallet_features(amounts, limits, balances, rates, mask), mask)
+    np.testing.assert_allclose(probs, rule_allocation(amounts, limits, balances, mask), atol=1e-4)
+
+    path = tmp_path / "card_recommender_masked.npz"
+    np.savez(path, **rule_weights())
+    rec = CardRecommender(masked_npz_path=path)
+    assert rec.arch == "masked"
+
+    wallet = [{"id": i, "name": f"card {i}", "limit": 1000, "balance": 950, "rewards_rate": 0.01} for i in range(10)]
+    result = rec.recommend(100.0, wallet)
+    # No card covers $100, so it is split evenly over all 10 (beyond the old 3-card limit)
+    assert [a["card_id"] for a in result["allocations"]] == list(range(10))
+    assert all(a["amount"] == 10.0 for a in result["allocations"])
+    wallet[7]["balance"] = 0
+    assert rec.recommend_batch([{"transaction_amount": 100.0}], cards=wallet)[0]["allocations"][0]["card_id"] == 7
@@ -0,0 +1,55 @@
+import io
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from transaction_categorizer import TransactionCategorizer
+from utils.csv_parser import BankCSVParser
+
+CHASE = (
+    "Transaction Date,Post Date,Description,Category,Type,Amount,Memo\n"
+    "01/05/2024,01/06/2024,UBER TRIP,Travel,Sale,-12.50,\n"
+    "01/07/2024,01/08/2024,PAYMENT THANK YOU,,Payment,\"1,000.00\",\n"
+    "01/09/2024,01/09/2024,BROKEN ROW,,Sale,n/a,\n"
+    "01/10/2024,01/11/2024,STARBUCKS,Food & Drink,Sale,-4.75,\n"
+)
+GENERIC = (
+    "Date,Merchant,Amount\n"
+    "2024-02-01,Whole Foods,($82.10)\n"
+    "2024-02-02,Shell,$-40\n"
+    "2024-02-03,Refund,15\n"
+)
+
+
+@pytest.mark.parametrize("content", [CHASE, GENERIC])
+def test_chunked_import_matches_row_parser(content):
+    categorizer = TransactionCategorizer()
+    expected = BankCSVParser.auto_detect_format(content)
+    suggestions = BankCSVParser.suggest_card_details(expected["transactions"])
+
+    imported = BankCSVParser.import_csv(io.BytesIO(content.encode()), categorizer, chunk_rows=2)
+
+    assert imported["card_type"] == expected["card_type"]
+    assert imported["balance"] == pytest.approx(expected["balance"])
+    assert imported["suggestions"] == suggestions
+    rows = imported["sample_transactions"]
+    assert [(t["description"], t["amount"], t["type"]) for t in rows] == [
+        (t["description"], t["amount"], t["type"]) for t in expected["transactions"]
+    ]
+    assert sum(imported["category_breakdown"].values()) == pytest.approx(sum(t["amount"] for t in expected["transactions"]))
+    assert rows[0]["date"] in ("2024-01-05", "2024-02-01")
+
+
+def test_normalize_amounts_is_columnwise_and_lenient():
+    amounts = BankCSVParser.normalize_amounts(["$1,234.50", "(12.00)", "-3", " 7 ", "abc", ""])
+
+    assert amounts[:4].tolist() == [1234.5, -12.0, -3.0, 7.0]
+    assert all(a != a for a in amounts[4:])  # NaN
+
+
+def test_import_empty_upload():
+    imported = BankCSVParser.import_csv(io.BytesIO(b""))
+
+    assert imported["transaction_count"] == 0
+    assert imported["suggestions"]["suggested_limit"] == 1000
@@ -0,0 +1,307 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("xgboost")
+
+from backend.ml.fraud_service import FraudModelXGB
+
+
+@pytest.fixture(scope="module")
+def model():
+    m = FraudModelXGB()
+    if not m.model_path.exists():
+        pytest.skip("fraud model artifact not available")
+    m.load()
+    return m
+
+
+@pytest.fixture(scope="module")
+def rows():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(64, 11)).astype(np.float32)
+    X[:, 0] = rng.uniform(1, 2000, 64)
+    X[:, 5] = rng.uniform(500, 5000, 64)
+    return X
+
+
+# -------------------------
+# Batch scoring
+# -------------------------
+
+def test_batch_matches_per_row(model, rows):
+    batch = model.predict_proba_batch(rows)
+    single = [model.predict_proba(r.tolist()) for r in rows]
+    assert batch.shape == (len(rows),)
+    assert np.allclose(batch, single, atol=1e-6)
+
+
+def test_batch_accepts_lists_and_empty(model, rows):
+    assert np.allclose(model.predict_proba_batch(rows.tolist()), model.predict_proba_batch(rows))
+    assert model.predict_proba_batch([]).shape == (0,)
+
+
+def test_batch_rejects_wrong_width(model):
+    with pytest.raises(ValueError):
+        model.predict_proba_batch([[0.0] * 10])
+
+
+def test_predict_batch_verdicts(model, rows):
+    preds = model.predict_batch(rows, threshold=0.0)
+    assert len(preds) == len(rows)
+    assert all(p.is_fraud and p.threshold == 0.0 for p in preds)
+
+
+# -------------------------
+# Micro-batcher
+# -------------------------
+
+def test_micro_batcher_matches_model_under_concurrency(model, rows):
+    from concurrent.futures import ThreadPoolExecutor
+    from backend.ml.fraud_batcher import FraudMicroBatcher
+
+    batcher = FraudMicroBatcher(model, max_batch_size=16, max_wait_ms=5)
+    batcher.start()
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            probs = list(pool.map(lambda r: batcher.predict_proba(r.tolist()), rows))
+        stats = batcher.metrics()
+    finally:
+        batcher.stop()
+
+    assert np.allclose(probs, model.predict_proba_batch(rows), atol=1e-6)
+    assert stats["rows"] == len(rows)
+    assert stats["batches"] < len(rows)
+    assert sum(stats["batch_size_histogram"].values()) == stats["batches"]
+
+
+def test_micro_batcher_falls_back_when_stopped(model, rows):
+    from backend.ml.fraud_batcher import FraudMicroBatcher
+
+    batcher = FraudMicroBatcher(model)
+    assert not batcher.running
+    assert batcher.predict_proba(rows[0].tolist()) == pytest.approx(model.predict_proba(rows[0].tolist()))
+    assert batcher.input_dim == model.input_dim
+
+
+# -------------------------
+# Compiled backend
+# -------------------------
+
+def test_compiled_backend_matches_booster(model, rows):
+    from backend.ml.fraud_compiled import CompiledTreeEnsemble
+
+    compiled = CompiledTreeEnsemble.from_json(model.model_path)
+    X = rows.copy()
+    X[::5, 3] = np.nan  # exercise default (missing-value) directions
+    expected = model.booster.inplace_predict(X)
+
+    assert np.allclose(compiled.predict_proba(X), expected, atol=1e-6)
+    for r, p in zip(X, expected):
+        assert compiled.predict_proba(r)[0] == pytest.approx(float(p), abs=1e-6)
+
+
+def test_compiled_backend_through_model(rows):
+    compiled = FraudModelXGB(backend="compiled")
+    if not compiled.model_path.exists():
+        pytest.skip("fraud model artifact not available")
+    compiled.load()
+    native = FraudModelXGB(backend="xgboost")
+    native.load()
+
+    assert compiled.compiled is not None and native.compiled is None
+    assert compiled.predict_proba(rows[0].tolist()) == pytest.approx(native.predict_proba(rows[0].tolist()), abs=1e-6)
+    assert np.allclose(compiled.predict_proba_batch(rows), native.predict_proba_batch(rows), atol=1e-6)
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        FraudModelXGB(backend="onnx")
+
+
+def test_explicit_arguments_win_over_env(monkeypatch, tmp_path):
+    from backend.ml.fraud_shadow import build_candidate
+
+    monkeypatch.setenv("FRAUD_XGB_MODEL_PATH", str(tmp_path / "env.json"))
+    monkeypatch.setenv("FRAUD_MODEL_BACKEND", "compiled")
+    explicit = FraudModelXGB(model_path=str(tmp_path / "arg.json"), backend="xgboost")
+    assert (explicit.model_path, explicit.backend) == (tmp_path / "arg.json", "xgboost")
+
+    candidate = build_candidate("xgboost", model_path=str(tmp_path / "candidate.json"))
+    assert (candidate.model_path, candidate.backend) == (tmp_path / "candidate.json", "xgboost")
+
+    # The environment is only a fallback
+    fallback = FraudModelXGB()
+    assert (fallback.model_path, fallback.backend) == (tmp_path / "env.json", "compiled")
+
+
+# -------------------------
+# Score cache
+# -------------------------
+
+def test_cache_hits_and_invalidates_on_load(rows):
+    from backend.ml.fraud_cache import FraudScoreCache
+
+    cache = FraudScoreCache(max_size=2, ttl_seconds=60)
+    m = FraudModelXGB(cache=cache)
+    if not m.model_path.exists():
+        pytest.skip("fraud model artifact not available")
+    m.load()
+
+    a, b, c = (r.tolist() for r in rows[:3])
+    first = m.predict_proba(a)
+    assert m.predict_proba(a) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    m.predict_proba(b)
+    m.predict_proba(c)  # evicts a (LRU, max_size=2)
+    assert cache.evictions == 1
+    assert cache.get(a, m.version) is None
+
+    m.load()
+    assert cache.stats()["size"] == 0
+    assert cache.invalidations == 2
+
+
+def test_cache_ttl_and_quantization():
+    from backend.ml.fraud_cache import FraudScoreCache
+
+    cache = FraudScoreCache(ttl_seconds=-1, quantize_decimals=2)
+    cache.put([1.001] * 11, "v1", 0.5)
+    assert cache.get([1.0] * 11, "v1") is None
+    assert cache.expirations == 1
+
+    cache = FraudScoreCache(ttl_seconds=60, quantize_decimals=2)
+    cache.put([1.001] * 11, "v1", 0.5)
+    assert cache.get([1.0] * 11, "v1") == 0.5
+    assert cache.get([1.0] * 11, "v2") is None
+
+
+# -------------------------
+# Model registry (hot reload)
+# -------------------------
+
+def test_registry_reload_swaps_warm_model(tmp_path, rows, monkeypatch):
+    import json
+    from backend.ml.fraud_registry import FraudModelRegistry
+
+    # The registry's own path must win over the env var
+    monkeypatch.setenv("FRAUD_XGB_MODEL_PATH", str(tmp_path / "missing.json"))
+    src = FraudModelXGB().model_path
+    if not src.exists():
+        pytest.skip("fraud model artifact not available")
+    path = tmp_path / "fraud_xgb_model.json"
+    path.write_text(src.read_text())
+
+    published = []
+    registry = FraudModelRegistry(path, build=lambda p: FraudModelXGB(model_path=str(p)), publish=published.append)
+    first = registry.load_initial()
+    assert published == [first] and first.version
+
+    # Unchanged artifact: no swap
+    assert registry.reload(wait=True)
+    assert published == [first]
+
+    # Retrained artifact (different bytes, same trees)
+    doc = json.loads(path.read_text())
+    doc["learner"]["attributes"]["retrained"] = "1"
+    path.write_text(json.dumps(doc))
+    assert registry.reload(wait=True)
+
+    second = published[-1]
+    assert second is registry.current and second.version != first.version
+    assert second.predict(rows[0].tolist()).model_version == second.version
+    assert [h["status"] for h in registry.status()["history"]] == ["active", "retired"]
+
+
+def test_registry_keeps_model_when_reload_fails(tmp_path):
+    from backend.ml.fraud_registry import FraudModelRegistry
+
+    src = FraudModelXGB().model_path
+    if not src.exists():
+        pytest.skip("fraud model artifact not available")
+    path = tmp_path / "fraud_xgb_model.json"
+    path.write_text(src.read_text())
+
+    registry = FraudModelRegistry(path, build=lambda p: FraudModelXGB(model_path=str(p)), publish=lambda m: None)
+    first = registry.load_initial()
+    path.write_text("{not json")
+    registry.reload(wait=True)
+
+    assert registry.current is first
+    assert registry.status()["history"][0]["status"] == "failed"
+
+
+class _FileModel:
+    """Registry test double whose version is the artifact's contents."""
+
+    input_dim = 2
+
+    def __init__(self, path, gate=None):
+        self.path, self.gate, self.version = path, gate, None
+
+    def load(self):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.version = self.path.read_text()
+
+    def predict_proba_batch(self, X):
+        return np.zeros(len(X))
+
+    def predict_proba(self, row):
+        return 0.0
+
+
+def test_watcher_retries_a_change_seen_while_reloading(tmp_path):
+    import threading
+    import time
+    from backend.ml.fraud_registry import FraudModelRegistry
+
+    path, other = tmp_path / "model.json", tmp_path / "other.json"
+    path.write_text("v1")
+    other.write_text("manual")
+    gate = threading.Event()
+    published = []
+    registry = FraudModelRegistry(
+        path, build=lambda p: _FileModel(p, gate if p == other else None), publish=published.append
+    )
+    registry.load_initial()
+
+    # A slow manual reload is running when the artifact changes
+    assert registry.reload(path=other)
+    path.write_text("v2-retrained")
+    registry.start_watching(0.01)
+    try:
+        time.sleep(0.2)
+        assert [m.version for m in published] == ["v1"]
+        gate.set()
+        deadline = time.monotonic() + 5
+        while published[-1].version != "v2-retrained" and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        registry.stop_watching()
+    assert [m.version for m in published] == ["v1", "manual", "v2-retrained"]
+
+
+# -------------------------
+# Shadow scoring
+# -------------------------
+
+def test_shadow_drops_when_full_and_compares(model, rows):
+    import time
+    from backend.ml.fraud_shadow import FraudShadowScorer
+
+    shadow = FraudShadowScorer(model, max_queue=8, linger_ms=0)
+    probs = model.predict_proba_batch(rows[:10])
+    accepted = [shadow.observe(r.tolist(), p, 0.93, 0.5) for r, p in zip(rows[:10], probs)]
+    assert accepted == [True] * 8 + [False] * 2
+
+    shadow.start()
+    deadline = time.time() + 5
+    while shadow.stats()["compared"] < 8 and time.time() < deadline:
+        time.sleep(0.01)
+    shadow.stop()
+
+    stats = shadow.stats()
+    assert (stats["observed"], stats["dropped"], stats["compared"]) == (10, 2, 8)
+    assert stats["verdict_agreement"] == 1.0  # candidate == primary
+    assert stats["max_abs_prob_diff"] < 1e-6
@@ -0,0 +1,149 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from models.expense import Expense
+from models.pipeline_job import PipelineJob, PipelineJobResult
+from services import job_queue, pipeline_service
+
+
+def expenses(n):
+    return [{"description": f"Uber ride {i}", "amount": 12.5, "payer_id": "alice"} for i in range(n)]
+
+
+def test_claims_are_exclusive_and_oldest_first(db, session_factory):
+    first = job_queue.enqueue(db, expenses(1))
+    second = job_queue.enqueue(db, expenses(1))
+
+    other = session_factory()
+    try:
+        a = job_queue.claim_next(db, "w1")
+        b = job_queue.claim_next(other, "w2")
+        assert job_queue.claim_next(db, "w3") is None
+        assert (a.id, b.id) == (first.id, second.id)
+        assert a.status == b.status == "processing"
+        assert a.attempts == 1
+    finally:
+        other.close()
+
+
+def test_run_job_reports_progress_and_stores_result(db):
+    job = job_queue.enqueue(db, expenses(5) + [{"description": "", "payer_id": "alice"}])
+    claimed = job_queue.claim_next(db, "w1")
+
+    assert job_queue.run_job(db, claimed, "w1", chunk_size=2) == "completed"
+
+    db.expire_all()
+    done = job_queue.get_job(db, job.id).to_dict()
+    assert done["status"] == "completed"
+    assert done["progress"] == {"processed": 6, "total": 6, "percent": 100.0}
+    assert (done["success"], done["errors"]) == (5, 1)
+    assert db.query(Expense).count() == 5
+
+    # Results are stored per chunk and read back in pages
+    page, next_offset = job_queue.get_results(db, job.id, offset=1, limit=3)
+    assert [r["index"] for r in page] == [1, 2, 3]
+    assert next_offset == 4
+    assert [r["index"] for r in job_queue.iter_results(db, job.id)] == list(range(6))
+    assert job_queue.get_results(db, job.id, offset=4, limit=10)[1] is None
+    assert job_queue.get_job(db, job.id).payload == []
+
+
+def test_errors_only_job_keeps_only_failed_rows(db):
+    job = job_queue.enqueue(db, expenses(4) + [{"description": "", "payer_id": "alice"}], result_mode="errors_only")
+    job_queue.process_pending(db, chunk_size=2)
+
+    stored = list(job_queue.iter_results(db, job.id))
+    assert [(r["index"], r["stage"]) for r in stored] == [(4, "validation")]
+    assert job_queue.get_job(db, job.id).to_dict()["success"] == 4
+
+
+def test_retried_job_does_not_duplicate_expenses(db, monkeypatch):
+    add_results = job_queue.add_results
+
+    def crash_after_second_chunk(db, job_id, seq, results):
+        # The chunk's expenses are committed; its results and progress are not
+        if seq == 1:
+            monkeypatch.setattr(job_queue, "add_results", add_results)
+            raise RuntimeError("worker crashed")
+        add_results(db, job_id, seq, results)
+
+    monkeypatch.setattr(job_queue, "add_results", crash_after_second_chunk)
+    job = job_queue.enqueue(db, expenses(5))
+
+    assert job_queue.run_job(db, job_queue.claim_next(db, "w1"), "w1", chunk_size=2) == "pending"
+    assert db.query(Expense).count() == 4
+    assert job_queue.run_job(db, job_queue.claim_next(db, "w2"), "w2", chunk_size=2) == "completed"
+
+    assert db.query(Expense).count() == 5
+    db.expire_all()
+    done = job_queue.get_job(db, job.id)
+    assert done.attempts == 2
+    assert (done.to_dict()["success"], done.to_dict()["errors"]) == (5, 0)
+    assert [r["expense"]["persisted"] for r in job_queue.iter_results(db, job.id)] == [True] * 5
+
+
+def test_job_retried_after_failing_partway_counts_committed_rows_as_persisted(db, monkeypatch):
+    run_bulk_pipeline = pipeline_service.run_bulk_pipeline
+    calls = []
+
+    def fail_on_second_chunk(*args, **kwargs):
+        calls.append(kwargs["skip_existing"])
+        if len(calls) == 2:
+            raise RuntimeError("database went away")
+        return run_bulk_pipeline(*args, **kwargs)
+
+    monkeypatch.setattr(pipeline_service, "run_bulk_pipeline", fail_on_second_chunk)
+    job = job_queue.enqueue(db, expenses(5), result_mode="errors_only")
+
+    assert job_queue.run_job(db, job_queue.claim_next(db, "w1"), "w1", chunk_size=2) == "pending"
+    assert db.query(Expense).count() == 2
+    assert job_queue.run_job(db, job_queue.claim_next(db, "w2"), "w2", chunk_size=2) == "completed"
+
+    db.expire_all()
+    done = job_queue.get_job(db, job.id).to_dict()
+    assert (done["success"], done["errors"]) == (5, 0)
+    assert list(job_queue.iter_results(db, job.id)) == []
+    assert db.query(Expense).count() == 5
+    assert calls == [False, False, True, True, True]
+
+
+def test_stale_jobs_are_requeued_and_expired_jobs_evicted(db):
+    job_id = job_queue.enqueue(db, expenses(1)).id
+    job_queue.claim_next(db, "crashed")
+    db.query(PipelineJob).update({PipelineJob.heartbeat_at: datetime.utcnow() - timedelta(minutes=10)})
+    db.commit()
+
+    assert job_queue.requeue_stale(db, stale_after_s=60) == 1
+    db.expire_all()
+    assert job_queue.get_job(db, job_id).status == "pending"
+
+    job_queue.process_pending(db, ttl_seconds=-1)
+    assert db.query(PipelineJobResult).count() == 1
+    assert job_queue.evict_expired(db) == 1
+    assert job_queue.get_job(db, job_id) is None
+    assert db.query(PipelineJobResult).count() == 0
+
+
+def test_worker_pool_processes_queued_jobs(db, session_factory):
+    pool = job_queue.JobWorkerPool(session_factory, workers=2, poll_interval_s=0.05)
+    pool.start()
+    try:
+        jobs = [job_queue.enqueue(db, expenses(4)) for _ in range(3)]
+        pool.wake()
+        deadline = time.monotonic() + 10
+        while job_queue.job_counts(db)["completed"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+
+    assert job_queue.job_counts(db)["completed"] == 3
+    stats = pool.stats()
+    assert stats["jobs"]["completed"] == 3
+    assert stats["rows_processed"] == 12
+    assert stats["queue_latency_ms"]["max"] >= 0
+    assert db.query(Expense).count() == 12
+    assert all(job_queue.get_job(db, j.id).status == "completed" for j in jobs)
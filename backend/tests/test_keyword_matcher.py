@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+from services.keyword_matcher import KeywordMatcher
+from services.settlement_service import CATEGORY_KEYWORDS, detect_categories, detect_category
+from transaction_categorizer import TransactionCategorizer
+
+
+def reference_detect_category(merchant: str) -> str:
+    """The original one-scan-per-category implementation."""
+    merchant = merchant.lower()
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(x in merchant for x in keywords):
+            return category
+    return "general"
+
+
+def reference_categorize(categorizer: TransactionCategorizer, description: str):
+    """The original one-scan-per-keyword implementation."""
+    desc_lower = description.lower()
+    for keyword, cat_idx in categorizer.keyword_map.items():
+        if keyword in desc_lower:
+            return categorizer.CATEGORIES[cat_idx], 0.95
+    return categorizer.CATEGORIES[-1], 0.30
+
+
+def random_descriptions(keywords, n: int, seed: int) -> list:
+    """Keyword fragments glued together so matches overlap and nest."""
+    rng = random.Random(seed)
+    pieces = keywords + [k[: rng.randint(1, len(k))] for k in keywords] + ["#1234", " ", "POS ", "*", "inc"]
+    out = []
+    for _ in range(n):
+        s = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 5)))
+        out.append(s.upper() if rng.random() < 0.5 else s)
+    return out
+
+
+def test_detect_category_identical_to_reference():
+    keywords = [k for _, kws in CATEGORY_KEYWORDS for k in kws]
+    descriptions = random_descriptions(keywords, 5000, seed=1) + ["", "Uber Eats", "UBER", "shop at delta", "foodshop"]
+    expected = [reference_detect_category(d) for d in descriptions]
+    assert [detect_category(d) for d in descriptions] == expected
+    assert detect_categories(descriptions) == expected
+
+
+def test_categorizer_identical_to_reference():
+    categorizer = TransactionCategorizer()
+    descriptions = random_descriptions(list(categorizer.keyword_map), 5000, seed=2) + [
+        "DoorDash - Order #12345", "Uber Eats order", "Uber ride", "gas bill", "Netflix subscription", "",
+    ]
+    for d in descriptions:
+        assert categorizer.categorize(d) == reference_categorize(categorizer, d)
+
+
+def test_overlapping_keywords_resolve_by_priority():
+    # Priority, not position: "uber" starts first but "uber eats" / "eats" rank higher
+    m = KeywordMatcher([("uber eats", "dining"), ("eats", "snack"), ("uber", "ride")], default="other")
+    assert m.match("UBER EATS") == "dining"
+    assert m.match("uber rides") == "ride"
+    assert m.match("ubereats") == "snack"
+    assert m.match("nothing here") == "other"
+    assert m.match_keyword("xx uber eats") == "uber eats"
+    assert m.match_many(["uber", "UBER", "uber", "eats"]) == ["ride", "ride", "ride", "snack"]
+    assert m.keywords == ["uber eats", "eats", "uber"]
+    assert KeywordMatcher([], default="other").match("anything") == "other"
+
+
+def test_pipeline_categorizes_with_the_shared_matcher():
+    from services import pipeline_service
+
+    assert isinstance(pipeline_service.get_transaction_categorizer().matcher, KeywordMatcher)
+    assert pipeline_service.enrich_expense({"description": "LYFT *RIDE 4411"})["category"] == "Transportation"
+
+
+def test_categorize_many_matches_categorize():
+    categorizer = TransactionCategorizer()
+    descriptions = random_descriptions(list(categorizer.keyword_map), 2000, seed=3) * 2 + [None, ""]
+    categories, confidences = categorizer.categorize_many(descriptions)
+
+    assert len(categories) == len(confidences) == len(descriptions)
+    for d, category, confidence in zip(descriptions, categories, confidences):
+        assert (category, confidence) == categorizer.categorize(d or "")
+    empty = categorizer.categorize_many([])
+    assert len(empty[0]) == len(empty[1]) == 0
+
+
+def test_categorize_many_accepts_series():
+    pd = pytest.importorskip("pandas")
+    categorizer = TransactionCategorizer()
+    series = pd.Series(["DoorDash #1", "Uber ride", None, "DoorDash #1"], index=[10, 11, 12, 13])
+    categories, confidences = categorizer.categorize_many(series)
+    assert categories.tolist() == ["Food & Dining", "Transportation", "Other", "Food & Dining"]
+    assert confidences.tolist() == [0.95, 0.95, 0.30, 0.95]
+
+
+def test_categorize_many_shares_the_merchant_cache():
+    from services.merchant_cache import MerchantCategoryCache
+
+    categorizer = TransactionCategorizer(cache=MerchantCategoryCache())
+    categorizer.categorize_many(["NETFLIX.COM 8841", "NETFLIX.COM 8841", "UBER *TRIP"])
+    assert categorizer.cache.misses == 2
+
+    # Batch results serve single lookups and vice versa
+    assert categorizer.categorize("NETFLIX.COM 8841") == ("Entertainment", 0.95)
+    categorizer.categorize_many(["NETFLIX.COM 9917", "UBER *TRIP"])
+    stats = (categorizer.cache.misses, categorizer.cache.raw_hits, categorizer.cache.normalized_hits)
+    assert stats == (2, 2, 1)
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from services.merchant_cache import MerchantCategoryCache, normalization_safe, normalize_merchant
+from transaction_categorizer import TransactionCategorizer, shared_cache
+
+
+def test_normalize_collapses_numbers_only():
+    assert normalize_merchant("DOORDASH*ORDER 81723") == "doordash*order #"
+    assert normalize_merchant("AMAZON.COM*2K4XY7 ...1234") == "amazon.com*#k#xy# ...#"
+    assert normalize_merchant("Uber   Eats") == "uber   eats"
+    assert normalization_safe(["uber eats", "food"])
+    assert not normalization_safe(["7-eleven"])
+    assert not normalization_safe(["#1 pizza"])
+
+
+def test_raw_then_normalized_hits_and_stats():
+    calls = []
+    cache = MerchantCategoryCache(max_size=10)
+
+    def compute(text):
+        calls.append(text)
+        return "dining"
+
+    assert cache.lookup("DOORDASH*ORDER 81723", compute) == "dining"
+    assert cache.lookup("DOORDASH*ORDER 81723", compute) == "dining"
+    assert cache.lookup("DOORDASH*ORDER 4", compute) == "dining"
+    assert calls == ["DOORDASH*ORDER 81723"]
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["raw_hits"], stats["normalized_hits"]) == (1, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
+    assert stats["size"] == 1 and stats["raw_size"] == 2
+
+
+def test_lru_eviction_is_bounded():
+    cache = MerchantCategoryCache(max_size=2)
+    for name in ["alpha", "beta", "gamma"]:
+        cache.lookup(name, str.upper)
+    stats = cache.stats()
+    assert stats["size"] == 2 and stats["raw_size"] == 2
+    assert stats["evictions"] == 2  # one per level
+    assert cache.lookup("gamma", lambda t: "recomputed") == "GAMMA"
+    assert cache.lookup("alpha", lambda t: "recomputed") == "recomputed"
+    with pytest.raises(ValueError):
+        MerchantCategoryCache(max_size=0)
+
+
+def test_cached_categorizer_matches_uncached():
+    rng = random.Random(4)
+    categorizer = TransactionCategorizer(cache=MerchantCategoryCache(max_size=50))
+    keywords = list(categorizer.keyword_map)
+    pieces = keywords + ["#", "*", " ", "ORDER ", "x"] + [str(rng.randint(0, 99999)) for _ in range(20)]
+    for _ in range(3000):
+        desc = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 6)))
+        desc = desc.upper() if rng.random() < 0.5 else desc
+        assert categorizer.categorize(desc) == categorizer._categorize(desc)
+    assert categorizer.cache.stats()["normalized_hits"] > 0
+
+
+def test_categorizers_share_the_process_cache():
+    a, b = TransactionCategorizer(), TransactionCategorizer()
+    assert a.cache is b.cache
+    assert a.cache is shared_cache
+
+
+def test_pipeline_categorizes_through_the_shared_cache():
+    from services import pipeline_service
+
+    before = shared_cache.stats()
+    pipeline_service.enrich_expense({"description": "SPOTIFY PIPELINE TEST 1001"})
+    pipeline_service.enrich_expense({"description": "SPOTIFY PIPELINE TEST 2002"})
+
+    assert pipeline_service.get_transaction_categorizer().cache is shared_cache
+    assert shared_cache.stats()["normalized_hits"] - before["normalized_hits"] == 1
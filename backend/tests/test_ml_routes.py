@@ -0,0 +1,210 @@
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import ml
+from services.keyword_matcher import KeywordMatcher
+from transaction_categorizer import shared_cache
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(ml.__file__)))
+
+CARDS = [{"id": 1, "name": "Visa", "limit": 5000, "balance": 1000, "rewards_rate": 0.02}]
+AMEX = {"id": 2, "name": "Amex", "limit": 9000, "balance": 0, "rewards_rate": 0.05}
+CHASE = {"id": 3, "name": "Chase", "limit": 2000, "balance": 500, "rewards_rate": 0.01}
+
+
+class FakeFraudModel:
+    """Scores every row with the same probability."""
+
+    input_dim = 11
+    version = "v1"
+
+    def __init__(self, prob):
+        self.prob = prob
+
+    def score(self, features):
+        return self.prob, self.version
+
+
+class FakeBatchFraudModel:
+    """Flags rows whose first feature (the amount) is at least 1000."""
+
+    input_dim = 3
+    version = "v2"
+
+    def __init__(self):
+        self.rows = []
+
+    def predict_proba_batch(self, rows):
+        self.rows.extend(rows)
+        return np.array([0.99 if row[0] >= 1000 else 0.1 for row in rows])
+
+
+class FakeShadow:
+    def __init__(self):
+        self.observed = []
+        self.features = []
+
+    def observe(self, features, primary_prob, primary_threshold, primary_ms=None):
+        self.observed.append((primary_prob, primary_threshold))
+        self.features.append(features)
+        return True
+
+
+class FakeRecommender:
+    """Puts the whole amount on the card with the best rewards rate."""
+
+    def recommend(self, transaction_amount, cards, free_trial=False, merchant=None):
+        return {"allocations": [{"card_id": cards[0]["id"], "amount": transaction_amount}]}
+
+    def recommend_batch(self, transactions, free_trial=False):
+        return [
+            {"allocations": [{"card_id": max(t["cards"], key=lambda c: c["rewards_rate"])["id"], "amount": t["transaction_amount"]}]}
+            for t in transactions
+        ]
+
+
+@pytest.fixture()
+def app():
+    app = FastAPI()
+    app.include_router(ml.router)
+    app.state.fraud_threshold = 0.9
+    app.dependency_overrides[ml.card_recommender_dep] = FakeRecommender
+    return app
+
+
+def test_shadow_sees_the_threshold_the_request_applied(app):
+    app.state.fraud_model = FakeFraudModel(0.6)
+    app.state.fraud_shadow = shadow = FakeShadow()
+    client = TestClient(app)
+
+    overridden = client.post(
+        "/api/ml/recommend", json={"transaction_amount": 50, "cards": CARDS, "fraud_threshold": 0.5}
+    ).json()
+    client.post("/api/ml/recommend", json={"transaction_amount": 50, "cards": CARDS})
+
+    assert overridden["fraud_warning"]["threshold"] == 0.5
+    assert shadow.observed == [(0.6, 0.5), (0.6, 0.9)]
+
+
+def test_categorize_is_served_by_the_backend_categorizer(app):
+    served = ml.get_transaction_categorizer()
+    module = __import__(type(served).__module__)
+
+    # Not the ml/models copy, which still scans its keyword table per call
+    assert os.path.dirname(os.path.abspath(module.__file__)) == BACKEND_DIR
+    assert isinstance(served.matcher, KeywordMatcher)
+    response = TestClient(app).post("/api/ml/categorize", json={"description": "UBER *TRIP 1234"})
+    assert response.json()["category"] == "Transportation"
+
+
+def test_categorize_goes_through_the_shared_merchant_cache(app):
+    client = TestClient(app)
+    before = client.get("/api/ml/categorize/cache/stats").json()["transaction_categorizer"]
+
+    client.post("/api/ml/categorize", json={"description": "NETFLIX.COM ROUTE TEST 8841"})
+    client.post("/api/ml/categorize", json={"description": "NETFLIX.COM ROUTE TEST 8841"})
+    client.post("/api/ml/categorize", json={"description": "NETFLIX.COM ROUTE TEST 9917"})
+
+    after = client.get("/api/ml/categorize/cache/stats").json()["transaction_categorizer"]
+    assert ml.get_transaction_categorizer().cache is shared_cache
+    assert after["raw_hits"] - before["raw_hits"] == 1
+    assert after["normalized_hits"] - before["normalized_hits"] == 1
+
+
+@pytest.fixture()
+def batch_app(app):
+    app.state.fraud_model = FakeBatchFraudModel()
+    app.state.fraud_feature_names = ["_amount", "_card_limit", "_card_balance"]
+    app.state.fraud_shadow = FakeShadow()
+    return app
+
+
+def test_batch_applies_fraud_policy_per_transaction(batch_app):
+    client = TestClient(batch_app)
+    transactions = [{"transaction_amount": 50}, {"transaction_amount": 1500}, {"transaction_amount": 80}]
+
+    warned = client.post("/api/ml/recommend/batch", json={"transactions": transactions, "cards": CARDS}).json()
+    blocked = client.post(
+        "/api/ml/recommend/batch",
+        json={"transactions": transactions, "cards": CARDS, "fraud_action": "block", "fraud_threshold": 0.5},
+    ).json()
+
+    assert (warned["count"], warned["blocked"]) == (3, 0)
+    assert warned["results"][1]["fraud_warning"]["blocked"] is False
+    assert warned["results"][1]["allocations"] == [{"card_id": 1, "amount": 1500.0}]
+    assert "fraud_warning" not in warned["results"][0]
+    assert [r["fraud_model_version"] for r in warned["results"]] == ["v2"] * 3
+
+    assert (blocked["count"], blocked["blocked"]) == (3, 1)
+    assert blocked["results"][1]["blocked"] is True
+    assert blocked["results"][1]["fraud_warning"]["threshold"] == 0.5
+    assert "allocations" not in blocked["results"][1]
+    assert [r["index"] for r in blocked["results"]] == [0, 1, 2]
+    assert "allocations" in blocked["results"][2]
+
+
+def test_batch_portfolios_pick_best_and_score_fraud_on_own_cards(batch_app):
+    client = TestClient(batch_app)
+
+    response = client.post(
+        "/api/ml/recommend/batch",
+        json={
+            "transactions": [{"transaction_amount": 100, "cards": [CHASE]}, {"transaction_amount": 200}],
+            "cards": CARDS,
+            "portfolios": [[CHASE], [AMEX, CHASE]],
+        },
+    ).json()
+
+    first, second = response["results"]
+    assert [p["estimated_rewards"] for p in first["portfolios"]] == [1.0, 5.0]
+    assert first["best_portfolio_index"] == second["best_portfolio_index"] == 1
+    # Fraud features come from the transaction's own cards, then the shared ones
+    assert batch_app.state.fraud_model.rows == [[100.0, 2000.0, 500.0], [200.0, 5000.0, 1000.0]]
+
+
+def test_batch_feeds_the_shadow(batch_app):
+    client = TestClient(batch_app)
+
+    client.post(
+        "/api/ml/recommend/batch",
+        json={"transactions": [{"transaction_amount": 50}, {"transaction_amount": 1500}], "cards": CARDS,
+              "fraud_threshold": 0.7},
+    )
+
+    assert batch_app.state.fraud_shadow.observed == [(0.1, 0.7), (0.99, 0.7)]
+    assert batch_app.state.fraud_shadow.features == batch_app.state.fraud_model.rows
+
+
+def test_batch_without_cards_is_rejected(batch_app):
+    client = TestClient(batch_app)
+
+    response = client.post(
+        "/api/ml/recommend/batch",
+        json={"transactions": [{"transaction_amount": 50, "cards": CARDS}, {"transaction_amount": 20}]},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "transactions[1] has no cards"
+
+
+def test_batch_falls_back_to_per_row_scoring(app):
+    app.state.fraud_model = FakeFraudModel(0.95)
+    app.state.fraud_shadow = shadow = FakeShadow()
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/ml/recommend/batch",
+        json={"transactions": [{"transaction_amount": 50}, {"transaction_amount": 60}], "cards": CARDS},
+    ).json()
+
+    assert [r["fraud_probability"] for r in response["results"]] == [0.95, 0.95]
+    assert [r["fraud_model_version"] for r in response["results"]] == ["v1", "v1"]
+    assert all("fraud_warning" in r for r in response["results"])
+    assert shadow.observed == [(0.95, 0.9), (0.95, 0.9)]
@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+import main
+from routes import ml
+
+RECOMMEND = {"transaction_amount": 50, "cards": [{"id": 1, "name": "Visa", "limit": 5000, "balance": 1000}]}
+
+
+class FakeRecommender:
+    def recommend(self, transaction_amount, cards, free_trial=False, merchant=None):
+        return {"allocations": [{"card_id": cards[0]["id"], "amount": transaction_amount}]}
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    # No startup event: each test drives app.state.ml_warmup itself
+    monkeypatch.setattr(main.app.state, "fraud_model", None, raising=False)
+    monkeypatch.setattr(main.app.state, "ml_warmup", {"status": "pending", "elapsed_ms": None}, raising=False)
+    monkeypatch.setattr(main.models, "load_all", lambda: {})
+    main.app.dependency_overrides[ml.card_recommender_dep] = FakeRecommender
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.pop(ml.card_recommender_dep, None)
+
+
+def test_pending_warmup_is_not_ready(client):
+    assert client.get("/ready").status_code == 503
+    assert client.post("/api/ml/recommend", json=RECOMMEND).status_code == 503
+
+
+def test_loading_warmup_is_not_ready(client, monkeypatch):
+    seen = {}
+
+    def load_fraud_models():
+        seen["status"] = main.app.state.ml_warmup["status"]
+        seen["ready"] = client.get("/ready").status_code
+        seen["recommend"] = client.post("/api/ml/recommend", json=RECOMMEND).status_code
+
+    monkeypatch.setattr(main, "load_fraud_models", load_fraud_models)
+    main.warm_up_ml()
+
+    assert seen == {"status": "loading", "ready": 503, "recommend": 503}
+
+
+def test_finished_warmup_is_ready(client, monkeypatch):
+    monkeypatch.setattr(main, "load_fraud_models", lambda: None)
+    main.warm_up_ml()
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["models_ready"] is True
+    assert response.json()["warmup"]["status"] == "ready"
+    assert client.post("/api/ml/recommend", json=RECOMMEND).status_code == 200
+
+
+def test_failed_warmup_is_reported_and_does_not_block_requests(client, monkeypatch):
+    def load_fraud_models():
+        raise RuntimeError("artifact unreadable")
+
+    monkeypatch.setattr(main, "load_fraud_models", load_fraud_models)
+    main.warm_up_ml()
+
+    body = client.get("/ready").json()
+    assert body["models_ready"] is False
+    assert body["warmup"]["status"] == "failed"
+    assert body["warmup"]["error"] == "artifact unreadable"
+    assert body["warmup"]["elapsed_ms"] is not None
+    assert client.get("/ready").status_code == 200
+    assert client.post("/api/ml/recommend", json=RECOMMEND).status_code == 200
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+from services.model_provider import ModelProvider, get_transaction_categorizer
+
+
+def test_builds_once_under_concurrent_first_use():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    provider = ModelProvider()
+    provider.register("slow", factory)
+    assert not provider.loaded("slow")
+
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(provider.get("slow"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(got) == 8 and all(g is got[0] for g in got)
+    assert provider.status()["slow"]["loaded"]
+    assert provider.status()["slow"]["load_ms"] >= 50
+
+
+def test_failed_load_is_reported_and_retried():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ImportError("No module named 'torch'")
+        return "model"
+
+    provider = ModelProvider()
+    provider.register("flaky", factory)
+    assert provider.load_all() == {"flaky": None}
+    assert provider.status()["flaky"] == {"loaded": False, "load_ms": None, "error": "No module named 'torch'"}
+
+    assert provider.get("flaky") == "model"
+    assert provider.status()["flaky"]["error"] is None
+    with pytest.raises(KeyError):
+        provider.get("missing")
+
+
+def test_set_overrides_and_default_categorizer_is_shared():
+    provider = ModelProvider()
+    provider.register("m", lambda: "built")
+    provider.set("m", "injected")
+    assert provider.get("m") == "injected"
+    assert get_transaction_categorizer() is get_transaction_categorizer()
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import event
+
+from models.expense import Expense
+from services import pipeline_service
+
+
+def raw(i, **overrides):
+    return {"id": f"e{i}", "description": f"Uber ride {i}", "amount": 10 + i, "payer_id": "alice", **overrides}
+
+
+def test_bulk_pipeline_inserts_in_chunks(engine, db):
+    inserts = []
+    event.listen(
+        engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT INTO expenses") else None,
+    )
+
+    summary = pipeline_service.run_bulk_pipeline(
+        [raw(i) for i in range(10)], db, store_result=False, persist_chunk_size=4
+    )
+
+    assert summary["success"] == 10
+    assert all(r["expense"]["persisted"] for r in summary["results"])
+    assert db.query(Expense).count() == 10
+    assert len(inserts) == 3
+
+
+def test_failed_chunk_falls_back_to_per_row_errors(db):
+    pipeline_service.run_bulk_pipeline([raw(2)], db, store_result=False)
+
+    summary = pipeline_service.run_bulk_pipeline(
+        [raw(i) for i in range(5)] + [{"description": "", "payer_id": "alice"}],
+        db, store_result=False, persist_chunk_size=3,
+    )
+
+    persisted = [r["expense"]["persisted"] for r in summary["results"][:5]]
+    assert persisted == [True, True, False, True, True]
+    assert "persist_error" in summary["results"][2]["expense"]
+    assert summary["results"][5]["stage"] == "validation"
+    assert (summary["success"], summary["errors"]) == (4, 2)
+    assert db.query(Expense).count() == 5
+
+
+def test_stream_pipeline_batches_rows_and_reports_parse_errors(db):
+    lines = [json.dumps(raw(i)) for i in range(5)] + ["{not json", "", json.dumps({"description": "x"})]
+
+    out = list(pipeline_service.stream_bulk_pipeline(pipeline_service.iter_ndjson(lines), db, batch_size=2))
+
+    results, summary = out[:-1], out[-1]["summary"]
+    assert [r["index"] for r in results] == list(range(7))
+    assert [r.get("stage") for r in results[5:]] == ["parse", "validation"]
+    assert (summary["total"], summary["success"], summary["errors"]) == (7, 5, 2)
+    assert db.query(Expense).count() == 5
+
+
+def test_persist_failures_count_as_errors_in_every_mode(db):
+    pipeline_service.run_bulk_pipeline([raw(1)], db, store_result=False)
+    lines = [json.dumps(raw(i)) for i in range(3)]
+
+    full = list(pipeline_service.stream_bulk_pipeline(pipeline_service.iter_ndjson(lines), db, batch_size=2))
+    errors_only = list(pipeline_service.stream_bulk_pipeline(
+        pipeline_service.iter_ndjson([json.dumps(raw(1))]), db, result_mode="errors_only"
+    ))
+
+    assert (full[-1]["summary"]["success"], full[-1]["summary"]["errors"]) == (2, 1)
+    assert full[1]["expense"]["persisted"] is False
+    assert [r["index"] for r in errors_only[:-1]] == [0]
+    assert errors_only[-1]["summary"]["errors"] == 1
+
+
+def test_iter_csv_reads_members_and_skips_blank_cells():
+    lines = ["description,amount,payer_id,members\n", "Dinner,42.50,alice,alice; bob\n", "Taxi,,bob,\n"]
+
+    rows = list(pipeline_service.iter_csv(lines))
+
+    assert rows[0] == {"description": "Dinner", "amount": "42.50", "payer_id": "alice", "members": ["alice", "bob"]}
+    assert rows[1] == {"description": "Taxi", "payer_id": "bob"}
+    assert pipeline_service.transform_expense(rows[0])["amount_cents"] == 4250
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_stream_pipeline_enriches_on_a_pool(db, executor):
+    lines = [json.dumps(raw(i)) for i in range(9)]
+
+    out = list(pipeline_service.stream_bulk_pipeline(
+        pipeline_service.iter_ndjson(lines), db, batch_size=2, workers=2, executor=executor
+    ))
+
+    results, summary = out[:-1], out[-1]["summary"]
+    assert [r["index"] for r in results] == list(range(9))
+    assert {r["expense"]["category"] for r in results} == {"Transportation"}
+    assert all(r["expense"]["persisted"] for r in results)
+    assert {stage: s["rows"] for stage, s in summary["stages"].items()} == {"prepare": 9, "enrich": 9, "persist": 9}
+    assert db.query(Expense).count() == 9
+
+
+def test_result_modes_trim_bulk_results(db):
+    rows = [raw(i) for i in range(3)] + [{"description": "", "payer_id": "alice"}]
+
+    full = pipeline_service.run_bulk_pipeline(rows, store_result=False)
+    errors_only = pipeline_service.run_bulk_pipeline(rows, store_result=False, result_mode="errors_only")
+    summary = pipeline_service.run_bulk_pipeline(rows, store_result=False, result_mode="summary")
+
+    assert len(full["results"]) == 4
+    assert "raw" not in full["results"][0]["expense"]
+    assert [r["index"] for r in errors_only["results"]] == [3]
+    assert "results" not in summary
+    assert (summary["success"], summary["errors"]) == (3, 1)
+    with pytest.raises(ValueError):
+        pipeline_service.run_bulk_pipeline(rows, result_mode="everything")
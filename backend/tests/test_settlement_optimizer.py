@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from services.settlement_optimizer import optimize_transactions, solve_min_transfers
+from services.settlement_service import minimize_transactions
+
+
+def assert_settles(balances: dict, txs: list):
+    net = {name: 0 for name in balances}
+    for t in txs:
+        assert t["amount_cents"] > 0
+        net[t["from"]] -= t["amount_cents"]
+        net[t["to"]] += t["amount_cents"]
+    assert net == balances
+
+
+def brute_force_min_transfers(values: list) -> int:
+    """n - (max number of disjoint zero-sum subsets), by exhaustive search."""
+    from functools import lru_cache
+
+    n = len(values)
+
+    @lru_cache(maxsize=None)
+    def groups(mask: int) -> int:
+        if mask == 0:
+            return 0
+        first = mask & -mask
+        rest = mask ^ first
+        best, sub = 0, rest
+        while True:
+            s = sub | first
+            if sum(values[i] for i in range(n) if s >> i & 1) == 0:
+                best = max(best, 1 + groups(mask ^ s))
+            if sub == 0:
+                return best
+            sub = (sub - 1) & rest
+
+    return n - groups((1 << n) - 1)
+
+
+def random_balances(n: int, rng: random.Random, amounts=None) -> dict:
+    amounts = amounts or list(range(-6, 7))
+    values = [rng.choice(amounts) for _ in range(n - 1)]
+    values.append(-sum(values))
+    return {f"user_{i}": v for i, v in enumerate(values)}
+
+
+def test_beats_greedy_on_two_independent_subgroups():
+    # Greedy crosses the subgroups (4 transfers); optimal settles {B, E} and {A, C, D} separately (3)
+    balances = {"A": 700, "B": 300, "C": -600, "D": -100, "E": -300}
+    greedy = minimize_transactions(balances)
+    plan = solve_min_transfers(balances)
+
+    assert_settles(balances, plan["transactions"])
+    assert len(plan["transactions"]) < len(greedy)
+    assert plan["solver"] == "exact"
+    assert not plan["timed_out"]
+
+
+def test_exact_solver_is_optimal_on_small_groups():
+    rng = random.Random(7)
+    for _ in range(200):
+        balances = random_balances(rng.randint(2, 9), rng)
+        nonzero = [v for v in balances.values() if v]
+        txs = optimize_transactions(balances, time_budget_ms=None)
+        assert_settles(balances, txs)
+        assert len(txs) == brute_force_min_transfers(nonzero)
+
+
+def test_heuristic_never_worse_than_greedy_on_large_groups():
+    rng = random.Random(11)
+    amounts = [500, 1000, 1500, 2500, -500, -1000, -2500, 1234, -777]
+    for n in (50, 500, 3000):
+        balances = random_balances(n, rng, amounts)
+        plan = solve_min_transfers(balances)
+        assert_settles(balances, plan["transactions"])
+        assert len(plan["transactions"]) <= len(minimize_transactions(balances))
+        assert plan["solver"] in ("heuristic", "greedy")
+
+
+def test_expired_budget_falls_back_without_losing_money():
+    rng = random.Random(3)
+    balances = random_balances(20, rng, list(range(-100000, 100000, 7)))
+    plan = solve_min_transfers(balances, time_budget_ms=0)
+
+    assert plan["timed_out"]
+    assert_settles(balances, plan["transactions"])
+    assert len(plan["transactions"]) <= len(minimize_transactions(balances))
+
+
+def test_edge_cases():
+    assert optimize_transactions({}) == []
+    assert optimize_transactions({"A": 0, "B": 0}) == []
+    assert optimize_transactions({"A": 1000, "B": -1000}) == [{"from": "B", "to": "A", "amount_cents": 1000}]
+    with pytest.raises(ValueError):
+        optimize_transactions({"A": 1000, "B": -999})
@@ -1,6 +1,6 @@
 import pytest
 
-from backend.services.settlement_service import calculate_balances, minimize_transactions
+from backend.services.settlement_service import calculate_balances, iter_transactions, minimize_transactions
 
 
 def cents(dollars: float) -> int:
@@ -193,3 +193,104 @@ def test_minimize_transactions_conservation():
     balances = {"A": 1000, "B": -1000}
     txs = minimize_transactions(balances)
     assert txs == [tx("B", "A", 1000)]
+
+
+def test_iter_transactions_matches_minimize_transactions():
+    import random
+
+    rng = random.Random(5)
+    assert list(iter_transactions({})) == []
+    for n in (1, 2, 3, 10, 500):
+        values = [rng.choice([-500, 500, 1000, rng.randint(-9999, 9999)]) for _ in range(n - 1)]
+        values.append(-sum(values))
+        balances = {f"user_{i}": v for i, v in enumerate(values)}
+        assert list(iter_transactions(balances)) == minimize_transactions(balances)
+
+
+def test_iter_transactions_is_lazy():
+    balances = {"A": 3000, "B": -1000, "C": -1000, "D": -1000}
+    it = iter_transactions(balances)
+    assert next(it) == tx("B", "A", 1000)
+    assert len(list(it)) == 2
+
+
+# -------------------------
+# Vectorized Engine Tests
+# -------------------------
+
+def synthetic_ledger(n: int, people: int, seed: int) -> list:
+    import random
+
+    rng = random.Random(seed)
+    names = [f"user_{i}" for i in range(people)]
+    expenses = []
+    for _ in range(n):
+        members = rng.sample(names, rng.randint(1, min(6, people)))
+        amount = rng.randint(1, 50000)
+        split_type = rng.choice(["equal", "custom", "percentage"])
+        e = {"payer": rng.choice(names), "amount_cents": amount, "members": members, "split_type": split_type}
+        if split_type == "custom":
+            cuts = sorted(rng.randint(0, amount) for _ in range(len(members) - 1))
+            parts = [b - a for a, b in zip([0] + cuts, cuts + [amount])]
+            e["splits"] = [{"user": m, "amount_cents": p} for m, p in zip(members, parts)]
+        elif split_type == "percentage":
+            e["splits"] = [{"user": m, "percentage": rng.choice([10, 12.5, 33.3, 50])} for m in members]
+        expenses.append(e)
+    return expenses
+
+
+def test_vectorized_engine_matches_reference_on_synthetic_ledgers():
+    from backend.services.settlement_engine import calculate_balances_vectorized
+
+    for seed, people in [(1, 2), (2, 7), (3, 60)]:
+        ledger = synthetic_ledger(2000, people, seed=seed)
+        expected = calculate_balances(ledger)
+        got = calculate_balances_vectorized(ledger)
+        assert got == expected
+        assert list(got) == list(expected)  # same key order => same minimize_transactions output
+        assert minimize_transactions(got) == minimize_transactions(expected)
+
+
+def test_vectorized_engine_rounding_rules():
+    from backend.services.settlement_engine import calculate_balances_vectorized
+
+    expenses = [
+        {"payer": "Alice", "amount_cents": 1000, "members": ["Charlie", "Alice", "Bob"], "split_type": "equal"},
+        {
+            "payer": "Bob",
+            "amount_cents": 1001,
+            "members": ["Alice", "Bob"],
+            "split_type": "percentage",
+            "splits": [{"user": "Alice", "percentage": 50}, {"user": "Bob", "percentage": 50}],
+        },
+    ]
+    balances = calculate_balances_vectorized(expenses)
+    assert_conservation(balances)
+    assert balances == calculate_balances(expenses)
+    assert calculate_balances_vectorized([]) == {}
+
+
+@pytest.mark.parametrize(
+    "expense",
+    [
+        {"payer": "A", "amount_cents": 100, "members": [], "split_type": "equal"},
+        {"payer": "A", "amount_cents": 100, "members": ["A"], "split_type": "custom"},
+        {"payer": "A", "amount_cents": 100, "members": ["A"], "split_type": "percentage"},
+        {"payer": "A", "amount_cents": 100, "members": ["A"], "split_type": "shares"},
+        {
+            "payer": "A",
+            "amount_cents": 100,
+            "members": ["A", "B"],
+            "split_type": "custom",
+            "splits": [{"user": "A", "amount_cents": 10}, {"user": "B", "amount_cents": 20}],
+        },
+    ],
+)
+def test_vectorized_engine_raises_same_errors(expense):
+    from backend.services.settlement_engine import calculate_balances_vectorized
+
+    with pytest.raises(ValueError) as ref:
+        calculate_balances([expense])
+    with pytest.raises(ValueError) as vec:
+        calculate_balances_vectorized([expense])
+    assert str(vec.value) == str(ref.value)
@@ -1,4 +1,14 @@
-from typing import Tuple, List
+from typing import Dict, Iterable, Tuple, List, Optional
+
+import numpy as np
+
+from config import settings
+from services.keyword_matcher import KeywordMatcher
+from services.merchant_cache import MerchantCategoryCache, normalization_safe
+
+# One cache for every TransactionCategorizer in the process (pipeline, CSV import, API)
+shared_cache = MerchantCategoryCache(max_size=settings.CATEGORY_CACHE_MAX_SIZE)
+
 
 class TransactionCategorizer:
     CATEGORIES = [
@@ -11,7 +21,7 @@ class TransactionCategorizer:
         'Other'
     ]
     
-    def __init__(self):
+    def __init__(self, cache: Optional[MerchantCategoryCache] = None):
         self.keyword_map = {
             'doordash': 0, 'uber eats': 0, 'restaurant': 0, 'food': 0, 'pizza': 0,
             'amazon': 1, 'walmart': 1, 'target': 1, 'shopping': 1,
@@ -20,15 +30,46 @@ class TransactionCategorizer:
             'electric': 4, 'water': 4, 'internet': 4, 'bill': 4,
             'hotel': 5, 'airbnb': 5, 'flight': 5, 'travel': 5,
         }
-        print("Transaction categorizer initialized!")
+        # keyword_map order is the priority order (first keyword found wins)
+        self.matcher = KeywordMatcher(
+            ((kw, self.CATEGORIES[idx]) for kw, idx in self.keyword_map.items()),
+            default=None,
+        )
+        if cache is None:
+            cache = shared_cache
+            if not normalization_safe(self.matcher.keywords):
+                cache = MerchantCategoryCache(cache.max_size, normalize=str.lower)
+        self.cache = cache
     
     def categorize(self, description: str) -> Tuple[str, float]:
-        desc_lower = description.lower()
-        for keyword, cat_idx in self.keyword_map.items():
-            if keyword in desc_lower:
-                return self.CATEGORIES[cat_idx], 0.95
+        return self.cache.lookup(description, self._categorize)
+
+    def _categorize(self, description: str) -> Tuple[str, float]:
+        category = self.matcher.match(description)
+        if category is not None:
+            return category, 0.95
         return self.CATEGORIES[-1], 0.30
 
+    def categorize_many(self, descriptions: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Categorize a list or pandas Series of descriptions at once.
+        Returns (categories, confidences) arrays aligned with the input.
+        Each distinct description goes through the shared cache once and the
+        results are gathered back with NumPy; missing values (None / NaN)
+        count as "".
+        """
+        if hasattr(descriptions, "tolist"):
+            descriptions = descriptions.tolist()
+        index: Dict[str, int] = {}
+        inverse = np.fromiter(
+            (index.setdefault(d if isinstance(d, str) else "", len(index)) for d in descriptions),
+            dtype=np.intp,
+        )
+        unique = [self.cache.lookup(d, self._categorize) for d in index]
+        categories = np.array([c for c, _ in unique], dtype=object)
+        confidences = np.array([p for _, p in unique], dtype=np.float64)
+        return categories[inverse], confidences[inverse]
+
 if __name__ == "__main__":
     categorizer = TransactionCategorizer()
     tests = [
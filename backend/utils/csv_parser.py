@@ -1,6 +1,17 @@
 import csv
 import io
-from typing import List, Dict
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+DATE_COLS = ['date', 'transaction date', 'post date', 'posting date']
+DESC_COLS = ['description', 'merchant', 'name', 'transaction']
+AMOUNT_COLS = ['amount', 'debit', 'credit', 'transaction amount']
+CATEGORY_COLS = ['category', 'type', 'merchant category']
+
+# Rows per chunk in the chunked importer (memory is bounded by one chunk)
+CHUNK_ROWS = 50000
+
 
 class BankCSVParser:
     """Parse bank CSV files and extract card/transaction data"""
@@ -50,15 +61,10 @@ class BankCSVParser:
         
         headers = reader.fieldnames or []
         
-        date_cols = ['date', 'transaction date', 'post date', 'posting date']
-        desc_cols = ['description', 'merchant', 'name', 'transaction']
-        amount_cols = ['amount', 'debit', 'credit', 'transaction amount']
-        category_cols = ['category', 'type', 'merchant category']
-        
-        date_col = next((col for col in headers if col.lower() in date_cols), None)
-        desc_col = next((col for col in headers if col.lower() in desc_cols), None)
-        amount_col = next((col for col in headers if col.lower() in amount_cols), None)
-        category_col = next((col for col in headers if col.lower() in category_cols), None)
+        date_col = next((col for col in headers if col.lower() in DATE_COLS), None)
+        desc_col = next((col for col in headers if col.lower() in DESC_COLS), None)
+        amount_col = next((col for col in headers if col.lower() in AMOUNT_COLS), None)
+        category_col = next((col for col in headers if col.lower() in CATEGORY_COLS), None)
         
         for row in reader:
             try:
@@ -108,12 +114,18 @@ class BankCSVParser:
             }
         
         total = sum(t['amount'] for t in transactions if t['type'] == 'debit')
-        
+        descriptions = [t['description'] for t in transactions[:10]]
+        return BankCSVParser._suggest(total, descriptions, len(transactions))
+
+    @staticmethod
+    def _suggest(total: float, descriptions: List[str], transaction_count: int) -> Dict:
+        """Card details from the debit total and the first descriptions"""
+        if not transaction_count:
+            return BankCSVParser.suggest_card_details([])
+
         suggested_limit = round(total * 3, -2)
         suggested_balance = round(total, 2)
         
-        descriptions = [t['description'] for t in transactions[:10]]
-        
         card_name = 'Imported Card'
         if any('CHASE' in d.upper() for d in descriptions):
             card_name = 'Chase Card'
@@ -130,5 +142,147 @@ class BankCSVParser:
             'suggested_limit': max(suggested_limit, 500),
             'suggested_balance': suggested_balance,
             'suggested_name': card_name,
-            'transaction_count': len(transactions)
+            'transaction_count': transaction_count
+        }
+
+    # ── Chunked importer ──────────────────────────────────────────────────────
+    # Same fields and rules as parse_chase_csv / parse_generic_csv, but the
+    # upload is read CHUNK_ROWS rows at a time with pandas and amounts/dates
+    # are normalized column-wise instead of per row.
+
+    @staticmethod
+    def detect_columns(headers: List[str]) -> Dict:
+        """Source column per field (None = missing) plus card name/type and defaults."""
+        if 'Transaction Date' in headers and 'Post Date' in headers:
+            return {
+                'date': 'Transaction Date', 'description': 'Description',
+                'category': 'Category', 'amount': 'Amount',
+                'name': 'Chase Card', 'card_type': 'Visa', 'default_description': '',
+            }
+
+        def find(names):
+            return next((col for col in headers if col.lower() in names), None)
+
+        return {
+            'date': find(DATE_COLS), 'description': find(DESC_COLS),
+            'category': find(CATEGORY_COLS), 'amount': find(AMOUNT_COLS),
+            'name': 'Imported Card', 'card_type': 'Unknown', 'default_description': 'Unknown',
+        }
+
+    @staticmethod
+    def normalize_amounts(values) -> np.ndarray:
+        """'$1,234.50' / '(12.00)' / '-3' -> float64; unparseable -> NaN."""
+        import pandas as pd
+
+        text = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+        text = text.fillna('')
+        negative = text.str.contains('(', regex=False).to_numpy(dtype=bool)
+        amounts = pd.to_numeric(text.str.replace(r'[\s$,()]', '', regex=True), errors='coerce')
+        amounts = amounts.to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.where(negative, -amounts, amounts)
+
+    @staticmethod
+    def normalize_dates(values) -> np.ndarray:
+        """Parseable dates -> 'YYYY-MM-DD'; others kept as-is. Each distinct date is parsed once."""
+        import pandas as pd
+
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object).fillna(''))
+        uniques = pd.Series(uniques, dtype=object).astype(str)
+        parsed = pd.to_datetime(uniques, errors='coerce')
+        iso = np.where(parsed.isna(), uniques, parsed.dt.strftime('%Y-%m-%d')).astype(object)
+        return iso[codes]
+
+    @staticmethod
+    def iter_chunks(source: Union[str, BinaryIO], chunk_rows: int = CHUNK_ROWS) -> Iterator:
+        """
+        (layout, DataFrame) per chunk, with columns date, description,
+        category, amount (absolute), type (debit | credit). Rows whose amount
+        does not parse are dropped, as in the row-by-row parsers.
+        """
+        import pandas as pd
+
+        try:
+            reader = pd.read_csv(
+                source,
+                dtype=str,
+                keep_default_na=False,
+                chunksize=max(int(chunk_rows), 1),
+                encoding='utf-8-sig',
+                encoding_errors='replace',
+            )
+        except pd.errors.EmptyDataError:
+            return
+        layout = None
+        for chunk in reader:
+            if layout is None:
+                layout = BankCSVParser.detect_columns(list(chunk.columns))
+            if layout['amount']:
+                amounts = BankCSVParser.normalize_amounts(chunk[layout['amount']])
+            else:
+                amounts = np.zeros(len(chunk))
+            keep = ~np.isnan(amounts)
+            chunk, amounts = chunk[keep], amounts[keep]
+
+            def column(field, default):
+                col = layout[field]
+                return chunk[col].fillna(default).to_numpy(dtype=object) if col else np.full(len(chunk), default, dtype=object)
+
+            yield layout, pd.DataFrame({
+                'date': BankCSVParser.normalize_dates(chunk[layout['date']]) if layout['date'] else np.full(len(chunk), '', dtype=object),
+                'description': column('description', layout['default_description']),
+                'category': column('category', 'Other'),
+                'amount': np.abs(amounts),
+                'type': np.where(amounts < 0, 'debit', 'credit').astype(object),
+            })
+
+    @staticmethod
+    def import_csv(
+        source: Union[str, BinaryIO],
+        categorizer=None,
+        chunk_rows: int = CHUNK_ROWS,
+        sample_size: int = 10,
+    ) -> Dict:
+        """
+        Parse, normalize and (with a categorizer) categorize a bank CSV chunk by
+        chunk. Returns totals, card suggestions, per-ML-category spending and
+        the first sample_size transactions; no full transaction list is built.
+        """
+        import pandas as pd
+
+        layout = None
+        count = 0
+        total_spent = 0.0
+        first_descriptions: List[str] = []
+        samples: List[Dict] = []
+        category_spending: Dict[str, float] = {}
+
+        for layout, chunk in BankCSVParser.iter_chunks(source, chunk_rows):
+            if chunk.empty:
+                continue
+            if categorizer is not None:
+                # Statements repeat merchants: categorize each distinct description once
+                codes, uniques = pd.factorize(chunk['description'])
+                categories, confidences = categorizer.categorize_many(np.asarray(uniques, dtype=object))
+                chunk['ml_category'] = categories[codes]
+                chunk['confidence'] = confidences[codes]
+                spent = np.bincount(codes, weights=chunk['amount'].to_numpy(), minlength=len(uniques))
+                for category, amount in zip(categories.tolist(), spent.tolist()):
+                    category_spending[category] = category_spending.get(category, 0.0) + amount
+
+            count += len(chunk)
+            total_spent += float(chunk['amount'].to_numpy()[chunk['type'].to_numpy() == 'debit'].sum())
+            if len(first_descriptions) < 10:
+                first_descriptions.extend(chunk['description'].iloc[: 10 - len(first_descriptions)].tolist())
+            if len(samples) < sample_size:
+                samples.extend(chunk.iloc[: sample_size - len(samples)].to_dict('records'))
+
+        layout = layout or BankCSVParser.detect_columns([])
+        return {
+            'name': layout['name'],
+            'card_type': layout['card_type'],
+            'balance': total_spent,
+            'transaction_count': count,
+            'suggestions': BankCSVParser._suggest(total_spent, first_descriptions, count),
+            'category_breakdown': category_spending,
+            'sample_transactions': samples,
         }
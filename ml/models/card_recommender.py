@@ -1,12 +1,17 @@
 # ml/models/card_recommender.py
 """
-PaySplit.AI — Card Recommender (PyTorch)
+PaySplit.AI — Card Recommender (PyTorch for training, NumPy for serving)
 
 What this file does:
-- Defines a small neural net that outputs allocation % across up to 3 cards.
+- Defines a small neural net that outputs allocation % across up to 3 cards, and an
+  N-card model (MaskedCardRecommenderNet) that scores each card with a shared MLP and
+  takes a masked softmax, so any wallet size is one forward pass.
 - Trains on synthetic data (for demo) and saves the model to ml/artifacts/card_recommender.pt
-- Loads the saved model on startup (FastAPI safe).
-- Works even if the saved file is either:
+- Exports the weights to ml/artifacts/card_recommender.npz (export_npz / --export-npz);
+  NumpyCardRecommenderNet runs the same forward pass without importing torch.
+- Loads the saved model on startup (FastAPI safe); backend="auto" serves from the
+  .npz when it exists, so torch is only needed for training.
+- Works even if the saved .pt file is either:
   A) raw PyTorch state_dict
   B) a checkpoint dict {"state_dict": ..., "num_features": ...}
 """
@@ -14,41 +19,321 @@ What this file does:
 from __future__ import annotations
 
 import argparse
+import os
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-import torch
-import torch.nn as nn
+
+# torch is imported only by training and the torch backend (_require_torch);
+# serving from the .npz export only needs NumPy.
 
 
 # Resolve repo root reliably (works even when backend runs from /backend)
 # File: <repo>/ml/models/card_recommender.py
 REPO_ROOT = Path(__file__).resolve().parents[2]  # <repo>
 DEFAULT_MODEL_PATH = REPO_ROOT / "ml" / "artifacts" / "card_recommender.pt"
+DEFAULT_NPZ_PATH = REPO_ROOT / "ml" / "artifacts" / "card_recommender.npz"
+DEFAULT_MASKED_NPZ_PATH = REPO_ROOT / "ml" / "artifacts" / "card_recommender_masked.npz"
+
+# "auto" = NumPy export if present, else torch; "numpy" / "torch" force one
+BACKENDS = ("auto", "numpy", "torch")
+
+# "auto" = N-card masked model if exported, else the fixed 3-card net
+ARCHS = ("auto", "masked", "fixed")
+
+# state_dict prefixes of the Linear layers in CardRecommenderNet.network
+LINEAR_LAYERS = ("network.0", "network.3", "network.5")
+
+
+def _require_torch(what: str):
+    """Import and return torch, or explain that only NumPy serving works without it."""
+    try:
+        import torch
+    except ImportError:
+        raise ImportError(f"torch is required to {what}; serving from the .npz export only needs NumPy") from None
+    return torch
+
+
+_TORCH_NETS: Dict[str, type] = {}
+
+
+def _torch_nets() -> Dict[str, type]:
+    """The nn.Module classes, defined on first use so importing this module never imports torch."""
+    if _TORCH_NETS:
+        return _TORCH_NETS
+    torch = _require_torch("build the torch card recommender")
+    nn = torch.nn
+
+    class CardRecommenderNet(nn.Module):
+        def __init__(self, num_features: int = 9):
+            super().__init__()
+            self.num_features = num_features
+            self.network = nn.Sequential(
+                nn.Linear(num_features, 64),
+                nn.ReLU(),
+                nn.Dropout(0.3),
+                nn.Linear(64, 32),
+                nn.ReLU(),
+                nn.Linear(32, 3),
+                nn.Softmax(dim=1),
+            )
+
+        def forward(self, x: torch.Tensor) -> torch.Tensor:
+            return self.network(x)
+
+    class MaskedCardRecommenderNet(nn.Module):
+        """One MLP scores every card; softmax over the valid (unmasked) cards."""
+
+        def __init__(self, num_features: int = len(WALLET_FEATURES)):
+            super().__init__()
+            self.num_features = num_features
+            self.scorer = nn.Sequential(
+                nn.Linear(num_features, 32),
+                nn.ReLU(),
+                nn.Linear(32, 16),
+                nn.ReLU(),
+                nn.Linear(16, 1),
+            )
+
+        def forward(self, x: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+            logits = self.scorer(x).squeeze(-1).masked_fill(~mask, float("-inf"))
+            return torch.softmax(logits, dim=-1)
+
+    for cls in (CardRecommenderNet, MaskedCardRecommenderNet):
+        cls.__module__ = __name__
+        _TORCH_NETS[cls.__name__] = cls
+    return _TORCH_NETS
+
+
+def __getattr__(name: str):
+    # CardRecommenderNet / MaskedCardRecommenderNet stay importable from this module
+    if name in ("CardRecommenderNet", "MaskedCardRecommenderNet"):
+        return _torch_nets()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class NumpyCardRecommenderNet:
+    """
+    Eval-mode forward pass of CardRecommenderNet in NumPy (dropout is the
+    identity at inference). Computed in float64: on raw dollar features the
+    float32 torch model carries ~1e-5 of rounding noise, so the exact result
+    is the closest one can get to it regardless of summation order.
+    """
 
+    def __init__(self, weights: Dict[str, np.ndarray]):
+        self.layers = [
+            (np.asarray(weights[f"{name}.weight"], dtype=np.float64),
+             np.asarray(weights[f"{name}.bias"], dtype=np.float64))
+            for name in LINEAR_LAYERS
+        ]
+        self.num_features = int(self.layers[0][0].shape[1])
+
+    @classmethod
+    def load(cls, path: Path | str) -> "NumpyCardRecommenderNet":
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        h = np.asarray(x, dtype=np.float64)
+        last = len(self.layers) - 1
+        for i, (weight, bias) in enumerate(self.layers):
+            h = h @ weight.T + bias
+            if i < last:
+                np.maximum(h, 0.0, out=h)
+        # Softmax over the 3 cards
+        h -= h.max(axis=1, keepdims=True)
+        np.exp(h, out=h)
+        h /= h.sum(axis=1, keepdims=True)
+        return h
 
-class CardRecommenderNet(nn.Module):
-    def __init__(self, num_features: int = 9):
-        super().__init__()
-        self.num_features = num_features
-        self.network = nn.Sequential(
-            nn.Linear(num_features, 64),
-            nn.ReLU(),
-            nn.Dropout(0.3),
-            nn.Linear(64, 32),
-            nn.ReLU(),
-            nn.Linear(32, 3),
-            nn.Softmax(dim=1),
-        )
 
-    def forward(self, x: torch.Tensor) -> torch.Tensor:
-        return self.network(x)
+# ---------------------------
+# N-card (masked) model
+# ---------------------------
+# Per-card features; every card of every transaction is one row, padded cards are masked
+WALLET_FEATURES = (
+    "log_amount",         # log1p(transaction amount)
+    "log_available",      # log1p(limit - balance)
+    "coverage",           # available / amount, capped at 10
+    "utilization",        # balance / limit
+    "rewards_pct",        # rewards_rate * 100
+    "covers",             # available >= amount
+    "first_cover",        # the first card (in wallet order) that covers the amount
+    "log_share",          # log of this card's share of the wallet's available credit
+    "position",           # i / (n - 1)
+)
+
+# state_dict prefixes of the Linear layers in MaskedCardRecommenderNet.scorer
+MASKED_LINEAR_LAYERS = ("scorer.0", "scorer.2", "scorer.4")
+
+
+def wallet_arrays(wallets: List[List[Dict]], max_cards: Optional[int] = None):
+    """
+    Cards of many transactions -> padded (B, N) limit, balance and rewards_rate
+    arrays plus the validity mask. The only per-card Python work; everything
+    after this is vectorized.
+    """
+    if any(not cards for cards in wallets):
+        raise ValueError("cards list cannot be empty")
+    sizes = np.fromiter((len(cards) for cards in wallets), dtype=np.intp, count=len(wallets))
+    n = int(max_cards or (sizes.max() if len(sizes) else 1))
+    mask = np.arange(n) < sizes[:, None]
+
+    flat = np.array(
+        [
+            (float(c.get("limit", 1000)), float(c.get("balance", 0)), float(c.get("rewards_rate", 0.01)))
+            for cards in wallets
+            for c in cards
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+    values = np.zeros((len(wallets), n, 3))
+    values[mask] = flat
+    return values[..., 0], values[..., 1], values[..., 2], mask
+
+
+def wallet_features(
+    amounts: np.ndarray,
+    limits: np.ndarray,
+    balances: np.ndarray,
+    rates: np.ndarray,
+    mask: np.ndarray,
+) -> np.ndarray:
+    """(B,) amounts and (B, N) card arrays -> (B, N, len(WALLET_FEATURES)) features."""
+    amounts = np.asarray(amounts, dtype=np.float64)[:, None]
+    available = np.where(mask, np.maximum(limits - balances, 0.0), 0.0)
+
+    covers = mask & (available >= amounts)
+    # True from the first covering card onwards; first_cover is where that switches on
+    covered = np.logical_or.accumulate(covers, axis=1)
+    first_cover = covers & ~np.concatenate([np.zeros_like(covered[:, :1]), covered[:, :-1]], axis=1)
+
+    total = available.sum(axis=1, keepdims=True)
+    share = np.divide(available, total, out=np.zeros_like(available), where=total > 0)
+    sizes = mask.sum(axis=1, keepdims=True)
+    position = np.arange(mask.shape[1]) / np.maximum(sizes - 1, 1)
+
+    X = np.stack(
+        [
+            np.broadcast_to(np.log1p(np.maximum(amounts, 0.0)), available.shape),
+            np.log1p(available),
+            np.minimum(available / np.maximum(amounts, 1e-6), 10.0),
+            np.divide(balances, limits, out=np.zeros_like(available), where=limits > 0),
+            rates * 100.0,
+            covers,
+            first_cover,
+            np.log(share + 1e-6),
+            position,
+        ],
+        axis=-1,
+    )
+    X[~mask] = 0.0
+    return X
+
+
+def rule_allocation(amounts: np.ndarray, limits: np.ndarray, balances: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    The synthetic training target for any number of cards (same rule as the
+    3-card model): the first card that covers the amount takes 100%,
+    otherwise split proportionally to available credit.
+    """
+    X = wallet_features(amounts, limits, balances, np.zeros_like(limits), mask)
+    first_cover = X[..., WALLET_FEATURES.index("first_cover")].astype(bool)
+    available = np.where(mask, np.maximum(limits - balances, 0.0), 0.0)
+    total = np.maximum(available.sum(axis=1, keepdims=True), 1e-6)
+    proportional = np.where(mask, available / total, 0.0)
+    return np.where(first_cover.any(axis=1, keepdims=True), first_cover.astype(np.float64), proportional)
+
+
+def synthetic_wallets(n: int, max_cards: int = 16, seed: int = 42):
+    """Random transactions over wallets of 1..max_cards cards (padded to max_cards)."""
+    rng = np.random.default_rng(seed)
+    amounts = rng.uniform(10, 500, n)
+    sizes = rng.integers(1, max_cards + 1, n)
+    mask = np.arange(max_cards) < sizes[:, None]
+    limits = np.where(mask, rng.uniform(500, 2000, (n, max_cards)), 0.0)
+    balances = np.where(mask, rng.uniform(0, 1, (n, max_cards)) * limits, 0.0)
+    rates = np.where(mask, rng.choice([0.01, 0.015, 0.02, 0.03], (n, max_cards)), 0.0)
+    return amounts, limits, balances, rates, mask
+
+
+class NumpyMaskedCardRecommenderNet:
+    """Forward pass of MaskedCardRecommenderNet in NumPy (float64, see NumpyCardRecommenderNet)."""
+
+    def __init__(self, weights: Dict[str, np.ndarray]):
+        self.layers = [
+            (np.asarray(weights[f"{name}.weight"], dtype=np.float64),
+             np.asarray(weights[f"{name}.bias"], dtype=np.float64))
+            for name in MASKED_LINEAR_LAYERS
+        ]
+        self.num_features = int(self.layers[0][0].shape[1])
+
+    @classmethod
+    def load(cls, path: Path | str) -> "NumpyMaskedCardRecommenderNet":
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def __call__(self, x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        h = np.asarray(x, dtype=np.float64)
+        last = len(self.layers) - 1
+        for i, (weight, bias) in enumerate(self.layers):
+            h = h @ weight.T + bias
+            if i < last:
+                np.maximum(h, 0.0, out=h)
+        logits = np.where(mask, h[..., 0], -np.inf)
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs
+
+
+def train_masked_recommender(
+    npz_path: Path | str = DEFAULT_MASKED_NPZ_PATH,
+    n_samples: int = 20000,
+    epochs: int = 400,
+    max_cards: int = 16,
+    seed: int = 42,
+) -> Path:
+    """Train MaskedCardRecommenderNet on synthetic wallets and export it straight to .npz."""
+    torch = _require_torch("train the masked card recommender")
+    print("Training masked card recommender (synthetic)...")
+    torch.manual_seed(seed)
+
+    amounts, limits, balances, rates, mask = synthetic_wallets(n_samples, max_cards, seed)
+    X = torch.tensor(wallet_features(amounts, limits, balances, rates, mask), dtype=torch.float32)
+    y = torch.tensor(rule_allocation(amounts, limits, balances, mask), dtype=torch.float32)
+    M = torch.tensor(mask)
+
+    model = _torch_nets()["MaskedCardRecommenderNet"]()
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-2)
+    model.train()
+    for epoch in range(epochs):
+        optimizer.zero_grad()
+        out = model(X, M)
+        # Cross-entropy against the soft target (masked cards have target 0)
+        loss = -(y * torch.log(out.clamp_min(1e-9))).sum(dim=-1).mean()
+        loss.backward()
+        optimizer.step()
+
+        if (epoch + 1) % 50 == 0:
+            print(f"Epoch [{epoch+1}/{epochs}], Loss: {loss.item():.4f}")
+
+    npz_path = Path(npz_path)
+    npz_path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(npz_path, **{key: value.detach().cpu().numpy() for key, value in model.state_dict().items()})
+    print(f"✅ Exported masked card recommender weights to: {npz_path}")
+    return npz_path
 
 
 class CardRecommender:
     """
-    Recommend how to split a transaction across up to 3 cards.
+    Recommend how to split a transaction across a wallet of cards.
+
+    - arch="masked": N-card model served from its .npz export (any number of cards)
+    - arch="fixed": the 3-card net (missing cards padded, extra cards ignored)
+    - arch / backend left as None fall back to the CARD_RECOMMENDER_ARCH /
+      CARD_RECOMMENDER_BACKEND environment variables, then "auto"
 
     Important:
     - This is a demo model trained on synthetic rules.
@@ -62,10 +347,54 @@ class CardRecommender:
         model_path: Path | str = DEFAULT_MODEL_PATH,
         auto_train_if_missing: bool = False,
         seed: int = 42,
+        backend: Optional[str] = None,
+        npz_path: Path | str = DEFAULT_NPZ_PATH,
+        arch: Optional[str] = None,
+        masked_npz_path: Path | str = DEFAULT_MASKED_NPZ_PATH,
     ):
         self.model_path = Path(model_path)
+        self.npz_path = Path(npz_path)
+        self.masked_npz_path = Path(masked_npz_path)
         self.seed = seed
-        self.model = CardRecommenderNet(num_features=9)
+
+        self.arch = (arch or os.getenv("CARD_RECOMMENDER_ARCH") or "auto").lower()
+        if self.arch not in ARCHS:
+            raise ValueError(f"Unknown card recommender arch '{self.arch}' (use: {', '.join(ARCHS)})")
+        if self.arch == "auto":
+            self.arch = "masked" if self.masked_npz_path.exists() else "fixed"
+
+        self.backend = (backend or os.getenv("CARD_RECOMMENDER_BACKEND") or "auto").lower()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown card recommender backend '{self.backend}' (use: {', '.join(BACKENDS)})")
+        if self.backend == "auto":
+            self.backend = "numpy" if self.npz_path.exists() else "torch"
+
+        self.model = None  # torch CardRecommenderNet (training / torch backend)
+        self.numpy_model: Optional[NumpyCardRecommenderNet] = None
+        self.masked_model: Optional[NumpyMaskedCardRecommenderNet] = None
+
+        if self.arch == "masked":
+            if not self.masked_npz_path.exists():
+                raise FileNotFoundError(
+                    f"Masked card recommender export not found at: {self.masked_npz_path}\n"
+                    f"Run: python3 ml/models/card_recommender.py --train-masked"
+                )
+            self.masked_model = NumpyMaskedCardRecommenderNet.load(self.masked_npz_path)
+            print(f"✅ Loaded masked card recommender weights from: {self.masked_npz_path}")
+            return
+
+        if self.backend == "numpy":
+            if not self.npz_path.exists():
+                raise FileNotFoundError(
+                    f"Card recommender export not found at: {self.npz_path}\n"
+                    f"Run: python3 ml/models/card_recommender.py --export-npz"
+                )
+            self.numpy_model = NumpyCardRecommenderNet.load(self.npz_path)
+            print(f"✅ Loaded card recommender weights from: {self.npz_path}")
+            return
+
+        _require_torch("load or train the card recommender")
+        self.model = _torch_nets()["CardRecommenderNet"](num_features=9)
 
         if self.model_path.exists():
             self._load()
@@ -86,6 +415,7 @@ class CardRecommender:
     def _save(self) -> None:
         self.model_path.parent.mkdir(parents=True, exist_ok=True)
 
+        torch = _require_torch("save the card recommender")
         # Save as checkpoint dict (recommended)
         torch.save(
             {
@@ -99,6 +429,7 @@ class CardRecommender:
         print(f"✅ Saved card recommender model to: {self.model_path}")
 
     def _load(self) -> None:
+        torch = _require_torch("load the card recommender")
         obj = torch.load(self.model_path, map_location="cpu")
 
         # Case A: checkpoint dict
@@ -118,11 +449,23 @@ class CardRecommender:
         self.model.load_state_dict(state)
         print(f"✅ Loaded card recommender model from: {self.model_path}")
 
+    def export_npz(self, path: Path | str | None = None) -> Path:
+        """Write the torch weights to a .npz that NumpyCardRecommenderNet serves from."""
+        if self.model is None:
+            raise RuntimeError("export_npz needs the torch model (backend='torch')")
+        path = Path(path) if path is not None else self.npz_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        weights = {key: value.detach().cpu().numpy() for key, value in self.model.state_dict().items()}
+        np.savez(path, **weights)
+        print(f"✅ Exported card recommender weights to: {path}")
+        return path
+
     # ---------------------------
     # Training (synthetic demo)
     # ---------------------------
     def _train_synthetic(self, n_samples: int = 500, epochs: int = 50) -> None:
         print("Training card recommender (synthetic)...")
+        torch = _require_torch("train the card recommender")
         np.random.seed(self.seed)
         torch.manual_seed(self.seed)
 
@@ -185,7 +528,7 @@ class CardRecommender:
         y = torch.tensor(y_train, dtype=torch.float32)
 
         optimizer = torch.optim.Adam(self.model.parameters(), lr=1e-3)
-        criterion = nn.MSELoss()
+        criterion = torch.nn.MSELoss()
 
         self.model.train()
         for epoch in range(epochs):
@@ -204,31 +547,23 @@ class CardRecommender:
     # ---------------------------
     # Inference
     # ---------------------------
-    def recommend(
-        self,
-        transaction_amount: float,
-        cards: List[Dict],
-        free_trial: bool = False,
-        merchant: Optional[str] = None,
-    ) -> Dict:
-        """
-        cards: list of dicts with keys like: id, name, limit, balance, rewards_rate
-        Supports 1-3 cards. (If fewer than 3, missing cards are padded.)
-        """
+    @staticmethod
+    def _card(cards: List[Dict], i: int) -> Dict:
+        # Pad missing cards with a neutral $1000 card
+        if i < len(cards):
+            return cards[i]
+        return {"id": f"card_{i+1}", "name": f"Card {i+1}", "limit": 1000, "balance": 0, "rewards_rate": 0.01}
+
+    def _features(self, transaction_amount: float, cards: List[Dict]) -> List[float]:
+        """The 9 model features; supports 1-3 cards (missing cards are padded)."""
         if not cards:
             raise ValueError("cards list cannot be empty")
 
-        # Build 9 features (pad missing cards)
-        def get_card(i: int) -> Dict:
-            if i < len(cards):
-                return cards[i]
-            return {"id": f"card_{i+1}", "name": f"Card {i+1}", "limit": 1000, "balance": 0, "rewards_rate": 0.01}
-
-        c1 = get_card(0)
-        c2 = get_card(1)
-        c3 = get_card(2)
+        c1 = self._card(cards, 0)
+        c2 = self._card(cards, 1)
+        c3 = self._card(cards, 2)
 
-        features = [
+        return [
             float(transaction_amount),
             float(c1.get("limit", 1000)),
             float(c1.get("balance", 0)),
@@ -240,15 +575,40 @@ class CardRecommender:
             float(c3.get("balance", 0)),
         ]
 
-        with torch.no_grad():
-            x = torch.tensor([features], dtype=torch.float32)
-            allocation_pcts = self.model(x)[0].cpu().numpy()  # shape (3,)
+    def _predict(self, features: List[List[float]]) -> np.ndarray:
+        """One forward pass over a stack of feature rows -> (n, 3) allocation percentages."""
+        if self.numpy_model is not None:
+            return self.numpy_model(features)
+        torch = _require_torch("run the torch card recommender")
+        with torch.inference_mode():
+            x = torch.tensor(features, dtype=torch.float32)
+            return self.model(x).cpu().numpy()
 
+    def _allocations(self, requests: List[Tuple[float, List[Dict]]]) -> List[np.ndarray]:
+        """
+        Allocation percentages for (transaction_amount, cards) pairs in one
+        forward pass: one value per card (masked) or 3 values (fixed).
+        """
+        if self.masked_model is not None:
+            amounts = np.array([amount for amount, _ in requests], dtype=np.float64)
+            limits, balances, rates, mask = wallet_arrays([cards for _, cards in requests])
+            probs = self.masked_model(wallet_features(amounts, limits, balances, rates, mask), mask)
+            return [probs[i, : len(cards)] for i, (_, cards) in enumerate(requests)]
+        return list(self._predict([self._features(amount, cards) for amount, cards in requests]))
+
+    def _result(
+        self,
+        transaction_amount: float,
+        cards: List[Dict],
+        allocation_pcts: np.ndarray,
+        free_trial: bool,
+        merchant: Optional[str],
+    ) -> Dict:
         total_fee = 0.0 if free_trial else float(transaction_amount) * self.PAYSPLIT_FEE
 
         allocations = []
         for i, pct in enumerate(allocation_pcts):
-            card = get_card(i)
+            card = self._card(cards, i)
             amount = float(transaction_amount) * float(pct)
 
             # Ignore tiny dust allocations
@@ -278,6 +638,72 @@ class CardRecommender:
             "free_trial": bool(free_trial),
         }
 
+    def recommend(
+        self,
+        transaction_amount: float,
+        cards: List[Dict],
+        free_trial: bool = False,
+        merchant: Optional[str] = None,
+    ) -> Dict:
+        """
+        cards: list of dicts with keys like: id, name, limit, balance, rewards_rate
+        The masked model takes any number of cards; the fixed model supports
+        1-3 (if fewer than 3, missing cards are padded).
+        """
+        allocation_pcts = self._allocations([(transaction_amount, cards)])[0]
+        return self._result(transaction_amount, cards, allocation_pcts, free_trial, merchant)
+
+    def recommend_batch(
+        self,
+        transactions: List[Dict],
+        cards: Optional[List[Dict]] = None,
+        free_trial: bool = False,
+    ) -> List[Dict]:
+        """
+        recommend() for many transactions with a single forward pass.
+
+        transactions: dicts with transaction_amount and optional merchant,
+        cards (defaults to the shared `cards`) and free_trial. Results are
+        returned in input order.
+        """
+        if not transactions:
+            return []
+
+        rows = []
+        for txn in transactions:
+            txn_cards = txn.get("cards") or cards
+            if not txn_cards:
+                raise ValueError("cards list cannot be empty")
+            rows.append((txn, txn_cards))
+
+        allocation_pcts = self._allocations([(t["transaction_amount"], c) for t, c in rows])
+        return [
+            self._result(
+                t["transaction_amount"],
+                c,
+                pcts,
+                bool(t.get("free_trial", free_trial)),
+                t.get("merchant"),
+            )
+            for (t, c), pcts in zip(rows, allocation_pcts)
+        ]
+
+    def recommend_portfolios(
+        self,
+        transaction_amount: float,
+        portfolios: List[List[Dict]],
+        free_trial: bool = False,
+        merchant: Optional[str] = None,
+    ) -> List[Dict]:
+        """What-if: the same transaction scored against each card portfolio in one pass."""
+        return self.recommend_batch(
+            [
+                {"transaction_amount": transaction_amount, "cards": cards, "merchant": merchant}
+                for cards in portfolios
+            ],
+            free_trial=free_trial,
+        )
+
 
 # ---------------------------
 # CLI
@@ -285,13 +711,26 @@ class CardRecommender:
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--train", action="store_true", help="Train & save model to ml/artifacts/card_recommender.pt")
+    parser.add_argument(
+        "--export-npz", action="store_true", help="Export the .pt weights to ml/artifacts/card_recommender.npz"
+    )
+    parser.add_argument(
+        "--train-masked", action="store_true",
+        help="Train the N-card model and export it to ml/artifacts/card_recommender_masked.npz",
+    )
     args = parser.parse_args()
 
+    if args.train_masked:
+        train_masked_recommender()
+
     if args.train:
-        rec = CardRecommender(auto_train_if_missing=True)
+        rec = CardRecommender(auto_train_if_missing=True, backend="torch", arch="fixed")
         # If file existed, it loaded; force retrain + overwrite for consistency
         rec._train_synthetic()
         rec._save()
+        rec.export_npz()
+    elif args.export_npz:
+        CardRecommender(backend="torch", arch="fixed").export_npz()
 
     # Demo run (loads model from disk if present)
     rec = CardRecommender(auto_train_if_missing=False)